@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Memory footprint of a geometry with many entities.
+
+Builds `n` entities (unit squares, ten entities each: four points, four
+lines, one line loop, one plane surface), keeps the returned handles alive
+like user code typically does, and reports the memory held, measured with
+tracemalloc.
+
+    python3 benchmarks/memory.py [n]
+'''
+from __future__ import print_function
+
+import sys
+import time
+import tracemalloc
+
+import pygmsh
+
+
+def build(n):
+    geom = pygmsh.built_in.Geometry()
+    handles = []
+    for k in range(n // 10):
+        x = float(k % 1000)
+        y = float(k // 1000)
+        handles.append(geom.add_polygon([
+            [x, y, 0.0],
+            [x + 1.0, y, 0.0],
+            [x + 1.0, y + 1.0, 0.0],
+            [x, y + 1.0, 0.0],
+            ], lcar=0.1))
+    return geom, handles
+
+
+def main(n):
+    tracemalloc.start()
+    t = time.time()
+    geom, handles = build(n)
+    t_build = time.time() - t
+    held, _ = tracemalloc.get_traced_memory()
+
+    t = time.time()
+    code = geom.get_code()
+    t_code = time.time() - t
+    tracemalloc.stop()
+    del handles
+
+    print('entities:          {}'.format(n))
+    print('build time:        {:.2f} s'.format(t_build))
+    print('get_code() time:   {:.2f} s'.format(t_code))
+    print('memory held:       {:.1f} MB'.format(held / 1024.0**2))
+    print('bytes per entity:  {:.0f}'.format(float(held) / n))
+    print('code size:         {:.1f} MB'.format(len(code) / 1024.0**2))
+    return
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10**6)
@@ -0,0 +1,125 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+'''
+Calibration of pygmsh.estimate_mesh_size against the geometries of the test
+suite.
+
+Runs every test function in its own process and records, for each call of
+`generate_mesh`, the estimate and the actual mesh size, Gmsh's runtime, and
+the peak memory of the Gmsh process. Prints the ratios of the actual to the
+estimated cell counts, together with the measured runtime and memory, which
+pygmsh.estimate_mesh_size doesn't predict.
+
+    python3 benchmarks/mesh_size.py [test/test_*.py ...]
+'''
+from __future__ import print_function
+
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+import numpy
+
+import pygmsh
+
+_CELL_TYPES = ['line', 'triangle', 'tetra']
+
+
+def _record(test_dir, module, function):
+    '''Runs one test function and prints one JSON record per mesh.'''
+    sys.path.insert(0, test_dir)
+    generate_mesh = pygmsh.generate_mesh
+
+    def measure(geometry, dim=3, **kwargs):
+        estimate = pygmsh.estimate_mesh_size(geometry, dim=dim)
+        # Lloyd smoothing isn't part of the model.
+        kwargs['num_lloyd_steps'] = 0
+        kwargs['verbose'] = False
+        t = time.time()
+        mesh = generate_mesh(geometry, dim=dim, **kwargs)
+        runtime = time.time() - t
+        # kilobytes on Linux
+        memory = 1024.0 * resource.getrusage(
+            resource.RUSAGE_CHILDREN
+            ).ru_maxrss
+        print(json.dumps({
+            'name': '{}.{}'.format(module, function),
+            'estimate': estimate.num_cells,
+            'num_cells': {
+                key: len(value) for key, value in mesh[1].items()
+                },
+            'runtime': runtime,
+            'memory': memory,
+            }))
+        return mesh
+
+    pygmsh.generate_mesh = measure
+    getattr(__import__(module), function)()
+    return
+
+
+def _run_all(filenames):
+    records = []
+    for filename in filenames:
+        test_dir, module = os.path.split(os.path.abspath(filename))
+        module = module[:-3]
+        sys.path.insert(0, test_dir)
+        functions = [
+            f for f in dir(__import__(module)) if f.startswith('test')
+            ]
+        for function in functions:
+            out = subprocess.Popen(
+                [sys.executable, __file__, '--record', test_dir, module,
+                 function],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                ).communicate()[0].decode('utf-8')
+            records += [
+                json.loads(line) for line in out.split('\n')
+                if line.startswith('{')
+                ]
+    return records
+
+
+def main(filenames):
+    records = _run_all(filenames)
+    if not records:
+        print('No meshes (is Gmsh installed?)')
+        return
+
+    print('{:<50} {:>10} {:>10} {:>8} {:>10} {:>10}'.format(
+        'geometry', 'estimate', 'actual', 'ratio', 'runtime', 'memory'
+        ))
+    ratios = {key: [] for key in _CELL_TYPES}
+    for r in records:
+        for key in _CELL_TYPES:
+            if r['estimate'].get(key) and r['num_cells'].get(key):
+                ratio = float(r['num_cells'][key]) / r['estimate'][key]
+                ratios[key].append(ratio)
+                print(
+                    '{:<50} {:>10} {:>10} {:>8.2f} {:>9.2f}s {:>8.0f}MB'
+                    .format(
+                        '{} ({})'.format(r['name'], key),
+                        r['estimate'][key], r['num_cells'][key], ratio,
+                        r['runtime'], r['memory'] / 1.0e6
+                        ))
+    print()
+    for key in _CELL_TYPES:
+        if ratios[key]:
+            print('{}: geometric mean of the ratios {:.2f}'.format(
+                key, numpy.exp(numpy.mean(numpy.log(ratios[key])))
+                ))
+    return
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--record':
+        _record(*sys.argv[2:5])
+    else:
+        main(sys.argv[1:] or sorted(glob.glob(os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), '..', 'test',
+            'test_*.py'
+            ))))
@@ -13,6 +13,19 @@ from . import built_in
 from . import opencascade
 # pylint: disable=wildcard-import
 from .helpers import *
+from .transform import Transform
+from .parameter import Parameter
+from .merge import merge_meshes
+from .instancing import instantiate, generate_instanced_mesh
+from . import post_view
+from .adapt import adapt_mesh
+from .estimate import estimate_mesh_size
+from .periodic import periodic_point_pairs, tile_periodic_mesh
+from .symmetry import (
+        RotationalSymmetry,
+        ReflectionSymmetry,
+        generate_symmetric_mesh,
+        )
 
 try:
     import pipdate
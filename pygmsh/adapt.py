@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+#
+'''Solution-adaptive meshing: mesh, estimate the error per cell, derive new
+mesh sizes, and remesh with the sizes as background mesh.
+'''
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy
+
+from .helpers import generate_mesh
+
+
+def cell_sizes(points, cells):
+    '''Mean edge length of each of the cells `cells`.
+    '''
+    i, j = numpy.triu_indices(cells.shape[1], 1)
+    edges = points[cells[:, j]] - points[cells[:, i]]
+    return numpy.mean(
+        numpy.sqrt(numpy.einsum('...j,...j', edges, edges)), axis=1
+        )
+
+
+def new_sizes(
+        sizes, errors, dim, order=1,
+        target_error=None, max_num_cells=None,
+        max_refinement=4.0, max_coarsening=2.0
+        ):
+    '''New cell sizes that equidistribute the error, assuming that the error
+    of a cell behaves like `size**order`. Each cell is refined by at most the
+    factor `max_refinement` and coarsened by at most `max_coarsening`.
+
+    The cells should contribute `target_error` to the total error (the
+    :math:`\\ell^2`-norm of the cell errors), otherwise the mean of the current
+    cell errors. With `max_num_cells`, all sizes are scaled up if the
+    predicted number of cells is larger.
+    '''
+    errors = numpy.maximum(errors, numpy.finfo(float).tiny)
+    if target_error is not None:
+        cell_error = target_error / numpy.sqrt(len(errors))
+    else:
+        cell_error = numpy.sqrt(numpy.mean(errors**2))
+
+    ratio = numpy.clip(
+        (cell_error / errors)**(1.0 / order),
+        1.0 / max_refinement, max_coarsening
+        )
+    sizes = sizes * ratio
+
+    if max_num_cells is not None:
+        # Each cell is replaced by (h_old/h_new)**dim cells.
+        num_cells = numpy.sum(ratio**(-dim))
+        if num_cells > max_num_cells:
+            sizes *= (num_cells / max_num_cells)**(1.0 / dim)
+    return sizes
+
+
+def _save(filename, mesh, errors):
+    points, cells, point_data, cell_data, field_data = mesh
+    arrays = {'points': points, 'errors': errors}
+    arrays.update({'cells/' + key: value for key, value in cells.items()})
+    arrays.update({
+        'point_data/' + key: value for key, value in point_data.items()
+        })
+    arrays.update({
+        'cell_data/{}/{}'.format(key, name): value
+        for key, data in cell_data.items()
+        for name, value in data.items()
+        })
+    arrays.update({
+        'field_data/' + key: value for key, value in field_data.items()
+        })
+    # Write to a temporary file first so that interrupted runs don't leave
+    # broken cache files.
+    numpy.savez(filename + '.tmp.npz', **arrays)
+    os.rename(filename + '.tmp.npz', filename)
+    return
+
+
+def _load(filename):
+    cells = {}
+    point_data = {}
+    cell_data = {}
+    field_data = {}
+    with numpy.load(filename) as data:
+        for name in data.files:
+            path = name.split('/')
+            if path[0] == 'cells':
+                cells[path[1]] = data[name]
+            elif path[0] == 'point_data':
+                point_data[path[1]] = data[name]
+            elif path[0] == 'cell_data':
+                cell_data.setdefault(path[1], {})[path[2]] = data[name]
+            elif path[0] == 'field_data':
+                field_data[path[1]] = data[name]
+        mesh = (data['points'], cells, point_data, cell_data, field_data)
+        errors = data['errors']
+    return mesh, errors
+
+
+def _with_background_mesh(geometry, points, cells, sizes, filename):
+    # a fork of the geometry, so that the background meshes of the steps
+    # don't pile up; the shared code goes next to the background mesh
+    geom = geometry.fork(cache_dir=os.path.dirname(filename))
+    geom.add_background_mesh_from_array(
+        sizes, points=points, cells=cells, filename=filename
+        )
+    # Otherwise, the sizes at the points limit the coarsening.
+    geom.add_raw_code([
+        'Mesh.CharacteristicLengthFromPoints = 0;',
+        'Mesh.CharacteristicLengthExtendFromBoundary = 0;',
+        ])
+    return geom
+
+
+def adapt_mesh(
+        geometry, compute_errors,
+        target_error=None, max_num_cells=None,
+        order=1,
+        max_steps=10,
+        cache_dir=None,
+        **kwargs
+        ):
+    '''Meshes `geometry` repeatedly until the error is below `target_error`
+    or `max_steps` steps are done.
+
+    :param compute_errors: callback that gets the mesh (as returned by
+        :func:`pygmsh.generate_mesh`) and returns the error of each cell of
+        highest dimension (tetrahedra or triangles)
+    :param target_error: target for the :math:`\\ell^2`-norm of the cell
+        errors
+    :param max_num_cells: element budget
+    :param order: convergence order of the error in the cell size
+    :param cache_dir: If given, each step's mesh, errors, and size field are
+        stored there; a restarted run with the same geometry and options
+        resumes from the stored steps, without meshing or calling
+        `compute_errors` again.
+
+    All other keyword arguments are passed on to
+    :func:`pygmsh.generate_mesh`. Returns the last mesh.
+    '''
+    assert target_error is not None or max_num_cells is not None
+
+    prefix = None
+    if cache_dir is not None:
+        key = hashlib.sha1('{}{!r}'.format(
+            geometry.get_code_hash(),
+            (target_error, max_num_cells, order, sorted(kwargs.items()))
+            ).encode('utf-8')).hexdigest()
+        prefix = os.path.join(cache_dir, key)
+
+    # Without a cache, the files of the run go to a temporary directory that
+    # is removed at the end.
+    tmp_dir = tempfile.mkdtemp() if cache_dir is None else None
+    # The steps fork a copy: Forking locks the statements of the forked
+    # geometry, and the user's one should stay editable.
+    base = None
+    try:
+        geom = geometry
+        for step in range(max_steps):
+            if prefix is not None \
+                    and os.path.isfile('{}-{}.npz'.format(prefix, step)):
+                mesh, errors = _load('{}-{}.npz'.format(prefix, step))
+            else:
+                mesh = generate_mesh(geom, **kwargs)
+                errors = numpy.asarray(compute_errors(mesh))
+                if prefix is not None:
+                    _save('{}-{}.npz'.format(prefix, step), mesh, errors)
+
+            if target_error is not None \
+                    and numpy.sqrt(numpy.sum(errors**2)) <= target_error:
+                break
+
+            points, cells = mesh[0], mesh[1]
+            cell_type = 'tetra' if 'tetra' in cells else 'triangle'
+            c = cells[cell_type]
+            assert len(errors) == len(c)
+            sizes = new_sizes(
+                cell_sizes(points, c), errors,
+                3 if cell_type == 'tetra' else 2,
+                order=order,
+                target_error=target_error,
+                max_num_cells=max_num_cells
+                )
+
+            # node sizes: the smallest of the adjacent cells
+            node_sizes = numpy.full(len(points), sizes.max())
+            numpy.minimum.at(
+                node_sizes, c.reshape(-1), numpy.repeat(sizes, c.shape[1])
+                )
+
+            if prefix is not None:
+                filename = '{}-{}.pos'.format(prefix, step)
+            else:
+                filename = os.path.join(tmp_dir, '{}.pos'.format(step))
+            if base is None:
+                base = geometry.from_bytes(geometry.to_bytes())
+            geom = _with_background_mesh(
+                base, points, c, node_sizes, filename
+                )
+    finally:
+        if tmp_dir is not None:
+            shutil.rmtree(tmp_dir)
+
+    return mesh
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+#
+
+
+class Box(object):
+    '''The entities of a box, cf. :meth:`pygmsh.built_in.Geometry.add_box`.
+    '''
+    def __init__(
+            self, x0, x1, y0, y1, z0, z1,
+            lcar, surface_loop, volume
+            ):
+        self.x0 = x0
+        self.x1 = x1
+        self.y0 = y0
+        self.y1 = y1
+        self.z0 = z0
+        self.z1 = z1
+        self.lcar = lcar
+        self.surface_loop = surface_loop
+        self.volume = volume
+        return
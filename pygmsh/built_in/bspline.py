@@ -5,6 +5,8 @@ from .point import Point
 
 
 class Bspline(LineBase):
+    __slots__ = ('control_points',)
+
     def __init__(self, control_points):
         super(Bspline, self).__init__()
 
@@ -12,11 +14,13 @@ class Bspline(LineBase):
             assert isinstance(c, Point)
         assert len(control_points) > 1
 
-        self.control_points = control_points
+        self.control_points = list(control_points)
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
             'BSpline({}) = {{{}}};'.format(
                 self.id, ', '.join([c.id for c in self.control_points])
             )])
-        return
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+#
+
+
+class Circle(object):
+    '''The entities of a circle, cf.
+    :meth:`pygmsh.built_in.Geometry.add_circle`.
+    '''
+    def __init__(
+            self, x0, radius, lcar, R, compound, num_sections, holes,
+            line_loop, plane_surface
+            ):
+        self.x0 = x0
+        self.radius = radius
+        self.lcar = lcar
+        self.R = R
+        self.compound = compound
+        self.num_sections = num_sections
+        self.holes = holes
+        self.line_loop = line_loop
+        self.plane_surface = plane_surface
+        return
@@ -5,6 +5,8 @@ from .point import Point
 
 
 class CircleArc(LineBase):
+    __slots__ = ('start', 'center', 'end')
+
     def __init__(self, start, center, end):
         super(CircleArc, self).__init__()
 
@@ -15,10 +17,12 @@ class CircleArc(LineBase):
         self.start = start
         self.center = center
         self.end = end
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
             'Circle({}) = {{{}, {}, {}}};'.format(
-                self.id, start.id, center.id, end.id
+                self.id, self.start.id, self.center.id, self.end.id
             )])
-        return
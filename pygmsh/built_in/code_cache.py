@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+#
+'''
+The code of geometries: the statements are joined into Gmsh code and hashed
+incrementally, and forks share the code of the statements they start with.
+'''
+import copy
+import hashlib
+import os
+
+from ..helpers import _is_string
+
+from .passes import _entity_ids
+
+
+def _get_code(statement):
+    # Entities are stored as objects and only generate their code when the
+    # geometry is written out.
+    return statement if _is_string(statement) else statement.code
+
+
+class CodeCacheMixin(object):
+    '''The code cache and the forks of :class:`Geometry`.
+    '''
+    def _reset_code_cache(self):
+        self._code_cache_list = None
+        self._code_cache_len = 0
+        self._code_cache_last = None
+        # the chunks, the numbers of statements before them, and the states
+        # of the hash before them
+        self._code_cache_chunks = []
+        self._code_cache_starts = []
+        self._code_cache_hashes = []
+        self._code_cache_hash = hashlib.sha1()
+        self._code_cache_code = None
+        return
+
+    def _add_code_chunk(self, chunk, n):
+        '''Appends `chunk`, the code of the statements up to the `n`-th one,
+        to the cache.
+        '''
+        self._code_cache_starts.append(self._code_cache_len)
+        self._code_cache_hashes.append(self._code_cache_hash.copy())
+        self._code_cache_chunks.append(chunk)
+        self._code_cache_hash.update(chunk.encode('utf-8'))
+        self._code_cache_len = n
+        self._code_cache_last = self._GMSH_CODE[n-1]
+        self._code_cache_code = None
+        return
+
+    def _invalidate_code_chunk(self, code):
+        '''Drops the cached chunk that contains the (former) code `code` of a
+        statement, and the ones after it; the statements are joined and
+        hashed again from there on.
+        '''
+        chunks = self._code_cache_chunks
+        k = len(chunks) - 1
+        while k >= 0 and code not in chunks[k]:
+            k -= 1
+        if k < 0:
+            # not cached yet
+            return
+        if k == 0 or self._code_cache_list is not self._GMSH_CODE:
+            self._reset_code_cache()
+            return
+        self._code_cache_len = self._code_cache_starts[k]
+        self._code_cache_last = self._GMSH_CODE[self._code_cache_len - 1]
+        self._code_cache_hash = self._code_cache_hashes[k]
+        del chunks[k:]
+        del self._code_cache_starts[k:]
+        del self._code_cache_hashes[k:]
+        self._code_cache_code = None
+        return
+
+    def _update_code_cache(self):
+        '''Brings the cached code chunks and their hash up to date with
+        `_GMSH_CODE`.
+
+        `_GMSH_CODE` is treated as append-only: Only statements added since the
+        last call are joined and fed into the (rolling) hash. If the list was
+        replaced, shortened, or its last cached statement was swapped out, the
+        cache is rebuilt from scratch.
+        '''
+        code = self._GMSH_CODE
+        n = self._code_cache_len
+        if code is not self._code_cache_list or len(code) < n \
+                or (n > 0 and code[n-1] is not self._code_cache_last):
+            self._reset_code_cache()
+            self._code_cache_list = code
+            n = self._include_fork_base()
+
+        if len(code) == n:
+            return
+
+        chunk = '\n'.join([_get_code(s) for s in code[n:]])
+        if n > 0:
+            chunk = '\n' + chunk
+        self._add_code_chunk(chunk, len(code))
+        return
+
+    def _include_fork_base(self):
+        '''Starts the cached code with the code shared with the geometry this
+        one was forked from (an `Include` of it with a `cache_dir`), as long as
+        the statements still start with the shared ones. Returns the number of
+        statements covered.
+        '''
+        if self._fork_base is None:
+            return 0
+        statements, code, filename = self._fork_base
+        n = len(statements)
+        if len(self._GMSH_CODE) < n or any(
+                a is not b for a, b in zip(self._GMSH_CODE, statements)
+                ):
+            self._fork_base = None
+            return 0
+
+        if filename is None:
+            chunk = code
+        else:
+            self._write_fork_base()
+            chunk = 'Include "{}";'.format(filename)
+        self._add_code_chunk(chunk, n)
+        return n
+
+    def _write_fork_base(self):
+        '''Writes the shared code to the file that the code of this fork
+        includes, unless it's there.
+        '''
+        _, code, filename = self._fork_base
+        if not os.path.exists(filename):
+            # Other processes may include the file, so it appears complete.
+            tmp_filename = '{}.{}'.format(filename, os.getpid())
+            with open(tmp_filename, 'wb') as f:
+                f.write(code.encode('utf-8'))
+            os.rename(tmp_filename, filename)
+        return
+
+    def fork(self, cache_dir=None):
+        '''Returns a new geometry that starts out as this one, for variants
+        that differ by a few added entities.
+
+        The fork shares the statements and entities of this geometry instead
+        of copying or recreating them, so neither geometry may modify the
+        shared entities afterwards; adding entities to either one is fine.
+        Entity ids are global, so the ones added to different forks don't
+        collide. With `cache_dir`, the code of the shared part is written
+        once, to the file `pygmsh-<hash>.geo` in `cache_dir`, and the code of
+        the fork includes it; the file is written again if it has been
+        removed in the meantime. Otherwise, the shared code is copied into the
+        code of the fork.
+        '''
+        self._shared_ids.update(
+            _entity_ids(self._GMSH_CODE[self._num_shared:])
+            )
+        self._num_shared = len(self._GMSH_CODE)
+        # pylint: disable=protected-access
+        fork = copy.copy(self)
+        fork._shared_ids = set(self._shared_ids)
+        fork._GMSH_CODE = list(self._GMSH_CODE)
+        fork._PARAMETERS = dict(self._PARAMETERS)
+        fork._TAKEN_PHYSICALGROUP_IDS = set(self._TAKEN_PHYSICALGROUP_IDS)
+        fork._spatial_index = None
+        if self._point_index is not None:
+            fork._point_index = self._point_index.copy()
+        fork._fork_base = (
+            tuple(self._GMSH_CODE),
+            self.get_code(),
+            None if cache_dir is None else os.path.join(
+                cache_dir, 'pygmsh-{}.geo'.format(self.get_code_hash())
+                )
+            )
+        fork._reset_code_cache()
+        return fork
+
+    def get_code(self):
+        '''Returns properly formatted Gmsh code.
+
+        The code is cached; repeated calls on an unchanged geometry are cheap,
+        and after adding entities only the new statements are joined.
+        '''
+        self._update_code_cache()
+        if self._fork_base is not None and self._fork_base[2] is not None:
+            # The code includes the shared code from this file.
+            self._write_fork_base()
+        if self._code_cache_code is None:
+            # The chunks are kept, so that a modified statement only
+            # invalidates its chunk (cf. _merge_lcar()).
+            self._code_cache_code = ''.join(self._code_cache_chunks)
+        return self._code_cache_code
+
+    def get_code_hash(self):
+        '''Returns the SHA-1 hex digest of :meth:`get_code`, updated
+        incrementally as statements are added.
+        '''
+        self._update_code_cache()
+        return self._code_cache_hash.hexdigest()
@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+#
+
+
+class Command(object):
+    '''Base class of the statements that aren't entities themselves but
+    reference entities: size fields, extrusions, patterns, Boolean operations,
+    and options. Like entities, they generate their code only when the
+    geometry is written out, and the code is renamed along with the entities
+    they reference (e.g., in :meth:`Geometry.include`).
+    '''
+    __slots__ = ()
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Composition of geometries: the statements of one geometry are added to
+another one, with the entities copied under new ids and the names in the code
+statements renamed accordingly.
+'''
+import copy
+import re
+
+import numpy
+
+from ..helpers import _is_string
+
+from .command import Command
+from .extrusion import Extrusion
+from .field import Field
+from .line import Line
+from .line_base import OrientedLine
+from .option import Option
+from .point import Point
+from .serialization import _state, id_counter
+from .surface_base import OrientedSurface
+
+_OCC_FACTORY = 'SetFactory("OpenCASCADE");'
+# identifiers outside of string literals; numbers like `1e5` don't match
+_NAME = re.compile(r'"[^"]*"|\b[A-Za-z_]\w*')
+_PHYSICAL = re.compile(
+    r'^(Physical \w+\()(?:"([^"]*)"(, \d+)?|\d+)\)', re.MULTILINE
+    )
+_PARAMETER = re.compile(r'^DefineConstant\[ (\w+) = ')
+
+# names of the arrays and fields that geometries generate, by the counters
+_NAMES = [
+    ('ex', '_EXTRUDE_ID'), ('bo', '_BOOLEAN_ID'),
+    ('ar', '_ARRAY_ID'), ('field', '_FIELD_ID'),
+    ]
+
+
+def _new_id(entity):
+    counter = id_counter(entity)
+    if counter is None:
+        return None
+    cls, attr, _ = counter
+    n = getattr(cls, attr)
+    setattr(cls, attr, n + 1)
+    return re.match('[A-Za-z]+', entity.id).group(0) + str(n)
+
+
+def _new_names(geometry, other):
+    '''New names in `geometry` for the arrays and fields of `other`.'''
+    names = {}
+    for prefix, counter in _NAMES:
+        for k in range(1, getattr(other, counter, 0) + 1):
+            setattr(geometry, counter, getattr(geometry, counter) + 1)
+            names['{}{}'.format(prefix, k)] = \
+                '{}{}'.format(prefix, getattr(geometry, counter))
+    return names
+
+
+class _Copier(object):
+    '''Copies entities under new ids, together with the entities they
+    reference, and renames the ids and names in code.
+    '''
+    def __init__(self, names):
+        self.names = names
+        self._copies = {}
+        return
+
+    def rename(self, code):
+        return _NAME.sub(
+            lambda m: self.names.get(m.group(0), m.group(0)), code
+            )
+
+    def entity(self, entity):
+        e = copy.copy(entity)
+        self._copies[id(entity)] = e
+        for key, value in _state(entity).items():
+            if key != 'id':
+                setattr(e, key, self.value(value))
+        new_id = _new_id(entity)
+        e.id = self.rename(entity.id) if new_id is None else new_id
+        self.names[entity.id] = e.id
+        return e
+
+    def value(self, value):
+        if id(value) in self._copies:
+            return self._copies[id(value)]
+        if _is_string(value):
+            # Gmsh code in commands, e.g., field names
+            return self.rename(value)
+        if isinstance(value, (OrientedLine, OrientedSurface)):
+            return type(value)(self.value(value.target), value.sign)
+        if isinstance(value, (list, tuple)):
+            return type(value)(self.value(v) for v in value)
+        if hasattr(value, 'dimension') and hasattr(value, 'id'):
+            # entities that aren't statements, e.g., the results of
+            # extrusions
+            return self.entity(value)
+        return value
+
+
+def _relabel(geometry, match):
+    '''New tag for the physical group of the `_PHYSICAL` match; the names
+    are kept.
+    '''
+    # pylint: disable=protected-access
+    name = match.group(2)
+    if name is None:
+        label = geometry._new_physical_group()
+    elif match.group(3) is None:
+        label = geometry._new_physical_group(name)
+    else:
+        label = '"{}", {}'.format(name, geometry._new_physical_tag(name))
+    return '{}{})'.format(match.group(1), label)
+
+
+def _transformed(e, transform):
+    '''Applies `transform` to the copied entity `e`; returns the statements
+    that transform it in Gmsh, if any.
+    '''
+    if isinstance(e, Point):
+        # Parameters in the coordinates are kept.
+        x = e.x
+        if numpy.allclose(transform.R, numpy.eye(3)):
+            e.x = x + transform.x0
+        else:
+            e.x = transform.apply(x)
+    elif hasattr(e, 'char_length'):
+        # OpenCASCADE primitives
+        return [transform.gmsh_code('{}{{{}}};'.format(
+            'Volume' if e.dimension == 3 else 'Surface', e.id
+            )) + ';']
+    return []
+
+
+def _background_field(statements):
+    '''The name of the last background field in `statements`, or `None`.'''
+    for s in reversed(statements):
+        if isinstance(s, Field) and s.background:
+            return s.id
+    return None
+
+
+def include(geometry, other, transform=None):
+    '''Adds the statements of `other` to `geometry`, cf.
+    :meth:`Geometry.include`.
+    '''
+    # pylint: disable=protected-access
+    assert _OCC_FACTORY in geometry._GMSH_CODE \
+        or _OCC_FACTORY not in other._GMSH_CODE, \
+        'OpenCASCADE geometries can only be included in OpenCASCADE ones.'
+    if transform is not None and not numpy.allclose(transform.R, numpy.eye(3)):
+        assert not any(
+            isinstance(s, Extrusion) for s in other._GMSH_CODE
+            ), 'Extrusions can only be translated.'
+
+    copier = _Copier(_new_names(geometry, other))
+    parameters = set(geometry._PARAMETERS)
+    handles = {}
+    statements = []
+    host_background = _background_field(geometry._GMSH_CODE)
+    background = None
+    for s in other._GMSH_CODE:
+        if isinstance(s, Option):
+            statements.append(s)
+            continue
+        if not _is_string(s):
+            e = copier.entity(s)
+            if not isinstance(e, Command):
+                # Commands are mapped to their new names below.
+                handles[s.id] = e
+            statements.append(e)
+            if transform is not None:
+                statements += _transformed(e, transform)
+            _add_to_index(geometry, e)
+            if isinstance(e, Field) and e.background \
+                    and host_background is not None:
+                # combined with the one of the geometry below
+                e.background = False
+                background = e.id
+            continue
+
+        if s.startswith('// This code was created by pygmsh') \
+                or s == _OCC_FACTORY:
+            continue
+        match = _PARAMETER.match(s)
+        if match and match.group(1) in parameters:
+            # shared with the geometry
+            continue
+        statements.append(copier.rename(
+            _PHYSICAL.sub(lambda m: _relabel(geometry, m), s)
+            ))
+
+    geometry._PARAMETERS.update({
+        key: value for key, value in other._PARAMETERS.items()
+        if key not in parameters
+        })
+    geometry._GMSH_CODE.extend(statements)
+    if background is not None:
+        # the smaller size of the two
+        geometry.add_background_field([host_background, background])
+
+    handles.update({
+        key: value for key, value in copier.names.items()
+        if key not in handles
+        })
+    return handles
+
+
+def _add_to_index(geometry, e):
+    # pylint: disable=protected-access
+    if geometry._point_index is not None:
+        if isinstance(e, Point):
+            geometry._point_index.add_point(e)
+        elif type(e) is Line:  # pylint: disable=unidiomatic-typecheck
+            geometry._point_index.add_line(e)
+    return
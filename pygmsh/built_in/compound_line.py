@@ -4,14 +4,18 @@ from .line_base import LineBase
 
 
 class CompoundLine(LineBase):
+    __slots__ = ('lines',)
+
     def __init__(self, lines):
         super(CompoundLine, self).__init__()
 
-        self.lines = lines
+        self.lines = list(lines)
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
             'Compound Line({}) = {{{}}};'.format(
                 self.id, ','.join([l.id for l in self.lines])
             )])
-        return
@@ -4,15 +4,19 @@ from .surface_base import SurfaceBase
 
 
 class CompoundSurface(SurfaceBase):
+    __slots__ = ('surfaces',)
+
     def __init__(self, surfaces):
         super(CompoundSurface, self).__init__()
         self.num_edges = sum(s.num_edges for s in surfaces)
 
-        self.surfaces = surfaces
+        self.surfaces = list(surfaces)
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = news;'.format(self.id),
             'Compound Surface({}) = {{{}}};'.format(
-                self.id, ','.join([s.id for s in surfaces])
+                self.id, ','.join([s.id for s in self.surfaces])
             )])
-        return
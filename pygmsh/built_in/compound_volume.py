@@ -4,16 +4,20 @@
 
 class CompoundVolume(object):
     _ID = 0
+    dimension = 3
+    __slots__ = ('volumes', 'id')
 
     def __init__(self, volumes):
-        self.volumes = volumes
+        self.volumes = list(volumes)
 
         self.id = 'cv{}'.format(CompoundVolume._ID)
         CompoundVolume._ID += 1
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newv;'.format(self.id),
             'Compound Volume({}) = {{{}}};'.format(
-                self.id, ','.join([v.id for v in volumes])
+                self.id, ','.join([v.id for v in self.volumes])
             )])
-        return
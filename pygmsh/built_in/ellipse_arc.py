@@ -5,6 +5,8 @@ from .point import Point
 
 
 class EllipseArc(LineBase):
+    __slots__ = ('start', 'center', 'point_on_major_axis', 'end')
+
     def __init__(self, start, center, point_on_major_axis, end):
         super(EllipseArc, self).__init__()
 
@@ -17,10 +19,13 @@ class EllipseArc(LineBase):
         self.center = center
         self.point_on_major_axis = point_on_major_axis
         self.end = end
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
             'Ellipse({}) = {{{}, {}, {}, {}}};'.format(
-                self.id, start.id, center.id, point_on_major_axis.id, end.id
+                self.id, self.start.id, self.center.id,
+                self.point_on_major_axis.id, self.end.id
             )])
-        return
@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+#
+
+
+class Ellipsoid(object):
+    '''The entities of an ellipsoid, cf.
+    :meth:`pygmsh.built_in.Geometry.add_ellipsoid`.
+    '''
+    def __init__(self, x0, radii, lcar, surface_loop, volume):
+        self.x0 = x0
+        self.lcar = lcar
+        self.radii = radii
+        self.surface_loop = surface_loop
+        self.volume = volume
+        return
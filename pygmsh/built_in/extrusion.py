@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+#
+from ..helpers import _is_string
+from ..parameter import _code
+
+from .command import Command
+from .line_base import LineBase
+
+
+def _copy(x):
+    return None if x is None else list(x)
+
+
+class Extrusion(Command):
+    '''Extrusion of `entity` (a line, a surface, or Gmsh code like
+    `Surface{s0}`) by a translation and/or a rotation, cf.
+    :meth:`Geometry.extrude`; Gmsh collects the top and the extruded entity
+    in the list `id[]`.
+    '''
+    __slots__ = (
+        'id', 'entity', 'translation_axis', 'rotation_axis', 'point_on_axis',
+        'angle', 'num_layers', 'recombine'
+        )
+
+    def __init__(
+            self, id0, entity,
+            translation_axis=None,
+            rotation_axis=None,
+            point_on_axis=None,
+            angle=None,
+            num_layers=None,
+            recombine=False
+            ):
+        assert translation_axis is not None or rotation_axis is not None, \
+            'Specify at least translation or rotation.'
+        self.id = id0
+        self.entity = entity
+        self.translation_axis = _copy(translation_axis)
+        self.rotation_axis = _copy(rotation_axis)
+        self.point_on_axis = _copy(point_on_axis)
+        self.angle = angle
+        self.num_layers = num_layers
+        self.recombine = recombine
+        return
+
+    @property
+    def code(self):
+        if _is_string(self.entity):
+            entity = self.entity
+        elif isinstance(self.entity, LineBase):
+            entity = 'Line{{{}}}'.format(self.entity.id)
+        else:
+            entity = 'Surface{{{}}}'.format(self.entity.id)
+
+        # out[] = Extrude{0,1,0}{ Line{1}; };
+        if self.translation_axis is None:
+            # Only rotation
+            return '{}[] = Extrude{{{{{}}}, {{{}}}, {}}}{{{};}};'.format(
+                self.id,
+                ','.join(_code(x) for x in self.rotation_axis),
+                ','.join(_code(x) for x in self.point_on_axis),
+                _code(self.angle),
+                entity
+                )
+
+        if self.rotation_axis is not None:
+            code = '{}[] = Extrude{{{{{}}}, {{{}}}, {{{}}}, {}}}{{{};'.format(
+                self.id,
+                ','.join(_code(x) for x in self.translation_axis),
+                ','.join(_code(x) for x in self.rotation_axis),
+                ','.join(_code(x) for x in self.point_on_axis),
+                _code(self.angle),
+                entity
+                )
+        else:
+            # Only translation
+            code = '{}[] = Extrude {{{}}} {{{};'.format(
+                self.id,
+                ','.join(_code(x) for x in self.translation_axis),
+                entity
+                )
+        if self.num_layers is not None:
+            code += ' Layers{{{}}}; {}'.format(
+                _code(self.num_layers),
+                'Recombine;' if self.recombine else ''
+                )
+        # close command
+        return code + '};'
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Mesh sizes from the local feature size of the geometry.
+
+The local feature size at a point is approximated by the distance to the
+nearest other part of the curves, e.g., the opposite side of a thin slit. The
+curves are sampled, and the nearest samples are found with a k-d tree (SciPy)
+or, if SciPy isn't available, by brute force.
+'''
+import heapq
+
+import numpy
+
+from ..helpers import _is_string
+
+from .bspline import Bspline
+from .circle_arc import CircleArc
+from .ellipse_arc import EllipseArc
+from .line import Line
+from .spline import Spline
+
+
+def _segments(statements):
+    '''The curves as segments between points: the two end points and, for
+    circle arcs, the center.
+    '''
+    segments = []
+    for s in statements:
+        if _is_string(s):
+            continue
+        if isinstance(s, Line):
+            segments.append((s.points[0], s.points[1], None))
+        elif isinstance(s, CircleArc):
+            segments.append((s.start, s.end, s.center))
+        elif isinstance(s, EllipseArc):
+            segments.append((s.start, s.end, None))
+        elif isinstance(s, (Spline, Bspline)):
+            pts = s.points if isinstance(s, Spline) else s.control_points
+            segments.extend([(a, b, None) for a, b in zip(pts[:-1], pts[1:])])
+    return segments
+
+
+def _sample(x0, x1, center, t):
+    '''Points at the parameters `t` on the straight segment or the circular
+    arc (around `center`) from `x0` to `x1`.
+    '''
+    if center is not None:
+        u = x0 - center
+        v = x1 - center
+        angle = _angle(u, v)
+        if angle > 1.0e-12:
+            # spherical linear interpolation
+            a = numpy.sin((1.0 - t) * angle) / numpy.sin(angle)
+            b = numpy.sin(t * angle) / numpy.sin(angle)
+            return center + numpy.outer(a, u) + numpy.outer(b, v)
+    return numpy.outer(1.0 - t, x0) + numpy.outer(t, x1)
+
+
+def _angle(u, v):
+    cos_angle = numpy.einsum('...k,...k', u, v) / numpy.sqrt(
+        numpy.einsum('...k,...k', u, u) * numpy.einsum('...k,...k', v, v)
+        )
+    return numpy.arccos(numpy.clip(cos_angle, -1.0, 1.0))
+
+
+def _closest_points(P, A, B, C):
+    '''Closest points to the points `P` on the segments from `A` to `B`, and
+    the tangents there. Where `C` (the circle centers) isn't NaN, the
+    segments are circle arcs.
+    '''
+    # straight segments
+    tangents = B - A
+    t = numpy.einsum('ij,ij->i', P - A, tangents) / numpy.maximum(
+        numpy.einsum('ij,ij->i', tangents, tangents), numpy.finfo(float).tiny
+        )
+    Q = A + numpy.clip(t, 0.0, 1.0)[:, None] * tangents
+
+    is_arc = ~numpy.isnan(C[:, 0])
+    if numpy.any(is_arc):
+        c = C[is_arc]
+        u = A[is_arc] - c
+        v = B[is_arc] - c
+        w = P[is_arc] - c
+        # Project onto the plane of the arc, then onto the circle.
+        n = numpy.cross(u, v)
+        n /= numpy.maximum(
+            numpy.sqrt(numpy.einsum('ij,ij->i', n, n)), numpy.finfo(float).tiny
+            )[:, None]
+        w -= numpy.einsum('ij,ij->i', w, n)[:, None] * n
+        radius = numpy.sqrt(numpy.einsum('ij,ij->i', u, u))
+        norm_w = numpy.sqrt(numpy.einsum('ij,ij->i', w, w))
+        q = radius[:, None] * w / numpy.maximum(
+            norm_w, numpy.finfo(float).tiny
+            )[:, None]
+        # On the arc if q is between u and v.
+        angle = _angle(u, v)
+        on_arc = (norm_w > 0.0) \
+            & (numpy.abs(_angle(u, q) + _angle(q, v) - angle) < 1.0e-10)
+        # Otherwise the closer end point.
+        d_u = numpy.einsum('ij,ij->i', w - u, w - u)
+        d_v = numpy.einsum('ij,ij->i', w - v, w - v)
+        q = numpy.where(
+            on_arc[:, None], q, numpy.where((d_u < d_v)[:, None], u, v)
+            )
+        Q[is_arc] = c + q
+        tangents[is_arc] = numpy.cross(n, q)
+    return Q, tangents
+
+
+def _nearest(data, queries, k):
+    '''Distances and indices of the `k` nearest `data` points of each query
+    point.
+    '''
+    k = min(k, len(data))
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        dist = []
+        idx = []
+        # brute force, in chunks to bound the memory
+        for start in range(0, len(queries), 1000):
+            q = queries[start:start+1000]
+            d2 = numpy.sum((q[:, None, :] - data[None, :, :])**2, axis=2)
+            i = numpy.argsort(d2, axis=1)[:, :k]
+            idx.append(i)
+            dist.append(numpy.sqrt(numpy.take_along_axis(d2, i, axis=1)))
+        return numpy.concatenate(dist), numpy.concatenate(idx)
+
+    dist, idx = cKDTree(data).query(queries, k=k)
+    return dist.reshape(len(queries), k), idx.reshape(len(queries), k)
+
+
+def local_feature_size(statements, min_angle=numpy.pi/4, num_candidates=32):
+    '''Approximate local feature size at the points on the curves of the
+    geometry `statements`: the distance to the nearest curve segment, except
+    for the segments that end in the point and those whose closest point is
+    seen at an angle smaller than `min_angle` to the segment there. The
+    excluded segments continue the curves through the point, while the
+    opposite side of a thin feature is seen at right angles.
+
+    The candidate segments are the ones of the `num_candidates` nearest curve
+    samples. Returns the points and the feature sizes (`inf` where no
+    candidate is found).
+    '''
+    segments = _segments(statements)
+    if not segments:
+        return [], numpy.array([])
+
+    # all points on curves
+    points = []
+    index = {}
+    for a, b, _ in segments:
+        for p in [a, b]:
+            if id(p) not in index:
+                index[id(p)] = len(points)
+                points.append(p)
+    X = numpy.array([p.x for p in points], dtype=float)
+    ends = numpy.array([[index[id(a)], index[id(b)]] for a, b, _ in segments])
+    centers = numpy.array([
+        [numpy.nan] * 3 if c is None else c.x for _, _, c in segments
+        ], dtype=float)
+
+    # Sample the segments with about the median segment length / 4.
+    lengths = numpy.sqrt(numpy.sum((X[ends[:, 1]] - X[ends[:, 0]])**2, axis=1))
+    spacing = 0.25 * numpy.median(lengths)
+    if spacing == 0.0:
+        spacing = 1.0
+    nums = numpy.minimum(
+        numpy.maximum(numpy.ceil(lengths / spacing).astype(int), 1), 1000
+        )
+    samples = numpy.concatenate([
+        _sample(
+            X[i], X[j], None if numpy.isnan(c[0]) else c,
+            (numpy.arange(n) + 0.5) / n
+            )
+        for (i, j), c, n in zip(ends, centers, nums)
+        ])
+    sample_segment = numpy.repeat(numpy.arange(len(segments)), nums)
+
+    # candidate pairs of points and segments
+    _, idx = _nearest(samples, X, num_candidates)
+    pairs = numpy.column_stack([
+        numpy.repeat(numpy.arange(len(X)), idx.shape[1]),
+        sample_segment[idx].flatten()
+        ])
+    pairs = pairs[numpy.lexsort(pairs.T[::-1])]
+    is_new = numpy.ones(len(pairs), dtype=bool)
+    is_new[1:] = numpy.any(pairs[1:] != pairs[:-1], axis=1)
+    i, s = pairs[is_new].T
+    # Skip the segments that end in the point.
+    keep = (ends[s, 0] != i) & (ends[s, 1] != i)
+    i, s = i[keep], s[keep]
+
+    Q, tangents = _closest_points(
+        X[i], X[ends[s, 0]], X[ends[s, 1]], centers[s]
+        )
+    dist = numpy.sqrt(numpy.einsum('ij,ij->i', Q - X[i], Q - X[i]))
+    angle = _angle(Q - X[i], tangents)
+    is_seen = (dist > 0.0) \
+        & (numpy.minimum(angle, numpy.pi - angle) >= min_angle)
+
+    lfs = numpy.full(len(X), numpy.inf)
+    numpy.minimum.at(lfs, i[is_seen], dist[is_seen])
+    return points, lfs
+
+
+def graded_sizes(X, sizes, edges, growth_rate):
+    '''Limits the sizes such that they grow by at most `growth_rate - 1` times
+    the distance along the edges `edges` (pairs of point indices).
+    '''
+    i, j = edges[:, 0], edges[:, 1]
+    slope = (growth_rate - 1.0) * numpy.sqrt(
+        numpy.sum((X[i] - X[j])**2, axis=1)
+        )
+    neighbors = [[] for _ in range(len(sizes))]
+    for a, b, s in zip(i, j, slope):
+        neighbors[a].append((b, s))
+        neighbors[b].append((a, s))
+
+    # Dijkstra-style, starting from all points: The smallest size in the
+    # heap is final.
+    sizes = sizes.copy()
+    heap = [(size, k) for k, size in enumerate(sizes) if size < numpy.inf]
+    heapq.heapify(heap)
+    while heap:
+        size, k = heapq.heappop(heap)
+        if size > sizes[k]:
+            # outdated entry
+            continue
+        for n, s in neighbors[k]:
+            if size + s < sizes[n]:
+                sizes[n] = size + s
+                heapq.heappush(heap, (sizes[n], n))
+    return sizes
+
+
+def graded_lcar(statements, num_cells_across, growth_rate, lcar_max=None):
+    '''Mesh sizes for the points on curves: the local feature size divided by
+    `num_cells_across`, between the current size of the point and `lcar_max`
+    (default: the diameter of the geometry), and graded with `growth_rate`
+    along the curves and between nearby points. Points without a size get
+    `inf`. Returns the points and the sizes.
+    '''
+    points, lfs = local_feature_size(statements)
+    if not points:
+        return points, lfs
+
+    X = numpy.array([p.x for p in points], dtype=float)
+    current = numpy.array([
+        numpy.inf if p.lcar is None else p.lcar for p in points
+        ])
+    if lcar_max is None:
+        lcar_max = numpy.max(X.max(axis=0) - X.min(axis=0))
+
+    sizes = numpy.minimum(lfs / num_cells_across, lcar_max)
+    sizes = numpy.where(
+        numpy.isfinite(current), numpy.maximum(sizes, current), numpy.inf
+        )
+
+    # grading edges: the segments and the nearest neighbors
+    _, idx = _nearest(X, X, 9)
+    index = {id(p): k for k, p in enumerate(points)}
+    edges = numpy.concatenate([
+        numpy.column_stack([
+            numpy.repeat(numpy.arange(len(X)), idx.shape[1]), idx.flatten()
+            ]),
+        numpy.array([
+            [index[id(a)], index[id(b)]] for a, b, _ in _segments(statements)
+            ])
+        ])
+    return points, graded_sizes(X, sizes, edges, growth_rate)
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+from ..helpers import _is_string
+from ..parameter import _code
+
+from .command import Command
+
+
+class Field(Command):
+    '''The mesh size field `id` of the type `field_type` with the `options`, a
+    list of pairs of option names and values. The values are numbers, lists
+    of entities or field names, or Gmsh code (e.g., field names); options
+    with the value `None` or an empty list are skipped. With `background`,
+    the field is the background field.
+    '''
+    __slots__ = ('id', 'field_type', 'options', 'background')
+
+    def __init__(self, id0, field_type, options=None, background=False):
+        self.id = id0
+        self.field_type = field_type
+        self.options = [
+            (key, list(value) if isinstance(value, (list, tuple)) else value)
+            for key, value in (options or [])
+            if value is not None and (
+                not isinstance(value, (list, tuple)) or len(value) > 0
+                )
+            ]
+        self.background = background
+        return
+
+    def option(self, key, default=None):
+        for k, value in self.options:
+            if k == key:
+                return value
+        return default
+
+    @property
+    def code(self):
+        code = [
+            '{} = newf;'.format(self.id),
+            'Field[{}] = {};'.format(self.id, self.field_type),
+            ]
+        for key, value in self.options:
+            if isinstance(value, list):
+                value = '{{{}}}'.format(', '.join([
+                    v if _is_string(v) else v.id for v in value
+                    ]))
+            code.append(
+                'Field[{}].{} = {};'.format(self.id, key, _code(value))
+                )
+        if self.background:
+            code.append('Background Field = {};'.format(self.id))
+        return '\n'.join(code)
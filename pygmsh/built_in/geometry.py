@@ -18,50 +18,219 @@ points, c1, c2, etc. for circles and so on.
 import numpy
 
 from ..__about__ import __version__
-from ..helpers import _is_string
-
+from ..helpers import _is_string, simplify_polyline
+from ..parameter import Parameter, _code, _dtype
+
+from . import composition
+from . import passes
+from . import serialization
+from . import validation
+from .box import Box
 from .bspline import Bspline
+from .circle import Circle
 from .circle_arc import CircleArc
+from .code_cache import CodeCacheMixin
 from .compound_line import CompoundLine
 from .compound_surface import CompoundSurface
 from .compound_volume import CompoundVolume
 from .dummy import Dummy
 from .ellipse_arc import EllipseArc
+from .ellipsoid import Ellipsoid
+from .extrusion import Extrusion
 from .line import Line
 from .line_base import LineBase
 from .line_loop import LineLoop
+from .passes import _referenced, _target, _textual_references
+from .pattern import PatternsMixin
 from .plane_surface import PlaneSurface
 from .point import Point
+from .point_index import PointIndex
+from .polygon import Polygon
+from .size_fields import SizeFieldsMixin
 from .spline import Spline
 from .surface import Surface
 from .surface_base import SurfaceBase
 from .surface_loop import SurfaceLoop
+from .tubes import TubesMixin
 from .volume import Volume
 from .volume_base import VolumeBase
 
 
-class Geometry(object):
-    def __init__(self, gmsh_major_version=3):
+def _simplified(points, max_deviation):
+    '''The `points` that :func:`pygmsh.simplify_polyline` keeps, and the
+    dropped ones.
+    '''
+    idx = simplify_polyline([p.x for p in points], max_deviation)
+    kept = [points[k] for k in idx]
+    kept_ids = set(id(p) for p in kept)
+    return kept, [p for p in points if id(p) not in kept_ids]
+
+
+class Geometry(
+        CodeCacheMixin, PatternsMixin, SizeFieldsMixin, TubesMixin
+        ):
+    def __init__(self, gmsh_major_version=3, merge_tolerance=None):
+        '''
+        :param merge_tolerance: If given, :meth:`add_point` returns an existing
+            point if there is one closer than `merge_tolerance` (with the
+            smaller one of the two mesh sizes), and
+            :meth:`add_line` returns the existing line (reversed if necessary)
+            if the two end points are already connected by one.
+        '''
         self._EXTRUDE_ID = 0
         self._BOOLEAN_ID = 0
         self._ARRAY_ID = 0
         self._FIELD_ID = 0
+        self._PARAMETERS = {}
+        # statements shared with forks and the ids of their entities, cf.
+        # fork()
+        self._num_shared = 0
+        self._shared_ids = set()
+        self._fork_base = None
         self._GMSH_MAJOR = gmsh_major_version
-        self._TAKEN_PHYSICALGROUP_IDS = []
+        self._TAKEN_PHYSICALGROUP_IDS = set()
+        self._MAX_PHYSICALGROUP_ID = 0
         self._GMSH_CODE = [
             '// This code was created by pygmsh v{}.'.format(__version__)
             ]
+        self._reset_code_cache()
+        self._point_index = \
+            None if merge_tolerance is None else PointIndex(merge_tolerance)
+        # built on the first query, cf. query_box()
+        self._spatial_index = None
+        return
+
+    def __getstate__(self):
+        # The code cache and the spatial index are rebuilt when needed (and
+        # hash objects can't be pickled).
+        state = {
+            key: value for key, value in self.__dict__.items()
+            if not key.startswith('_code_cache_')
+            }
+        state['_spatial_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._reset_code_cache()
+        serialization.reserve_ids(
+            [s for s in self._GMSH_CODE if not _is_string(s)]
+            )
+        return
+
+    def include(self, other, transform=None):
+        '''Adds the entities and statements of the geometry `other`, e.g., a
+        sub-assembly built in another function or process, to this one, in
+        time linear in their number. The entities are copied under new ids,
+        and the names of extrusions, Booleans, arrays and fields as well as
+        the tags of physical groups are renamed such that they don't collide
+        with the ones of this geometry. Parameters of the same name are
+        shared. If both geometries set a background field, the smaller size
+        of the two is used (a `Min` field). `other` is left unchanged.
+
+        If given, the :class:`pygmsh.Transform` `transform` is applied to the
+        points (keeping parameters in their coordinates) and the OpenCASCADE
+        primitives of `other`; size fields aren't transformed, and extrusions
+        only by translations.
+
+        Returns a dict from the ids and names in `other` to the new entities
+        and names.
+        '''
+        return composition.include(self, other, transform)
+
+    def to_bytes(self):
+        '''Returns a compact serialization of the geometry: its entities as a
+        flat table, as compressed JSON. Cheaper than pickling the entity
+        graph, e.g., for sending geometries to worker processes. Recreate the
+        geometry with :meth:`from_bytes`; a fork is written out in full.
+        '''
+        return serialization.dumps(self)
+
+    @staticmethod
+    def from_bytes(data):
+        '''Recreates a geometry from :meth:`to_bytes`. The entities keep their
+        ids; entities created afterwards get other ones.
+        '''
+        return serialization.loads(data)
+
+    def optimize(
+            self,
+            eliminate_unused=True,
+            deduplicate=True,
+            reorder=True,
+            dim=None
+            ):
+        '''Runs optimization passes over the recorded statements before they
+        are emitted, cf. :mod:`pygmsh.built_in.passes`:
+
+        :param eliminate_unused: Remove unused loops and entities of dimension
+            lower than `dim` that no entity of dimension `dim` (default: the
+            highest present) depends on. Entities referenced in raw code,
+            physical groups, fields etc. are kept.
+        :param deduplicate: Replace entities identical to earlier ones by
+            aliases.
+        :param reorder: Order entities canonically (points, curves, loops,
+            surfaces, volumes).
+
+        Call this after the geometry is complete; removed entities can no
+        longer be referenced.
+        '''
+        statements = self._GMSH_CODE
+        if eliminate_unused:
+            statements = passes.eliminate_unused(statements, dim=dim)
+        if reorder:
+            statements = passes.canonical_order(statements)
+        if deduplicate:
+            statements = passes.deduplicate(statements)
+        self._GMSH_CODE = statements
+        return
+
+    def validate(self):
+        '''Checks the geometry for errors that Gmsh would only find after it
+        has started, cf. :mod:`pygmsh.built_in.validation`: references to
+        entities that aren't defined before, line and surface loops that
+        aren't closed, and holes of plane surfaces that aren't inside of the
+        outer line loop or that overlap each other. Raises an
+        `AssertionError` listing the problems.
+        '''
+        errors = validation.check(self._GMSH_CODE)
+        assert not errors, '\n'.join(errors)
         return
 
-    def get_code(self):
-        '''Returns properly formatted Gmsh code.
+    def _updated_spatial_index(self):
+        # spatial_index imports the OpenCASCADE entities, whose geometry
+        # derives from this one
+        # pylint: disable=cyclic-import
+        from ..spatial_index import SpatialIndex
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex()
+        self._spatial_index.update(self._GMSH_CODE)
+        return self._spatial_index
+
+    def query_box(self, lower, upper, dim=None):
+        '''Returns the entities (points, curves, surfaces, volumes) whose
+        bounding boxes intersect the box from `lower` to `upper`, in the order
+        in which they were added; only the ones of dimension `dim` if given.
+        Entities that are only known from code, like the results of
+        extrusions, aren't found.
+
+        The bounding boxes are kept in a spatial index that is updated with
+        the entities added since the last query, cf.
+        :mod:`pygmsh.spatial_index`.
         '''
-        return '\n'.join(self._GMSH_CODE)
+        return self._updated_spatial_index().query_box(lower, upper, dim=dim)
+
+    def nearest(self, x, dim=None):
+        '''Returns the entity, of dimension `dim` if given, whose bounding box
+        is closest to `x`, or `None` if there is none; cf. :meth:`query_box`.
+        For points, this is the closest point.
+        '''
+        return self._updated_spatial_index().nearest(x, dim=dim)
 
     # All of the add_* method below could be replaced by
     #
     #   def add(self, entity):
-    #       self._GMSH_CODE.append(entity.code)
+    #       self._GMSH_CODE.append(entity)
     #       return entity
     #
     # to be used like
@@ -76,95 +245,198 @@ class Geometry(object):
     #
     # in which case the circle code never gets added to geom.
 
-    def add_bspline(self, *args, **kwargs):
-        p = Bspline(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+    def add_bspline(self, control_points, max_deviation=None):
+        '''Adds a B-spline with the given control points.
+
+        :param max_deviation: If given, control points are dropped as long as
+            all given ones are within `max_deviation` of the control polygon
+            through the remaining ones, cf. :func:`pygmsh.simplify_polyline`.
+            For dense input, like scanned profiles, this gives a curve whose
+            mesh size is determined by the sizes of the points only. The
+            dropped points are removed from the geometry unless something
+            else references them.
+        '''
+        if max_deviation is not None:
+            control_points, dropped = \
+                _simplified(control_points, max_deviation)
+            self._remove_unused_points(dropped)
+        p = Bspline(control_points)
+        self._GMSH_CODE.append(p)
         return p
 
+    def _remove_unused_points(self, points):
+        '''Removes the `points` from the statements unless later statements
+        reference them or they are shared with forks. Only the statements
+        from the first one of the points on are looked at, so removing points
+        that were just added is cheap.
+        '''
+        candidates = set(id(p) for p in points)
+        code = self._GMSH_CODE
+        start = len(code)
+        num_found = 0
+        while start > self._num_shared and num_found < len(candidates):
+            start -= 1
+            if id(code[start]) in candidates:
+                num_found += 1
+        tail = code[start:]
+
+        names = _textual_references(tail)
+        used = set()
+        for s in tail:
+            if not _is_string(s):
+                used.update(id(e) for e in _referenced(s))
+        unused = set(
+            id(s) for s in tail
+            if id(s) in candidates and id(s) not in used and s.id not in names
+            )
+        if not unused:
+            return
+
+        code[start:] = [s for s in tail if id(s) not in unused]
+        if self._point_index is not None:
+            for p in points:
+                if id(p) in unused:
+                    self._point_index.remove_point(p)
+        # Statements were removed.
+        self._reset_code_cache()
+        return
+
     def add_circle_arc(self, *args, **kwargs):
         p = CircleArc(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_compound_line(self, *args, **kwargs):
         e = CompoundLine(*args, **kwargs)
-        self._GMSH_CODE.append(e.code)
+        self._GMSH_CODE.append(e)
         return e
 
     def add_compound_surface(self, *args, **kwargs):
         e = CompoundSurface(*args, **kwargs)
-        self._GMSH_CODE.append(e.code)
+        self._GMSH_CODE.append(e)
         return e
 
     def add_compound_volume(self, *args, **kwargs):
         e = CompoundVolume(*args, **kwargs)
-        self._GMSH_CODE.append(e.code)
+        self._GMSH_CODE.append(e)
         return e
 
     def add_ellipse_arc(self, *args, **kwargs):
         p = EllipseArc(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
-    def add_line(self, *args, **kwargs):
-        p = Line(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+    def add_line(self, p0, p1):
+        if self._point_index is not None:
+            line = self._point_index.find_line(p0, p1)
+            if line is not None:
+                return line
+        p = Line(p0, p1)
+        if self._point_index is not None:
+            self._point_index.add_line(p)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_line_loop(self, *args, **kwargs):
         p = LineLoop(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_plane_surface(self, *args, **kwargs):
         p = PlaneSurface(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
+        return p
+
+    def parameter(self, name, value):
+        '''Adds the parameter `name` with the default `value`, written to the
+        Gmsh code as `DefineConstant`. The returned :class:`pygmsh.Parameter`
+        is a float that can be used wherever numbers are accepted; it and the
+        results of arithmetic with it are written to the code as expressions,
+        such that meshes for other values can be generated from the same code
+        with `pygmsh.generate_mesh(geom, parameters={name: other_value})`.
+        The name must not be one of the names of the entities (`p0`, `l1`,
+        etc.).
+        '''
+        assert name not in self._PARAMETERS, \
+            'Parameter \'{}\' already exists.'.format(name)
+        p = Parameter(name, value)
+        self._PARAMETERS[name] = p
+        self._GMSH_CODE.append(
+            'DefineConstant[ {} = {} ];'.format(name, _code(value))
+            )
         return p
 
-    def add_point(self, *args, **kwargs):
-        p = Point(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+    def add_point(self, x, lcar=None):
+        if self._point_index is not None:
+            p = self._point_index.find_point(x)
+            if p is not None:
+                self._merge_lcar(p, lcar)
+                return p
+        p = Point(x, lcar)
+        if self._point_index is not None:
+            self._point_index.add_point(p)
+        self._GMSH_CODE.append(p)
         return p
 
-    def add_spline(self, *args, **kwargs):
-        p = Spline(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+    def _merge_lcar(self, p, lcar):
+        '''Gives the existing point `p`, which a new point with the mesh size
+        `lcar` is merged into, the smaller one of the two sizes.
+        '''
+        if lcar is None or (p.lcar is not None and p.lcar <= lcar):
+            return
+        assert p.id not in self._shared_ids, \
+            'The point is shared with forks and can\'t be modified.'
+        code = p.code
+        p.lcar = lcar
+        self._invalidate_code_chunk(code)
+        return
+
+    def add_spline(self, points, max_deviation=None):
+        '''Adds a spline through the given points.
+
+        :param max_deviation: If given, points are dropped as long as all
+            given ones are within `max_deviation` of the polyline through the
+            remaining ones, cf. :meth:`add_bspline`.
+        '''
+        if max_deviation is not None:
+            points, dropped = _simplified(points, max_deviation)
+            self._remove_unused_points(dropped)
+        p = Spline(points)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_surface(self, *args, **kwargs):
         s = Surface(*args, api_level=self._GMSH_MAJOR, **kwargs)
-        self._GMSH_CODE.append(s.code)
+        self._GMSH_CODE.append(s)
         return s
 
     def add_surface_loop(self, *args, **kwargs):
         e = SurfaceLoop(*args, **kwargs)
-        self._GMSH_CODE.append(e.code)
+        self._GMSH_CODE.append(e)
         return e
 
     def add_volume(self, *args, **kwargs):
         e = Volume(*args, **kwargs)
-        self._GMSH_CODE.append(e.code)
+        self._GMSH_CODE.append(e)
         return e
 
-    def _new_physical_group(self, label=None):
+    def _new_physical_tag(self, label=None):
         # See
         # https://github.com/nschloe/pygmsh/issues/46#issuecomment-286684321
-        # for context.
-        max_id = \
-            0 if not self._TAKEN_PHYSICALGROUP_IDS  \
-            else max(self._TAKEN_PHYSICALGROUP_IDS)
-
-        if label is None:
-            label = max_id + 1
+        # for context. Named groups get the next free tag, too.
+        if not isinstance(label, int):
+            assert label is None or _is_string(label)
+            label = self._MAX_PHYSICALGROUP_ID + 1
+        assert label not in self._TAKEN_PHYSICALGROUP_IDS
+        self._TAKEN_PHYSICALGROUP_IDS.add(label)
+        self._MAX_PHYSICALGROUP_ID = max(self._MAX_PHYSICALGROUP_ID, label)
+        return label
 
-        if isinstance(label, int):
-            assert label not in self._TAKEN_PHYSICALGROUP_IDS
-            self._TAKEN_PHYSICALGROUP_IDS += [label]
-            return str(label)
-
-        assert _is_string(label)
-        self._TAKEN_PHYSICALGROUP_IDS += [max_id + 1]
-        return '"{}"'.format(label)
+    def _new_physical_group(self, label=None):
+        tag = self._new_physical_tag(label)
+        if _is_string(label):
+            return '"{}"'.format(label)
+        return str(tag)
 
     def _add_physical(self, tpe, entities, label=None):
         label = self._new_physical_group(label)
@@ -176,6 +448,31 @@ class Geometry(object):
             ))
         return
 
+    def _add_physicals(self, tpe, groups):
+        if isinstance(groups, dict):
+            groups = groups.items()
+        tags = {}
+        code = []
+        for label, entities in groups:
+            tag = self._new_physical_tag(label)
+            tags[label] = tag
+            if not isinstance(entities, list):
+                entities = [entities]
+            name = str(tag)
+            if _is_string(label):
+                name = '"{}"'.format(label)
+                # Give the tag explicitly such that it's the returned one;
+                # gmsh 2 doesn't support that.
+                if self._GMSH_MAJOR >= 3:
+                    name += ', {}'.format(tag)
+            code.append('Physical {}({}) = {{{}}};'.format(
+                tpe, name, ', '.join([e.id for e in entities])
+                ))
+        # one statement for all groups
+        if code:
+            self._GMSH_CODE.append('\n'.join(code))
+        return tags
+
     def add_physical_point(self, points, label=None):
         self._add_physical('Point', points, label=label)
         return
@@ -192,6 +489,34 @@ class Geometry(object):
         self._add_physical('Volume', volumes, label=label)
         return
 
+    def add_physical_points(self, groups):
+        '''Adds many physical groups at once, from a dict (or a list of
+        pairs) `groups` that maps the labels, integers or strings, to the
+        points of the groups.
+
+        Returns a dict from the labels to the numeric tags, as they appear in
+        the mesh.
+        '''
+        return self._add_physicals('Point', groups)
+
+    def add_physical_lines(self, groups):
+        '''Adds many physical groups of lines at once, cf.
+        :meth:`add_physical_points`.
+        '''
+        return self._add_physicals('Line', groups)
+
+    def add_physical_surfaces(self, groups):
+        '''Adds many physical groups of surfaces at once, cf.
+        :meth:`add_physical_points`.
+        '''
+        return self._add_physicals('Surface', groups)
+
+    def add_physical_volumes(self, groups):
+        '''Adds many physical groups of volumes at once, cf.
+        :meth:`add_physical_points`.
+        '''
+        return self._add_physicals('Volume', groups)
+
     def set_transfinite_lines(self, lines, size):
         self._GMSH_CODE.append(
             'Transfinite Line {{{0}}} = {1};'.format(', '.join([l.id for l in lines]), size
@@ -199,6 +524,8 @@ class Geometry(object):
         return
 
     def set_transfinite_surface(self, surface, size=None):
+        # A reversed surface (e.g., `-surface`) is meshed like the surface.
+        surface = _target(surface)
         assert surface.num_edges == 4, \
             'a transfinite surface can only have 4 sides'
         # size is not mandatory because in general a user can create it's own
@@ -218,6 +545,35 @@ class Geometry(object):
             )
         return
 
+    def _set_periodic(self, tpe, slaves, masters, transform):
+        code = 'Periodic {} {{{}}} = {{{}}}'.format(
+            tpe,
+            ', '.join([s.id for s in slaves]),
+            ', '.join([m.id for m in masters])
+            )
+        if transform is not None:
+            code += ' ' + transform.gmsh_transformation()
+        self._GMSH_CODE.append(code + ';')
+        return
+
+    def set_periodic_lines(self, slaves, masters, transform=None):
+        '''Makes the mesh on the lines `slaves` the image of the mesh on the
+        lines `masters` under the :class:`pygmsh.Transform` `transform`.
+        Without `transform`, the lines are matched by their orientation (the
+        signs of the ids).
+        '''
+        assert len(slaves) == len(masters)
+        self._set_periodic('Line', slaves, masters, transform)
+        return
+
+    def set_periodic_surfaces(self, slaves, masters, transform):
+        '''Makes the mesh on the surfaces `slaves` the image of the mesh on the
+        surfaces `masters` under the :class:`pygmsh.Transform` `transform`.
+        '''
+        assert len(slaves) == len(masters)
+        self._set_periodic('Surface', slaves, masters, transform)
+        return
+
     def add_circle(
             self,
             x0, radius, lcar,
@@ -225,9 +581,13 @@ class Geometry(object):
             compound=False,
             num_sections=3,
             holes=None,
-            make_surface=True
+            make_surface=True,
+            transform=None
             ):
         '''Add circle in the :math:`x`-:math:`y`-plane.
+
+        If given, the :class:`pygmsh.Transform` `transform` is applied to the
+        circle after it has been placed.
         '''
         if holes is None:
             holes = []
@@ -236,7 +596,9 @@ class Geometry(object):
 
         # Define points that make the circle (midpoint and the four cardinal
         # directions).
-        X = numpy.zeros((num_sections+1, len(x0)))
+        # Keep parameters in the coordinates.
+        dtype = _dtype(x0, radius)
+        X = numpy.zeros((num_sections+1, len(x0))).astype(dtype)
         if num_sections == 4:
             # For accuracy, the points are provided explicitly.
             X[1:, [0, 1]] = numpy.array([
@@ -244,7 +606,7 @@ class Geometry(object):
                 [0.0, radius],
                 [-radius, 0.0],
                 [0.0, -radius]
-                ])
+                ], dtype=dtype)
         else:
             X[1:, [0, 1]] = numpy.array([
                 [
@@ -252,15 +614,18 @@ class Geometry(object):
                     radius*numpy.sin(2*numpy.pi * k / num_sections),
                 ]
                 for k in range(num_sections)
-                ])
+                ], dtype=dtype)
 
         # Apply the transformation.
         # TODO assert that the transformation preserves circles
         if R is not None:
-            X = [numpy.dot(R, x) + x0 for x in X]
+            X = numpy.dot(X, numpy.asarray(R).T)
 
         X += x0
 
+        if transform is not None:
+            X = transform.apply(X)
+
         # Add Gmsh Points.
         p = [self.add_point(x, lcar) for x in X]
 
@@ -281,22 +646,6 @@ class Geometry(object):
         else:
             plane_surface = None
 
-        class Circle(object):
-            def __init__(
-                    self, x0, radius, lcar, R, compound, num_sections, holes,
-                    line_loop, plane_surface
-                    ):
-                self.x0 = x0
-                self.radius = radius
-                self.lcar = lcar
-                self.R = R
-                self.compound = compound
-                self.num_sections = num_sections
-                self.holes = holes
-                self.line_loop = line_loop
-                self.plane_surface = plane_surface
-                return
-
         return Circle(
             x0, radius, lcar, R, compound, num_sections, holes,
             line_loop, plane_surface
@@ -320,60 +669,25 @@ class Geometry(object):
         '''
         self._EXTRUDE_ID += 1
 
-        if _is_string(input_entity):
-            entity = Dummy(input_entity)
-        elif isinstance(input_entity, SurfaceBase):
-            entity = Dummy('Surface{{{}}}'.format(input_entity.id))
+        if _is_string(input_entity) or isinstance(input_entity, SurfaceBase):
+            entity = input_entity
         elif hasattr(input_entity, 'surface'):
-            entity = Dummy('Surface{{{}}}'.format(input_entity.surface.id))
+            entity = input_entity.surface
         else:
             assert isinstance(input_entity, LineBase), \
                 'Illegal extrude entity.'
-            entity = Dummy('Line{{{}}}'.format(input_entity.id))
+            entity = input_entity
 
-        # out[] = Extrude{0,1,0}{ Line{1}; };
         name = 'ex{}'.format(self._EXTRUDE_ID)
-        if translation_axis is not None:
-            if rotation_axis is not None:
-                extrusion_string = \
-                    '{}[] = Extrude{{{{{}}}, {{{}}}, {{{}}}, {}}}{{{};'.format(
-                        name,
-                        ','.join(repr(x) for x in translation_axis),
-                        ','.join(repr(x) for x in rotation_axis),
-                        ','.join(repr(x) for x in point_on_axis),
-                        angle,
-                        entity.id
-                    )
-            else:
-                # Only translation
-                extrusion_string = \
-                    '{}[] = Extrude {{{}}} {{{};'.format(
-                        name,
-                        ','.join(repr(x) for x in translation_axis),
-                        entity.id
-                    )
-
-            if num_layers is not None:
-                extrusion_string += \
-                    ' Layers{{{}}}; {}'.format(
-                        num_layers,
-                        'Recombine;' if recombine else ''
-                    )
-            # close command
-            extrusion_string += '};'
-            self._GMSH_CODE.append(extrusion_string)
-        else:
-            assert rotation_axis is not None, \
-                'Specify at least translation or rotation.'
-            # Only rotation
-            self._GMSH_CODE.append(
-                '{}[] = Extrude{{{{{}}}, {{{}}}, {}}}{{{};}};'.format(
-                    name,
-                    ','.join(repr(x) for x in rotation_axis),
-                    ','.join(repr(x) for x in point_on_axis),
-                    angle,
-                    entity.id
-                ))
+        self._GMSH_CODE.append(Extrusion(
+            name, entity,
+            translation_axis=translation_axis,
+            rotation_axis=rotation_axis,
+            point_on_axis=point_on_axis,
+            angle=angle,
+            num_layers=num_layers,
+            recombine=recombine
+            ))
 
         # From <https://www.manpagez.com/info/gmsh/gmsh-2.4.0/gmsh_66.php>:
         #
@@ -412,82 +726,6 @@ class Geometry(object):
 
         return top, extruded, lat
 
-    def add_boundary_layer(
-            self,
-            edges_list=None,
-            faces_list=None,
-            nodes_list=None,
-            anisomax=None,
-            hfar=None,
-            hwall_n=None,
-            ratio=None,
-            thickness=None
-            ):
-        # Don't use [] as default argument, cf.
-        # <https://stackoverflow.com/a/113198/353337>
-        if edges_list is None:
-            edges_list = []
-        if faces_list is None:
-            faces_list = []
-        if nodes_list is None:
-            nodes_list = []
-
-        self._FIELD_ID += 1
-        name = 'field{}'.format(self._FIELD_ID)
-
-        self._GMSH_CODE.append('{} = newf;'.format(name))
-
-        self._GMSH_CODE.append('Field[{}] = BoundaryLayer;'.format(name))
-        if edges_list:
-            self._GMSH_CODE.append(
-                'Field[{}].EdgesList = {{{}}};'.format(
-                    name, ','.join([e.id for e in edges_list])
-                ))
-        if faces_list:
-            self._GMSH_CODE.append(
-                'Field[{}].FacesList = {{{}}};'.format(
-                    name, ','.join(faces_list)
-                ))
-        if nodes_list:
-            self._GMSH_CODE.append(
-                'Field[{}].NodesList = {{{}}};'.format(
-                    name, ','.join([n.id for n in nodes_list])
-                ))
-        if hfar:
-            self._GMSH_CODE.append('Field[{}].hfar= {!r};'.format(name, hfar))
-        if hwall_n:
-            self._GMSH_CODE.append(
-                'Field[{}].hwall_n= {!r};'.format(name, hwall_n)
-                )
-        if ratio:
-            self._GMSH_CODE.append(
-                'Field[{}].ratio= {!r};'.format(name, ratio)
-                )
-        if thickness:
-            self._GMSH_CODE.append(
-                'Field[{}].thickness= {!r};'.format(name, thickness)
-                )
-        if anisomax:
-            self._GMSH_CODE.append(
-                'Field[{}].AnisoMax= {!r};'.format(name, anisomax)
-                )
-        return name
-
-    def add_background_field(self, fields, aggregation_type='Min'):
-        self._FIELD_ID += 1
-        name = 'field{}'.format(self._FIELD_ID)
-        self._GMSH_CODE.append('{} = newf;'.format(name))
-        self._GMSH_CODE.append(
-            'Field[{}] = {};'.format(name, aggregation_type)
-            )
-        self._GMSH_CODE.append(
-            'Field[{}].FieldsList = {{{}}};'.format(name, ', '.join(fields))
-            )
-        self._GMSH_CODE.append(
-            'Background Field = {};'.format(name)
-            )
-        return name
-
     def add_comment(self, string):
         self._GMSH_CODE.append('// ' + string)
         return
@@ -518,19 +756,28 @@ class Geometry(object):
             make_surface=make_surface
             )
 
-    class Polygon(object):
-        def __init__(self, line_loop, surface, lcar):
-            self.line_loop = line_loop
-            self.surface = surface
-            self.lcar = lcar
-            return
+    # kept for backwards compatibility
+    Polygon = Polygon
 
-    def add_polygon(self, X, lcar, holes=None, make_surface=True):
+    def add_polygon(
+            self, X, lcar, holes=None, make_surface=True, max_deviation=None
+            ):
+        '''Adds a polygon with the corners `X`.
+
+        :param max_deviation: If given, corners are dropped as long as all of
+            `X` are within `max_deviation` of the polygon through the
+            remaining ones, cf. :func:`pygmsh.simplify_polyline`. For dense
+            input, like scanned profiles, this gives few lines whose mesh size
+            is determined by `lcar` only.
+        '''
         if holes is None:
             holes = []
         else:
             assert make_surface
 
+        if max_deviation is not None:
+            X = [X[k] for k in simplify_polyline(X, max_deviation, True)]
+
         # Create points.
         p = [self.add_point(x, lcar) for x in X]
         # Create lines
@@ -613,15 +860,6 @@ class Geometry(object):
         # Create volume.
         volume = self.add_volume(surface_loop, holes) if with_volume else None
 
-        class Ellipsoid(object):
-            def __init__(self, x0, radii, lcar, surface_loop, volume):
-                self.x0 = x0
-                self.lcar = lcar
-                self.radii = radii
-                self.surface_loop = surface_loop
-                self.volume = volume
-                return
-
         return Ellipsoid(x0, radii, lcar, surface_loop, volume)
 
     def add_ball(
@@ -690,290 +928,8 @@ class Geometry(object):
         # Create volume
         vol = self.add_volume(surface_loop, holes) if with_volume else None
 
-        class Box(object):
-            def __init__(
-                    self, x0, x1, y0, y1, z0, z1,
-                    lcar, surface_loop, volume
-                    ):
-                self.x0 = x0
-                self.x1 = x1
-                self.y0 = y0
-                self.y1 = y1
-                self.z0 = z0
-                self.z1 = z1
-                self.lcar = lcar
-                self.surface_loop = surface_loop
-                self.volume = volume
-                return
-
         return Box(x0, x1, y0, y1, z0, z1, lcar, surface_loop, vol)
 
-    def add_torus(
-            self,
-            irad, orad,
-            lcar,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0]),
-            variant='extrude_lines'
-            ):
-
-        if variant == 'extrude_lines':
-            return self._add_torus_extrude_lines(
-                irad, orad,
-                lcar,
-                R=R,
-                x0=x0
-                )
-        assert variant == 'extrude_circle'
-        return self._add_torus_extrude_circle(
-            irad, orad,
-            lcar,
-            R=R,
-            x0=x0
-            )
-
-    def _add_torus_extrude_lines(
-            self,
-            irad, orad,
-            lcar,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0])
-            ):
-        '''Create Gmsh code for the torus in the x-y plane under the coordinate
-        transformation
-
-        .. math::
-            \\hat{x} = R x + x_0.
-
-        :param irad: inner radius of the torus
-        :param orad: outer radius of the torus
-        '''
-        self.add_comment('Torus')
-
-        # Add circle
-        x0t = numpy.dot(R, numpy.array([0.0, orad, 0.0]))
-        # Get circles in y-z plane
-        Rc = numpy.array([
-            [0.0, 0.0, 1.0],
-            [0.0, 1.0, 0.0],
-            [1.0, 0.0, 0.0]
-            ])
-        c = self.add_circle(x0+x0t, irad, lcar, R=numpy.dot(R, Rc))
-
-        rot_axis = [0.0, 0.0, 1.0]
-        rot_axis = numpy.dot(R, rot_axis)
-        point_on_rot_axis = [0.0, 0.0, 0.0]
-        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
-
-        # Form the torus by extruding the circle three times by 2/3*pi. This
-        # works around the inability of Gmsh to extrude by pi or more. The
-        # Extrude() macro returns an array; the first [0] entry in the array is
-        # the entity that has been extruded at the far end. This can be used
-        # for the following Extrude() step.  The second [1] entry of the array
-        # is the surface that was created by the extrusion.
-        previous = c.line_loop.lines
-        angle = '2*Pi/3'
-        all_surfaces = []
-        for i in range(3):
-            self.add_comment('Round no. {}'.format(i+1))
-            for k, p in enumerate(previous):
-                # ts1[] = Extrude {{0,0,1}, {0,0,0}, 2*Pi/3}{Line{tc1};};
-                # ...
-                top, surf, _ = self.extrude(
-                    p,
-                    rotation_axis=rot_axis,
-                    point_on_axis=point_on_rot_axis,
-                    angle=angle
-                    )
-                all_surfaces.append(surf)
-                previous[k] = top
-
-        # compound_surface = CompoundSurface(all_surfaces)
-
-        surface_loop = self.add_surface_loop(all_surfaces)
-        vol = self.add_volume(surface_loop)
-
-        # The newline at the end is essential:
-        # If a GEO file doesn't end in a newline, Gmsh will report a syntax
-        # error.
-        self.add_comment('\n')
-        return vol
-
-    def _add_torus_extrude_circle(
-            self,
-            irad, orad,
-            lcar,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0])
-            ):
-        '''Create Gmsh code for the torus under the coordinate transformation
-
-        .. math::
-            \\hat{x} = R x + x_0.
-
-        :param irad: inner radius of the torus
-        :param orad: outer radius of the torus
-        '''
-        self.add_comment(76*'-')
-        self.add_comment('Torus')
-
-        # Add circle
-        x0t = numpy.dot(R, numpy.array([0.0, orad, 0.0]))
-        Rc = numpy.array([
-            [0.0, 0.0, 1.0],
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0]
-            ])
-        c = self.add_circle(x0+x0t, irad, lcar, R=numpy.dot(R, Rc))
-
-        rot_axis = [0.0, 0.0, 1.0]
-        rot_axis = numpy.dot(R, rot_axis)
-        point_on_rot_axis = [0.0, 0.0, 0.0]
-        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
-
-        # Form the torus by extruding the circle three times by 2/3*pi. This
-        # works around the inability of Gmsh to extrude by pi or more. The
-        # Extrude() macro returns an array; the first [0] entry in the array is
-        # the entity that has been extruded at the far end. This can be used
-        # for the following Extrude() step.  The second [1] entry of the array
-        # is the surface that was created by the extrusion. The third [2-end]
-        # is a list of all the planes of the lateral surface.
-        previous = c.plane_surface
-        all_volumes = []
-        num_steps = 3
-        for _ in range(num_steps):
-            top, vol, _ = self.extrude(
-                previous,
-                rotation_axis=rot_axis,
-                point_on_axis=point_on_rot_axis,
-                angle='2*Pi/{}'.format(num_steps)
-                )
-            previous = top
-            all_volumes.append(vol)
-
-        vol = self.add_compound_volume(all_volumes)
-        self.add_comment(76*'-' + '\n')
-        return vol
-
-    def add_pipe(
-            self,
-            outer_radius, inner_radius, length,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0]),
-            lcar=0.1,
-            variant='rectangle_rotation'
-            ):
-        if variant == 'rectangle_rotation':
-            return self._add_pipe_by_rectangle_rotation(
-                outer_radius, inner_radius, length,
-                R=R,
-                x0=x0,
-                lcar=lcar
-                )
-        assert variant == 'circle_extrusion'
-        return self._add_pipe_by_circle_extrusion(
-            outer_radius, inner_radius, length,
-            R=R,
-            x0=x0,
-            lcar=lcar
-            )
-
-    def _add_pipe_by_rectangle_rotation(
-            self,
-            outer_radius, inner_radius, length,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0]),
-            lcar=0.1
-            ):
-        '''Hollow cylinder.
-        Define a rectangle, extrude it by rotation.
-        '''
-        self.add_comment('Define rectangle.')
-        X = numpy.array([
-            [0.0, outer_radius, -0.5*length],
-            [0.0, outer_radius, +0.5*length],
-            [0.0, inner_radius, +0.5*length],
-            [0.0, inner_radius, -0.5*length]
-            ])
-        # Apply transformation.
-        X = [numpy.dot(R, x) + x0 for x in X]
-        # Create points set.
-        p = [self.add_point(x, lcar) for x in X]
-
-        # Define edges.
-        e = [self.add_line(p[0], p[1]),
-             self.add_line(p[1], p[2]),
-             self.add_line(p[2], p[3]),
-             self.add_line(p[3], p[0])
-             ]
-
-        rot_axis = [0.0, 0.0, 1.0]
-        rot_axis = numpy.dot(R, rot_axis)
-        point_on_rot_axis = [0.0, 0.0, 0.0]
-        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
-
-        # Extrude all edges three times by 2*Pi/3.
-        previous = e
-        angle = '2*Pi/3'
-        all_surfaces = []
-        # com = []
-        self.add_comment('Extrude in 3 steps.')
-        for i in range(3):
-            self.add_comment('Step {}'.format(i+1))
-            for k, p in enumerate(previous):
-                # ts1[] = Extrude {{0,0,1}, {0,0,0}, 2*Pi/3}{Line{tc1};};
-                top, surf, _ = self.extrude(
-                        p,
-                        rotation_axis=rot_axis,
-                        point_on_axis=point_on_rot_axis,
-                        angle=angle
-                        )
-                # if k==0:
-                #     com.append(surf)
-                # else:
-                #     all_names.appends(surf)
-                all_surfaces.append(surf)
-                previous[k] = top
-        #
-        # cs = CompoundSurface(com)
-        # Now just add surface loop and volume.
-        # all_surfaces = all_names + [cs]
-        surface_loop = self.add_surface_loop(all_surfaces)
-        vol = self.add_volume(surface_loop)
-        return vol
-
-    def _add_pipe_by_circle_extrusion(
-            self,
-            outer_radius, inner_radius, length,
-            R=numpy.eye(3),
-            x0=numpy.array([0.0, 0.0, 0.0]),
-            lcar=0.1
-            ):
-        '''Hollow cylinder.
-        Define a ring, extrude it by translation.
-        '''
-        # Define ring which to Extrude by translation.
-        Rc = numpy.array([
-            [0.0, 0.0, 1.0],
-            [1.0, 0.0, 0.0],
-            [0.0, 1.0, 0.0]
-            ])
-        c_inner = self.add_circle(
-            x0, inner_radius, lcar, R=numpy.dot(R, Rc),
-            make_surface=False
-            )
-        circ = self.add_circle(
-            x0, outer_radius, lcar, R=numpy.dot(R, Rc),
-            holes=[c_inner.line_loop]
-            )
-
-        # Now Extrude the ring surface.
-        _, vol, _ = self.extrude(
-            circ.plane_surface,
-            translation_axis=numpy.dot(R, [length, 0, 0])
-            )
-        return vol
-
     def translate(self, input_entity, vector):
         """Translates input_entity itself by vector.
 
@@ -5,15 +5,20 @@ from .point import Point
 
 
 class Line(LineBase):
+    __slots__ = ('points',)
+
     def __init__(self, p0, p1):
         super(Line, self).__init__()
 
         assert isinstance(p0, Point)
         assert isinstance(p1, Point)
         self.points = [p0, p1]
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
-            'Line({}) = {{{}, {}}};'.format(self.id, p0.id, p1.id)
-            ])
-        return
+            'Line({}) = {{{}, {}}};'.format(
+                self.id, self.points[0].id, self.points[1].id
+            )])
@@ -1,11 +1,11 @@
 # -*- coding: utf-8 -*-
 #
-import copy
 
 
 class LineBase(object):
     _ID = 0
     dimension = 1
+    __slots__ = ('id',)
 
     def __init__(self, id0=None):
         if id0:
@@ -16,6 +16,43 @@ class LineBase(object):
         return
 
     def __neg__(self):
-        neg_self = copy.deepcopy(self)
-        neg_self.id = '-' + neg_self.id
-        return neg_self
+        return OrientedLine(self, -1)
+
+
+class OrientedLine(LineBase):
+    '''Reference to a line with an orientation (sign plus target). This is what
+    `-line` returns; it is cheap to create and doesn't copy the line or
+    anything the line references.
+    '''
+    __slots__ = ('target', 'sign')
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, target, sign=-1):
+        assert sign in [-1, +1]
+        if isinstance(target, OrientedLine):
+            sign *= target.sign
+            target = target.target
+        self.target = target
+        self.sign = sign
+        return
+
+    @property
+    def id(self):
+        if self.sign > 0:
+            return self.target.id
+        return '-' + self.target.id
+
+    def __neg__(self):
+        if self.sign < 0:
+            return self.target
+        return OrientedLine(self.target, -1)
+
+    def __reduce__(self):
+        # The id is computed, so the default (the slots) doesn't work.
+        return (OrientedLine, (self.target, self.sign))
+
+    def __getattr__(self, name):
+        # Everything else (points, control points, ...) is the target's.
+        if name in ['target', 'sign'] or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.target, name)
@@ -5,19 +5,22 @@
 class LineLoop(object):
     _ID = 0
     dimension = 1
+    __slots__ = ('lines', 'id')
 
     def __init__(self, lines):
-        self.lines = lines
+        self.lines = list(lines)
 
         self.id = 'll{}'.format(LineLoop._ID)
         LineLoop._ID += 1
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newll;'.format(self.id),
             'Line Loop({}) = {{{}}};'.format(
-                self.id, ', '.join([l.id for l in lines])
+                self.id, ', '.join([l.id for l in self.lines])
             )])
-        return
 
     def __len__(self):
         return len(self.lines)
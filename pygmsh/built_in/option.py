@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+#
+from ..parameter import _code
+
+from .command import Command
+
+
+class Option(Command):
+    '''The Gmsh option `name` (e.g., `Mesh.CharacteristicLengthMax`) set to
+    `value`.
+    '''
+    __slots__ = ('name', 'value')
+
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+        return
+
+    @property
+    def code(self):
+        return '{} = {};'.format(self.name, _code(self.value))
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Optimization passes over the recorded geometry.
+
+A geometry is recorded as a list of statements: entity objects (points,
+curves, loops, surfaces, volumes) that reference each other and thereby form a
+DAG, commands (size fields, extrusions, patterns, ...) that reference
+entities, and opaque Gmsh code strings (physical groups, raw code, ...). The
+passes below take such a list and return a new one; entities are never
+modified.
+'''
+import re
+
+from ..helpers import _is_string
+
+from .command import Command
+from .compound_volume import CompoundVolume
+from .line_base import LineBase, OrientedLine
+from .line_loop import LineLoop
+from .point import Point
+from .surface import Surface
+from .surface_base import SurfaceBase, OrientedSurface
+from .surface_loop import SurfaceLoop
+from .volume_base import VolumeBase
+
+_IDENTIFIER = re.compile(r'[A-Za-z_]\w*')
+
+
+def _target(entity):
+    while isinstance(entity, (OrientedLine, OrientedSurface)):
+        entity = entity.target
+    return entity
+
+
+def _referenced(entity):
+    '''Entities directly referenced by `entity`.
+    '''
+    out = []
+    for cls in type(entity).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name in ['id', 'target']:
+                continue
+            value = getattr(entity, name, None)
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for v in values:
+                v = _target(v)
+                if hasattr(v, 'id') and not _is_string(v):
+                    out.append(v)
+    return out
+
+
+def _textual_references(statements):
+    '''All identifiers that appear in the opaque code statements.
+    '''
+    names = set()
+    for s in statements:
+        if _is_string(s):
+            names.update(_IDENTIFIER.findall(s))
+    return names
+
+
+def _is_loop(entity):
+    return isinstance(entity, (LineLoop, SurfaceLoop))
+
+
+def _is_entity(statement):
+    return not _is_string(statement) and not isinstance(statement, Command)
+
+
+def _entity_ids(statements):
+    '''The ids of the entities among the `statements`.'''
+    return set(s.id for s in statements if _is_entity(s))
+
+
+def eliminate_unused(statements, dim=None):
+    '''Removes entities that don't contribute to the geometry: loops that
+    aren't used by a surface or volume, and entities of dimension lower than
+    `dim` that aren't (transitively) referenced by an entity of dimension `dim`
+    or higher. `dim` defaults to the highest dimension present. Entities that
+    are referenced by commands or in any code string (physical groups, raw
+    code, etc.) are always kept.
+    '''
+    entities = [s for s in statements if _is_entity(s)]
+    if dim is None:
+        dims = [e.dimension for e in entities if not _is_loop(e)]
+        dim = max(dims) if dims else 0
+
+    names = _textual_references(statements)
+    stack = [
+        e for e in entities
+        if e.id in names or (not _is_loop(e) and e.dimension >= dim)
+        ] + [s for s in statements if isinstance(s, Command)]
+    used = set()
+    while stack:
+        e = stack.pop()
+        if id(e) in used:
+            continue
+        used.add(id(e))
+        stack.extend(_referenced(e))
+
+    return [s for s in statements if not _is_entity(s) or id(s) in used]
+
+
+def deduplicate(statements):
+    '''Replaces entities that are identical to an earlier one, i.e., have the
+    same type and parameters and reference the same (deduplicated) entities,
+    by an alias of the earlier one. This merges identical subgraphs, e.g.,
+    polygons that were added twice, bottom-up.
+    '''
+    canonical = {}
+    seen = {}
+    out = []
+    for s in statements:
+        if not _is_entity(s):
+            out.append(s)
+            continue
+
+        def repl(match, own_id=s.id):
+            name = match.group(0)
+            return '#' if name == own_id else canonical.get(name, name)
+
+        key = (type(s), _IDENTIFIER.sub(repl, s.code))
+        if key in seen:
+            canonical[s.id] = seen[key]
+            out.append('{} = {};'.format(s.id, seen[key]))
+        else:
+            seen[key] = s.id
+            out.append(s)
+    return out
+
+
+def _level(entity):
+    levels = [
+        (Point, 0),
+        (LineBase, 1),
+        (LineLoop, 2),
+        ((SurfaceBase, Surface), 3),
+        (SurfaceLoop, 4),
+        ((VolumeBase, CompoundVolume), 5),
+        ]
+    for cls, level in levels:
+        if isinstance(entity, cls):
+            return level
+    return None
+
+
+def canonical_order(statements):
+    '''Orders entities by type: points first, then curves, line loops,
+    surfaces, surface loops, and volumes. Since entities only ever reference
+    entities created before them, this (stable) ordering is valid. Code
+    strings aren't moved; entities are only reordered between them.
+    '''
+    out = []
+    run = []
+    for s in statements:
+        level = _level(s) if _is_entity(s) else None
+        if level is None:
+            run.sort(key=lambda item: item[0])
+            out.extend([item[1] for item in run])
+            run = []
+            out.append(s)
+        else:
+            run.append((level, s))
+    run.sort(key=lambda item: item[0])
+    out.extend([item[1] for item in run])
+    return out
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Patterns: copies of an entity that Gmsh creates (`Duplicata`), such that the
+entity is only defined once. The copies are collected in the Gmsh list
+`id[]`.
+'''
+import numpy
+
+from ..parameter import _code
+from ..transform import Transform
+
+from .command import Command
+from .dummy import Dummy
+from .line_base import LineBase
+from .passes import _target
+from .surface_base import SurfaceBase
+from .volume_base import VolumeBase
+
+
+def _duplicata(entity):
+    kinds = {0: 'Point', 1: 'Line', 2: 'Surface', 3: 'Volume'}
+    # Reversed lines and surfaces are copied like the lines and surfaces.
+    return 'Duplicata {{ {}{{{}}}; }}'.format(
+        kinds[entity.dimension], _target(entity).id
+        )
+
+
+class Pattern(Command):
+    '''One copy of `entity` for each transformation in `transforms`, cf.
+    :meth:`Geometry.add_pattern`.
+    '''
+    __slots__ = ('id', 'entity', 'transforms')
+
+    def __init__(self, id0, entity, transforms):
+        self.id = id0
+        self.entity = entity
+        self.transforms = [
+            t if isinstance(t, Transform) else dict(t) for t in transforms
+            ]
+        return
+
+    @property
+    def num_copies(self):
+        return len(self.transforms)
+
+    @property
+    def code(self):
+        code = ['{}[] = {{}};'.format(self.id)]
+        for t in self.transforms:
+            c = _duplicata(self.entity)
+            if isinstance(t, Transform):
+                code.append('{}[] += {};'.format(self.id, t.gmsh_code(c)))
+                continue
+            if t.get('rotation_axis') is not None:
+                c = 'Rotate {{{{{}}}, {{{}}}, {}}} {{ {} }}'.format(
+                    ','.join(_code(x) for x in t['rotation_axis']),
+                    ','.join(_code(x) for x in t['point_on_axis']),
+                    _code(t['angle']),
+                    c
+                    )
+            if t.get('translation_axis') is not None:
+                c = 'Translate {{{}}} {{ {} }}'.format(
+                    ','.join(_code(x) for x in t['translation_axis']),
+                    c
+                    )
+            code.append('{}[] += {};'.format(self.id, c))
+        return '\n'.join(code)
+
+
+class GridPattern(Command):
+    '''Copies of `entity` translated by `i*vectors[0] + j*vectors[1] + ...`
+    for `0 <= i < nums[0]`, `0 <= j < nums[1]`, etc., except the entity
+    itself, cf. :meth:`Geometry.add_grid_pattern`. They are created in Gmsh
+    `For` loops; the size of the code doesn't depend on `nums`.
+    '''
+    __slots__ = ('id', 'entity', 'vectors', 'nums')
+
+    def __init__(self, id0, entity, vectors, nums):
+        assert len(vectors) == len(nums)
+        self.id = id0
+        self.entity = entity
+        self.vectors = [list(v) for v in vectors]
+        self.nums = [int(num) for num in nums]
+        return
+
+    @property
+    def num_copies(self):
+        return int(numpy.prod(self.nums)) - 1
+
+    @property
+    def code(self):
+        counters = ['{}_{}'.format(self.id, k) for k in range(len(self.nums))]
+        translation = ', '.join([
+            ' + '.join([
+                '{}*{}'.format(c, _code(v[k]))
+                for c, v in zip(counters, self.vectors)
+                ])
+            for k in range(3)
+            ])
+
+        code = ['{}[] = {{}};'.format(self.id)]
+        code.extend([
+            'For {} In {{0:{}}}'.format(c, num - 1)
+            for c, num in zip(counters, self.nums)
+            ])
+        code.extend([
+            'If ({} > 0)'.format(' + '.join(counters)),
+            '{}[] += Translate {{{}}} {{ {} }};'.format(
+                self.id, translation, _duplicata(self.entity)
+                ),
+            'EndIf',
+            ])
+        code.extend(len(self.nums) * ['EndFor'])
+        return '\n'.join(code)
+
+
+class PolarPattern(Command):
+    '''`num-1` copies of `entity`, rotated around the given axis by multiples
+    of `angle` (default: `2*Pi/num`) in a Gmsh `For` loop, cf.
+    :meth:`Geometry.add_polar_pattern`.
+    '''
+    __slots__ = (
+        'id', 'entity', 'rotation_axis', 'point_on_axis', 'num', 'angle'
+        )
+
+    def __init__(
+            self, id0, entity, rotation_axis, point_on_axis, num, angle=None
+            ):
+        self.id = id0
+        self.entity = entity
+        self.rotation_axis = list(rotation_axis)
+        self.point_on_axis = list(point_on_axis)
+        self.num = int(num)
+        self.angle = '2*Pi/{}'.format(num) if angle is None else angle
+        return
+
+    @property
+    def num_copies(self):
+        return self.num - 1
+
+    @property
+    def code(self):
+        counter = '{}_0'.format(self.id)
+        return '\n'.join([
+            '{}[] = {{}};'.format(self.id),
+            'For {} In {{1:{}}}'.format(counter, self.num - 1),
+            '{}[] += Rotate {{{{{}}}, {{{}}}, {}*({})}} {{ {} }};'.format(
+                self.id,
+                ','.join(_code(x) for x in self.rotation_axis),
+                ','.join(_code(x) for x in self.point_on_axis),
+                counter, _code(self.angle),
+                _duplicata(self.entity)
+                ),
+            'EndFor',
+            ])
+
+
+class PatternsMixin(object):
+    '''The pattern methods of :class:`Geometry`.
+    '''
+    # counter for the names of the lists of copies
+    _ARRAY_ID = 0
+    def _new_array(self):
+        # Gmsh collects the copies of a pattern in the list `arN[]`.
+        self._ARRAY_ID += 1
+        return 'ar{}'.format(self._ARRAY_ID)
+
+    def _array_handles(self, entity, name, num):
+        ids = ['{}[{}]'.format(name, k) for k in range(num)]
+        if entity.dimension == 3:
+            return [VolumeBase(i) for i in ids]
+        if entity.dimension == 2:
+            return [SurfaceBase(i, entity.num_edges) for i in ids]
+        if entity.dimension == 1:
+            return [LineBase(i) for i in ids]
+        return [Dummy(i) for i in ids]
+
+    def add_pattern(self, entity, transforms):
+        '''Adds one copy of `entity` for each transformation in `transforms`
+        and returns the copies. Gmsh creates the copies (`Duplicata`), so the
+        entity is only defined once.
+
+        Each transformation is either a :class:`pygmsh.Transform` or a
+        dictionary with the keys `translation_axis` and/or `rotation_axis`,
+        `point_on_axis`, `angle` (cf. :meth:`extrude`). Rotations are applied
+        before translations.
+        '''
+        pattern = Pattern(self._new_array(), entity, transforms)
+        self._GMSH_CODE.append(pattern)
+        return self._array_handles(entity, pattern.id, pattern.num_copies)
+
+    def add_linear_pattern(self, entity, vector, num):
+        '''Pattern of `num` instances (including `entity` itself), translated
+        by multiples of `vector`. Returns the `num-1` copies.
+
+        The copies are created in a Gmsh `For` loop; the size of the code
+        doesn't depend on `num`.
+        '''
+        return self.add_grid_pattern(entity, [vector], [num])
+
+    def add_grid_pattern(self, entity, vectors, nums):
+        '''Pattern of instances translated by `i*vectors[0] + j*vectors[1] +
+        ...` for `0 <= i < nums[0]`, `0 <= j < nums[1]`, etc. Returns the
+        copies (all instances except `entity` itself) in lexicographic order.
+        '''
+        pattern = GridPattern(self._new_array(), entity, vectors, nums)
+        self._GMSH_CODE.append(pattern)
+        return self._array_handles(entity, pattern.id, pattern.num_copies)
+
+    def add_polar_pattern(
+            self, entity, rotation_axis, point_on_axis, num, angle=None
+            ):
+        '''Pattern of `num` instances (including `entity` itself), rotated
+        around the given axis by multiples of `angle` (default: `2*Pi/num`).
+        Returns the `num-1` copies, created in a Gmsh `For` loop.
+        '''
+        pattern = PolarPattern(
+            self._new_array(), entity, rotation_axis, point_on_axis, num,
+            angle
+            )
+        self._GMSH_CODE.append(pattern)
+        return self._array_handles(entity, pattern.id, pattern.num_copies)
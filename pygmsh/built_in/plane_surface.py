@@ -5,6 +5,8 @@ from .line_loop import LineLoop
 
 
 class PlaneSurface(SurfaceBase):
+    __slots__ = ('line_loop', 'holes')
+
     def __init__(self, line_loop, holes=None):
         super(PlaneSurface, self).__init__()
 
@@ -21,11 +23,14 @@ class PlaneSurface(SurfaceBase):
             for h in holes
             ]
 
+        self.num_edges = len(self.line_loop) + sum(len(h) for h in self.holes)
+        return
+
+    @property
+    def code(self):
         line_loops = [self.line_loop] + self.holes
-        self.code = '\n'.join([
+        return '\n'.join([
             '{} = news;'.format(self.id),
             'Plane Surface({}) = {{{}}};'.format(
                 self.id, ','.join([ll.id for ll in line_loops])
             )])
-        self.num_edges = len(self.line_loop) + sum(len(h) for h in self.holes)
-        return
@@ -1,28 +1,36 @@
 # -*- coding: utf-8 -*-
 #
+from ..parameter import _array, _code
 
 
 class Point(object):
     _POINT_ID = 0
+    dimension = 0
+    __slots__ = ('x', 'lcar', 'id')
 
     def __init__(self, x, lcar=None):
-        self.x = x
+        # Keep a copy of the coordinates; the code is generated from them only
+        # when the geometry is written out.
+        self.x = _array(x)
         self.lcar = lcar
 
         self.id = 'p{}'.format(Point._POINT_ID)
         Point._POINT_ID += 1
+        return
 
+    @property
+    def code(self):
         # Points are always 3D in gmsh
-        if lcar is not None:
-            self.code = '\n'.join([
-                '{} = newp;'.format(self.id),
-                'Point({}) = {{{!r}, {!r}, {!r}, {!r}}};'.format(
-                    self.id, x[0], x[1], x[2], lcar
-                )])
-        else:
-            self.code = '\n'.join([
+        x = self.x
+        if self.lcar is not None:
+            return '\n'.join([
                 '{} = newp;'.format(self.id),
-                'Point({}) = {{{!r}, {!r}, {!r}}};'.format(
-                    self.id, x[0], x[1], x[2]
+                'Point({}) = {{{}, {}, {}, {}}};'.format(
+                    self.id, _code(x[0]), _code(x[1]), _code(x[2]),
+                    _code(self.lcar)
                 )])
-        return
+        return '\n'.join([
+            '{} = newp;'.format(self.id),
+            'Point({}) = {{{}, {}, {}}};'.format(
+                self.id, _code(x[0]), _code(x[1]), _code(x[2])
+            )])
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+import itertools
+import math
+
+
+class PointIndex(object):
+    '''Spatial hash for finding existing points (within a tolerance) and
+    existing lines (by their end points) in O(1).
+    '''
+    _OFFSETS = list(itertools.product([-1, 0, 1], repeat=3))
+
+    def __init__(self, tol):
+        assert tol > 0.0
+        self.tol = tol
+        self._cells = {}
+        self._lines = {}
+        return
+
+    def copy(self):
+        # pylint: disable=protected-access
+        other = PointIndex(self.tol)
+        other._cells = {key: list(value) for key, value in self._cells.items()}
+        other._lines = dict(self._lines)
+        return other
+
+    def _cell(self, x):
+        return tuple(int(math.floor(float(xi) / self.tol)) for xi in x)
+
+    def find_point(self, x):
+        '''Returns an indexed point within `tol` of `x`, or `None`.
+        '''
+        x = [float(xi) for xi in x]
+        cell = self._cell(x)
+        tol2 = self.tol**2
+        # Points closer than tol can only sit in one of the neighboring cells.
+        for offset in self._OFFSETS:
+            key = tuple(c + o for c, o in zip(cell, offset))
+            for p in self._cells.get(key, []):
+                dist2 = sum((float(a) - b)**2 for a, b in zip(p.x, x))
+                if dist2 <= tol2:
+                    return p
+        return None
+
+    def add_point(self, point):
+        self._cells.setdefault(self._cell(point.x), []).append(point)
+        return
+
+    def remove_point(self, point):
+        cell = self._cell(point.x)
+        self._cells[cell] = [p for p in self._cells[cell] if p is not point]
+        return
+
+    def find_line(self, p0, p1):
+        '''Returns the line from `p0` to `p1` if it exists, its reverse if the
+        line from `p1` to `p0` exists, or `None`.
+        '''
+        line = self._lines.get((p0.id, p1.id))
+        if line is not None:
+            return line
+        line = self._lines.get((p1.id, p0.id))
+        if line is not None:
+            return -line
+        return None
+
+    def add_line(self, line):
+        p0, p1 = line.points
+        self._lines[(p0.id, p1.id)] = line
+        return
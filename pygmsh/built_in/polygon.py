@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+#
+
+
+class Polygon(object):
+    '''The entities of a polygon, cf.
+    :meth:`pygmsh.built_in.Geometry.add_polygon`.
+    '''
+    def __init__(self, line_loop, surface, lcar):
+        self.line_loop = line_loop
+        self.surface = surface
+        self.lcar = lcar
+        return
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Compact serialization of geometries.
+
+The entities are written as a flat table in which references to other
+entities are indices into the table, in the order in which the entities can
+be recreated, and the table is stored as zlib-compressed JSON. Loading
+recreates the entities without running any of the `add_*` methods.
+'''
+import importlib
+import json
+import re
+import zlib
+
+import numpy
+
+from ..helpers import _is_string
+from ..parameter import Expression, Parameter
+
+from .line import Line
+from .point import Point
+from .point_index import PointIndex
+
+_VERSION = 1
+
+# attributes of geometries that aren't written: the statements (written
+# separately), the code cache, the spatial index, and the state of forks
+_SKIPPED = [
+    '_GMSH_CODE', '_point_index', '_spatial_index', '_num_shared',
+    '_shared_ids', '_fork_base',
+    '_code_cache_list', '_code_cache_len', '_code_cache_last',
+    '_code_cache_chunks', '_code_cache_starts', '_code_cache_hashes',
+    '_code_cache_hash', '_code_cache_code',
+    ]
+
+_NUMBERED_ID = re.compile(r'^[A-Za-z]+(\d+)$')
+
+
+def _state(obj):
+    '''The attributes of `obj`, from its slots and its `__dict__`.'''
+    state = {}
+    for cls in type(obj).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            # Skip computed attributes (e.g., the id of oriented lines) and
+            # unset slots.
+            if name in state \
+                    or isinstance(getattr(type(obj), name), property):
+                continue
+            try:
+                state[name] = getattr(obj, name)
+            except AttributeError:
+                pass
+    state.update(getattr(obj, '__dict__', {}))
+    return state
+
+
+def _class_name(cls):
+    return '{}.{}'.format(cls.__module__, cls.__name__)
+
+
+def _class(name):
+    module, _, cls = name.rpartition('.')
+    assert module.split('.')[0] == 'pygmsh', \
+        'Unknown class \'{}\'.'.format(name)
+    return getattr(importlib.import_module(module), cls)
+
+
+class _Encoder(object):
+    def __init__(self):
+        self.objects = []
+        self._index = {}
+        return
+
+    def encode(self, value):
+        if isinstance(value, Expression):
+            return {
+                'e': value.code,
+                'v': float(value),
+                'p': isinstance(value, Parameter),
+                }
+        if isinstance(value, numpy.generic):
+            value = value.item()
+        if value is None or _is_string(value) \
+                or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        if isinstance(value, tuple):
+            return {'t': [self.encode(v) for v in value]}
+        if isinstance(value, set):
+            return {'s': [self.encode(v) for v in sorted(value)]}
+        if isinstance(value, dict):
+            return {'d': [
+                [self.encode(k), self.encode(v)]
+                for k, v in sorted(value.items())
+                ]}
+        if isinstance(value, numpy.ndarray):
+            return {'a': self.encode(value.tolist()), 'dtype': value.dtype.str}
+
+        # entities and other objects, by their index in the table; the
+        # objects they reference come first
+        if id(value) not in self._index:
+            state = {
+                key: self.encode(v) for key, v in _state(value).items()
+                }
+            self._index[id(value)] = len(self.objects)
+            self.objects.append([_class_name(type(value)), state])
+        return {'@': self._index[id(value)]}
+
+
+def _decode(value, objects):
+    if isinstance(value, list):
+        return [_decode(v, objects) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if '@' in value:
+        return objects[value['@']]
+    if 't' in value:
+        return tuple(_decode(v, objects) for v in value['t'])
+    if 's' in value:
+        return set(_decode(v, objects) for v in value['s'])
+    if 'd' in value:
+        return {
+            _decode(k, objects): _decode(v, objects) for k, v in value['d']
+            }
+    if 'a' in value:
+        return numpy.array(_decode(value['a'], objects), dtype=value['dtype'])
+    assert 'e' in value
+    if value['p']:
+        return Parameter(value['e'], value['v'])
+    return Expression(value['v'], value['e'])
+
+
+def id_counter(entity):
+    '''The class and the name of the counter that generated the id of
+    `entity`, and the number in the id; `None` for ids that weren't generated
+    by a counter.
+    '''
+    match = _NUMBERED_ID.match(str(getattr(entity, 'id', '')))
+    if not match:
+        return None
+    counters = [
+        (cls, attr) for cls in type(entity).__mro__
+        for attr in ['_ID', '_POINT_ID'] if attr in vars(cls)
+        ]
+    if not counters:
+        return None
+    return counters[0] + (int(match.group(1)),)
+
+
+def reserve_ids(entities):
+    '''Advances the id counters of the entity classes past the ids of
+    `entities`, such that entities created afterwards get other ids.
+    '''
+    for e in entities:
+        counter = id_counter(e)
+        if counter is not None:
+            cls, attr, n = counter
+            setattr(cls, attr, max(getattr(cls, attr), n + 1))
+    return
+
+
+def dumps(geometry):
+    '''Serializes `geometry`, cf. :meth:`Geometry.to_bytes`.'''
+    # pylint: disable=protected-access
+    encoder = _Encoder()
+    statements = [encoder.encode(s) for s in geometry._GMSH_CODE]
+    attributes = {
+        key: encoder.encode(value)
+        for key, value in vars(geometry).items() if key not in _SKIPPED
+        }
+    index = geometry._point_index
+    data = {
+        'version': _VERSION,
+        'class': _class_name(type(geometry)),
+        'attributes': attributes,
+        'merge_tolerance': None if index is None else index.tol,
+        'objects': encoder.objects,
+        'statements': statements,
+        }
+    return zlib.compress(
+        json.dumps(data, separators=(',', ':')).encode('utf-8')
+        )
+
+
+def loads(data):
+    '''Recreates a geometry serialized by :func:`dumps`.'''
+    # pylint: disable=protected-access
+    data = json.loads(zlib.decompress(data).decode('utf-8'))
+    assert data['version'] == _VERSION, \
+        'Unsupported version {}.'.format(data['version'])
+
+    objects = []
+    for name, state in data['objects']:
+        cls = _class(name)
+        obj = cls.__new__(cls)
+        for key, value in state.items():
+            setattr(obj, key, _decode(value, objects))
+        objects.append(obj)
+    reserve_ids(objects)
+
+    cls = _class(data['class'])
+    geometry = cls.__new__(cls)
+    for key, value in data['attributes'].items():
+        setattr(geometry, key, _decode(value, objects))
+    geometry._GMSH_CODE = _decode(data['statements'], objects)
+    geometry._num_shared = 0
+    geometry._shared_ids = set()
+    geometry._fork_base = None
+    geometry._point_index = None
+    geometry._spatial_index = None
+    if data['merge_tolerance'] is not None:
+        geometry._point_index = PointIndex(data['merge_tolerance'])
+        for s in geometry._GMSH_CODE:
+            if isinstance(s, Point):
+                geometry._point_index.add_point(s)
+            elif type(s) is Line:  # pylint: disable=unidiomatic-typecheck
+                geometry._point_index.add_line(s)
+    geometry._reset_code_cache()
+    return geometry
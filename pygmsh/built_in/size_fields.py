@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Mesh size fields, background meshes, and mesh sizes from the local feature
+size.
+'''
+from .. import post_view
+from ..parameter import _code
+
+from . import feature_size
+from .field import Field
+
+
+class SizeFieldsMixin(object):
+    '''The mesh size methods of :class:`Geometry`.
+    '''
+    # counter for the names of the fields
+    _FIELD_ID = 0
+    def add_boundary_layer(
+            self,
+            edges_list=None,
+            faces_list=None,
+            nodes_list=None,
+            anisomax=None,
+            hfar=None,
+            hwall_n=None,
+            ratio=None,
+            thickness=None
+            ):
+        # Don't use [] as default argument, cf.
+        # <https://stackoverflow.com/a/113198/353337>
+        if edges_list is None:
+            edges_list = []
+        if faces_list is None:
+            faces_list = []
+        if nodes_list is None:
+            nodes_list = []
+
+        name = self._new_field('BoundaryLayer')
+        if edges_list:
+            self._GMSH_CODE.append(
+                'Field[{}].EdgesList = {{{}}};'.format(
+                    name, ','.join([e.id for e in edges_list])
+                ))
+        if faces_list:
+            self._GMSH_CODE.append(
+                'Field[{}].FacesList = {{{}}};'.format(
+                    name, ','.join(faces_list)
+                ))
+        if nodes_list:
+            self._GMSH_CODE.append(
+                'Field[{}].NodesList = {{{}}};'.format(
+                    name, ','.join([n.id for n in nodes_list])
+                ))
+        if hfar:
+            self._GMSH_CODE.append(
+                'Field[{}].hfar= {};'.format(name, _code(hfar))
+                )
+        if hwall_n:
+            self._GMSH_CODE.append(
+                'Field[{}].hwall_n= {};'.format(name, _code(hwall_n))
+                )
+        if ratio:
+            self._GMSH_CODE.append(
+                'Field[{}].ratio= {};'.format(name, _code(ratio))
+                )
+        if thickness:
+            self._GMSH_CODE.append(
+                'Field[{}].thickness= {};'.format(name, _code(thickness))
+                )
+        if anisomax:
+            self._GMSH_CODE.append(
+                'Field[{}].AnisoMax= {};'.format(name, _code(anisomax))
+                )
+        return name
+
+    def add_background_field(self, fields, aggregation_type='Min'):
+        return self._new_field(
+            aggregation_type, [('FieldsList', fields)], background=True
+            )
+
+    def _new_field(self, field_type, options=None, background=False):
+        '''Adds a mesh size field of type `field_type` and returns its name,
+        cf. :class:`~pygmsh.built_in.field.Field` for the `options`.
+        '''
+        self._FIELD_ID += 1
+        name = 'field{}'.format(self._FIELD_ID)
+        self._GMSH_CODE.append(
+            Field(name, field_type, options, background=background)
+            )
+        return name
+
+    def add_distance_field(
+            self, nodes=None, edges=None, faces=None, num_nodes_per_edge=None
+            ):
+        '''Distance to the given points, lines, and surfaces; the lines are
+        sampled with `num_nodes_per_edge` points. Mostly used as input for
+        :meth:`add_threshold_field`.
+        '''
+        return self._new_field(
+            'Attractor' if self._GMSH_MAJOR < 4 else 'Distance', [
+                ('NodesList', nodes),
+                ('EdgesList', edges),
+                ('FacesList', faces),
+                ('NNodesByEdge', num_nodes_per_edge),
+                ])
+
+    def add_threshold_field(
+            self, field, lcar_min, lcar_max, dist_min, dist_max,
+            sigmoid=False, stop_at_dist_max=False
+            ):
+        '''Mesh size `lcar_min` where the field `field` (typically a distance)
+        is below `dist_min`, `lcar_max` where it's above `dist_max`, and a
+        linear (or sigmoid) interpolation in between.
+        '''
+        return self._new_field('Threshold', [
+            ('IField', field),
+            ('LcMin', lcar_min),
+            ('LcMax', lcar_max),
+            ('DistMin', dist_min),
+            ('DistMax', dist_max),
+            ('Sigmoid', 1 if sigmoid else None),
+            ('StopAtDistMax', 1 if stop_at_dist_max else None),
+            ])
+
+    def add_box_field(self, x0, x1, lcar_in, lcar_out, thickness=None):
+        '''Mesh size `lcar_in` in the axis-parallel box with the corners `x0`
+        and `x1`, `lcar_out` outside. With `thickness` (Gmsh 4), the size
+        changes smoothly over a layer around the box.
+        '''
+        return self._new_field('Box', [
+            ('VIn', lcar_in),
+            ('VOut', lcar_out),
+            ('XMin', x0[0]),
+            ('XMax', x1[0]),
+            ('YMin', x0[1]),
+            ('YMax', x1[1]),
+            ('ZMin', x0[2]),
+            ('ZMax', x1[2]),
+            ('Thickness', thickness),
+            ])
+
+    def add_ball_field(
+            self, center, radius, lcar_in, lcar_out, thickness=None
+            ):
+        '''Mesh size `lcar_in` in the ball around `center`, `lcar_out` outside.
+        '''
+        return self._new_field('Ball', [
+            ('Radius', radius),
+            ('VIn', lcar_in),
+            ('VOut', lcar_out),
+            ('XCenter', center[0]),
+            ('YCenter', center[1]),
+            ('ZCenter', center[2]),
+            ('Thickness', thickness),
+            ])
+
+    def add_cylinder_field(self, center, axis, radius, lcar_in, lcar_out):
+        '''Mesh size `lcar_in` in the cylinder with the given radius, `center`,
+        and `axis` (whose length is the half-height of the cylinder),
+        `lcar_out` outside.
+        '''
+        return self._new_field('Cylinder', [
+            ('Radius', radius),
+            ('VIn', lcar_in),
+            ('VOut', lcar_out),
+            ('XAxis', axis[0]),
+            ('YAxis', axis[1]),
+            ('ZAxis', axis[2]),
+            ('XCenter', center[0]),
+            ('YCenter', center[1]),
+            ('ZCenter', center[2]),
+            ])
+
+    def add_math_eval_field(self, expression):
+        '''Mesh size given by the Gmsh expression `expression` in `x`, `y`,
+        `z`, and `F0`, `F1`, ... (the values of other fields), e.g.,
+        `'0.01 + 0.1*x*x'`.
+        '''
+        return self._new_field('MathEval', [
+            ('F', '"{}"'.format(expression)),
+            ])
+
+    def add_restrict_field(
+            self, field, nodes=None, edges=None, faces=None, volumes=None
+            ):
+        '''The field `field` on the given entities only; elsewhere, it doesn't
+        constrain the mesh size.
+        '''
+        return self._new_field('Restrict', [
+            ('IField', field),
+            ('VerticesList', nodes),
+            ('EdgesList', edges),
+            ('FacesList', faces),
+            ('RegionsList', volumes),
+            ])
+
+    def add_min_field(self, fields):
+        '''Minimum of the fields `fields`.
+        '''
+        return self._new_field('Min', [('FieldsList', fields)])
+
+    def add_max_field(self, fields):
+        '''Maximum of the fields `fields`.
+        '''
+        return self._new_field('Max', [('FieldsList', fields)])
+
+    def add_background_mesh_from_array(
+            self, values, axes=None, points=None, cells=None, filename=None,
+            as_field=False
+            ):
+        '''Mesh sizes from an array: `values` are either given on the
+        tensor-product grid with the coordinate vectors `axes` (2D or 3D), at
+        the nodes `points` of the triangles or tetrahedra `cells`, or at the
+        scattered points `points` (needs SciPy). They are written to
+        `filename` (required) as a binary Gmsh view that is merged into the
+        geometry; the file must exist until the mesh is generated, and
+        removing it afterwards is up to the caller.
+
+        The view becomes the background mesh, and `None` is returned; with
+        `as_field`, a `PostView` field is returned instead, e.g., for use in
+        :meth:`add_background_field`.
+        '''
+        assert filename is not None, \
+            'Specify the file for the mesh sizes.'
+        if axes is not None:
+            cell_type, X, v = post_view.grid_cells(axes, values)
+        elif cells is not None:
+            cell_type, X, v = post_view.mesh_cells(points, cells, values)
+        else:
+            assert points is not None
+            cell_type, X, v = post_view.scattered_cells(points, values)
+
+        post_view.write_pos(filename, cell_type, X, v, name='lcar')
+
+        self._GMSH_CODE.append('Merge "{}";'.format(filename))
+        # The merged view is the last one.
+        view = 'PostProcessing.NbViews-1'
+        if as_field:
+            return self._new_field('PostView', [('IView', view)])
+        self._GMSH_CODE.append('Background Mesh View[{}];'.format(view))
+        return None
+
+    def set_lcar_from_feature_size(
+            self,
+            num_cells_across=2,
+            growth_rate=1.3,
+            lcar_max=None
+            ):
+        '''Sets the mesh sizes at the points on curves from the local feature
+        size (cf. :mod:`pygmsh.built_in.feature_size`): `num_cells_across`
+        cells across each feature, but no smaller than the current size at the
+        point (typically the size needed at the smallest feature) and no
+        larger than `lcar_max` (default: the diameter of the geometry). The
+        sizes then grow by at most the factor `growth_rate` per cell.
+
+        Points without a mesh size are left alone.
+        '''
+        assert self._num_shared == 0, \
+            'The points are shared with forks and can\'t be modified.'
+        points, sizes = feature_size.graded_lcar(
+            self._GMSH_CODE,
+            num_cells_across=num_cells_across,
+            growth_rate=growth_rate,
+            lcar_max=lcar_max
+            )
+        changed = False
+        for p, size in zip(points, sizes):
+            # Unchanged sizes keep their expressions (e.g., parameters).
+            if p.lcar is not None and size != p.lcar:
+                p.lcar = float(size)
+                changed = True
+        if changed:
+            # The code of the points has changed.
+            self._reset_code_cache()
+        return
@@ -5,6 +5,8 @@ from .point import Point
 
 
 class Spline(LineBase):
+    __slots__ = ('points',)
+
     def __init__(self, points):
         super(Spline, self).__init__()
 
@@ -12,11 +14,13 @@ class Spline(LineBase):
             assert isinstance(c, Point)
         assert len(points) > 1
 
-        self.points = points
+        self.points = list(points)
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = newl;'.format(self.id),
             'Spline({}) = {{{}}};'.format(
                 self.id, ', '.join([c.id for c in self.points])
             )])
-        return
@@ -4,8 +4,8 @@
 
 class SurfaceBase(object):
     _ID = 0
-    num_edges = 0
     dimension = 2
+    __slots__ = ('id', 'num_edges')
 
     def __init__(self, id0=None, num_edges=0):
         isinstance(id0, str)
@@ -16,3 +16,48 @@ class SurfaceBase(object):
             SurfaceBase._ID += 1
         self.num_edges = num_edges
         return
+
+    def __neg__(self):
+        return OrientedSurface(self, -1)
+
+
+class OrientedSurface(SurfaceBase):
+    '''Reference to a surface with an orientation (sign plus target), e.g., for
+    reversed surfaces in surface loops. Like
+    :class:`~pygmsh.built_in.line_base.OrientedLine`, nothing is copied.
+    '''
+    __slots__ = ('target', 'sign')
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, target, sign=-1):
+        assert sign in [-1, +1]
+        if isinstance(target, OrientedSurface):
+            sign *= target.sign
+            target = target.target
+        self.target = target
+        self.sign = sign
+        return
+
+    @property
+    def id(self):
+        if self.sign > 0:
+            return self.target.id
+        return '-' + self.target.id
+
+    @property
+    def num_edges(self):
+        return self.target.num_edges
+
+    def __neg__(self):
+        if self.sign < 0:
+            return self.target
+        return OrientedSurface(self.target, -1)
+
+    def __reduce__(self):
+        # The id is computed, so the default (the slots) doesn't work.
+        return (OrientedSurface, (self.target, self.sign))
+
+    def __getattr__(self, name):
+        if name in ['target', 'sign'] or name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self.target, name)
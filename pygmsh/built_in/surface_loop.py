@@ -5,16 +5,19 @@
 class SurfaceLoop(object):
     _ID = 0
     dimension = 2
+    __slots__ = ('surfaces', 'id')
 
     def __init__(self, surfaces):
-        self.surfaces = surfaces
+        self.surfaces = list(surfaces)
 
         self.id = 'sl{}'.format(SurfaceLoop._ID)
         SurfaceLoop._ID += 1
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        return '\n'.join([
             '{} = news;'.format(self.id),
             'Surface Loop({}) = {{{}}};'.format(
-                self.id, ','.join([s.id for s in surfaces])
+                self.id, ','.join([s.id for s in self.surfaces])
             )])
-        return
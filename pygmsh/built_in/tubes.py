@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Tori and pipes, built from circles and rectangles by extrusions.
+'''
+import numpy
+
+
+class TubesMixin(object):
+    '''The tori and pipes of :class:`Geometry`.
+    '''
+    def add_torus(
+            self,
+            irad, orad,
+            lcar,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0]),
+            variant='extrude_lines',
+            transform=None
+            ):
+        '''Torus under the coordinate transformation
+
+        .. math::
+            \\hat{x} = R x + x_0;
+
+        alternatively, `R` and :math:`x_0` are taken from the
+        :class:`pygmsh.Transform` `transform`.
+        '''
+        if transform is not None:
+            R, x0 = transform.R, transform.x0
+
+        if variant == 'extrude_lines':
+            return self._add_torus_extrude_lines(
+                irad, orad,
+                lcar,
+                R=R,
+                x0=x0
+                )
+        assert variant == 'extrude_circle'
+        return self._add_torus_extrude_circle(
+            irad, orad,
+            lcar,
+            R=R,
+            x0=x0
+            )
+
+    def _add_torus_extrude_lines(
+            self,
+            irad, orad,
+            lcar,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0])
+            ):
+        '''Create Gmsh code for the torus in the x-y plane under the coordinate
+        transformation
+
+        .. math::
+            \\hat{x} = R x + x_0.
+
+        :param irad: inner radius of the torus
+        :param orad: outer radius of the torus
+        '''
+        self.add_comment('Torus')
+
+        # Add circle
+        x0t = numpy.dot(R, numpy.array([0.0, orad, 0.0]))
+        # Get circles in y-z plane
+        Rc = numpy.array([
+            [0.0, 0.0, 1.0],
+            [0.0, 1.0, 0.0],
+            [1.0, 0.0, 0.0]
+            ])
+        c = self.add_circle(x0+x0t, irad, lcar, R=numpy.dot(R, Rc))
+
+        rot_axis = [0.0, 0.0, 1.0]
+        rot_axis = numpy.dot(R, rot_axis)
+        point_on_rot_axis = [0.0, 0.0, 0.0]
+        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
+
+        # Form the torus by extruding the circle three times by 2/3*pi. This
+        # works around the inability of Gmsh to extrude by pi or more. The
+        # Extrude() macro returns an array; the first [0] entry in the array is
+        # the entity that has been extruded at the far end. This can be used
+        # for the following Extrude() step.  The second [1] entry of the array
+        # is the surface that was created by the extrusion.
+        previous = list(c.line_loop.lines)
+        angle = '2*Pi/3'
+        all_surfaces = []
+        for i in range(3):
+            self.add_comment('Round no. {}'.format(i+1))
+            for k, p in enumerate(previous):
+                # ts1[] = Extrude {{0,0,1}, {0,0,0}, 2*Pi/3}{Line{tc1};};
+                # ...
+                top, surf, _ = self.extrude(
+                    p,
+                    rotation_axis=rot_axis,
+                    point_on_axis=point_on_rot_axis,
+                    angle=angle
+                    )
+                all_surfaces.append(surf)
+                previous[k] = top
+
+        # compound_surface = CompoundSurface(all_surfaces)
+
+        surface_loop = self.add_surface_loop(all_surfaces)
+        vol = self.add_volume(surface_loop)
+
+        # The newline at the end is essential:
+        # If a GEO file doesn't end in a newline, Gmsh will report a syntax
+        # error.
+        self.add_comment('\n')
+        return vol
+
+    def _add_torus_extrude_circle(
+            self,
+            irad, orad,
+            lcar,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0])
+            ):
+        '''Create Gmsh code for the torus under the coordinate transformation
+
+        .. math::
+            \\hat{x} = R x + x_0.
+
+        :param irad: inner radius of the torus
+        :param orad: outer radius of the torus
+        '''
+        self.add_comment(76*'-')
+        self.add_comment('Torus')
+
+        # Add circle
+        x0t = numpy.dot(R, numpy.array([0.0, orad, 0.0]))
+        Rc = numpy.array([
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0]
+            ])
+        c = self.add_circle(x0+x0t, irad, lcar, R=numpy.dot(R, Rc))
+
+        rot_axis = [0.0, 0.0, 1.0]
+        rot_axis = numpy.dot(R, rot_axis)
+        point_on_rot_axis = [0.0, 0.0, 0.0]
+        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
+
+        # Form the torus by extruding the circle three times by 2/3*pi. This
+        # works around the inability of Gmsh to extrude by pi or more. The
+        # Extrude() macro returns an array; the first [0] entry in the array is
+        # the entity that has been extruded at the far end. This can be used
+        # for the following Extrude() step.  The second [1] entry of the array
+        # is the surface that was created by the extrusion. The third [2-end]
+        # is a list of all the planes of the lateral surface.
+        previous = c.plane_surface
+        all_volumes = []
+        num_steps = 3
+        for _ in range(num_steps):
+            top, vol, _ = self.extrude(
+                previous,
+                rotation_axis=rot_axis,
+                point_on_axis=point_on_rot_axis,
+                angle='2*Pi/{}'.format(num_steps)
+                )
+            previous = top
+            all_volumes.append(vol)
+
+        vol = self.add_compound_volume(all_volumes)
+        self.add_comment(76*'-' + '\n')
+        return vol
+
+    def add_pipe(
+            self,
+            outer_radius, inner_radius, length,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0]),
+            lcar=0.1,
+            variant='rectangle_rotation',
+            transform=None
+            ):
+        '''Hollow cylinder along the :math:`z`-axis (`rectangle_rotation`) or
+        the :math:`x`-axis (`circle_extrusion`) under the coordinate
+        transformation
+
+        .. math::
+            \\hat{x} = R x + x_0;
+
+        alternatively, `R` and :math:`x_0` are taken from the
+        :class:`pygmsh.Transform` `transform`.
+        '''
+        if transform is not None:
+            R, x0 = transform.R, transform.x0
+
+        if variant == 'rectangle_rotation':
+            return self._add_pipe_by_rectangle_rotation(
+                outer_radius, inner_radius, length,
+                R=R,
+                x0=x0,
+                lcar=lcar
+                )
+        assert variant == 'circle_extrusion'
+        return self._add_pipe_by_circle_extrusion(
+            outer_radius, inner_radius, length,
+            R=R,
+            x0=x0,
+            lcar=lcar
+            )
+
+    def _add_pipe_by_rectangle_rotation(
+            self,
+            outer_radius, inner_radius, length,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0]),
+            lcar=0.1
+            ):
+        '''Hollow cylinder.
+        Define a rectangle, extrude it by rotation.
+        '''
+        self.add_comment('Define rectangle.')
+        X = numpy.array([
+            [0.0, outer_radius, -0.5*length],
+            [0.0, outer_radius, +0.5*length],
+            [0.0, inner_radius, +0.5*length],
+            [0.0, inner_radius, -0.5*length]
+            ])
+        # Apply transformation.
+        X = numpy.dot(X, numpy.asarray(R).T) + x0
+        # Create points set.
+        p = [self.add_point(x, lcar) for x in X]
+
+        # Define edges.
+        e = [self.add_line(p[0], p[1]),
+             self.add_line(p[1], p[2]),
+             self.add_line(p[2], p[3]),
+             self.add_line(p[3], p[0])
+             ]
+
+        rot_axis = [0.0, 0.0, 1.0]
+        rot_axis = numpy.dot(R, rot_axis)
+        point_on_rot_axis = [0.0, 0.0, 0.0]
+        point_on_rot_axis = numpy.dot(R, point_on_rot_axis) + x0
+
+        # Extrude all edges three times by 2*Pi/3.
+        previous = e
+        angle = '2*Pi/3'
+        all_surfaces = []
+        # com = []
+        self.add_comment('Extrude in 3 steps.')
+        for i in range(3):
+            self.add_comment('Step {}'.format(i+1))
+            for k, p in enumerate(previous):
+                # ts1[] = Extrude {{0,0,1}, {0,0,0}, 2*Pi/3}{Line{tc1};};
+                top, surf, _ = self.extrude(
+                        p,
+                        rotation_axis=rot_axis,
+                        point_on_axis=point_on_rot_axis,
+                        angle=angle
+                        )
+                # if k==0:
+                #     com.append(surf)
+                # else:
+                #     all_names.appends(surf)
+                all_surfaces.append(surf)
+                previous[k] = top
+        #
+        # cs = CompoundSurface(com)
+        # Now just add surface loop and volume.
+        # all_surfaces = all_names + [cs]
+        surface_loop = self.add_surface_loop(all_surfaces)
+        vol = self.add_volume(surface_loop)
+        return vol
+
+    def _add_pipe_by_circle_extrusion(
+            self,
+            outer_radius, inner_radius, length,
+            R=numpy.eye(3),
+            x0=numpy.array([0.0, 0.0, 0.0]),
+            lcar=0.1
+            ):
+        '''Hollow cylinder.
+        Define a ring, extrude it by translation.
+        '''
+        # Define ring which to Extrude by translation.
+        Rc = numpy.array([
+            [0.0, 0.0, 1.0],
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0]
+            ])
+        c_inner = self.add_circle(
+            x0, inner_radius, lcar, R=numpy.dot(R, Rc),
+            make_surface=False
+            )
+        circ = self.add_circle(
+            x0, outer_radius, lcar, R=numpy.dot(R, Rc),
+            holes=[c_inner.line_loop]
+            )
+
+        # Now Extrude the ring surface.
+        _, vol, _ = self.extrude(
+            circ.plane_surface,
+            translation_axis=numpy.dot(R, [length, 0, 0])
+            )
+        return vol
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Checks of the recorded geometry that catch invalid input before Gmsh runs:
+references to entities that aren't defined (yet), line loops that aren't
+closed, and holes of plane surfaces that aren't inside of the outer loop or
+that overlap each other. The checks only look at the entity graph and the
+coordinates of the points; entities that are only known from code strings
+(e.g., the results of extrusions) are skipped.
+'''
+import numpy
+
+from ..helpers import _is_string
+
+from .bspline import Bspline
+from .circle_arc import CircleArc
+from .compound_line import CompoundLine
+from .ellipse_arc import EllipseArc
+from .line import Line
+from .line_base import OrientedLine
+from .line_loop import LineLoop
+from .passes import _IDENTIFIER, _referenced, _target
+from .plane_surface import PlaneSurface
+from .serialization import id_counter
+from .spline import Spline
+from .surface import Surface
+from .surface_loop import SurfaceLoop
+
+# number of points per circle or ellipse arc in the polygonal approximation
+_ARC_SAMPLES = 16
+
+
+def _coordinates(point):
+    return numpy.array([float(x) for x in point.x])
+
+
+def _end_points(curve):
+    '''The first and the last point of `curve`, in its orientation, or `None`
+    if they aren't known.
+    '''
+    sign = 1
+    if isinstance(curve, OrientedLine):
+        sign = curve.sign
+        curve = curve.target
+    if isinstance(curve, (Line, Spline)):
+        ends = [curve.points[0], curve.points[-1]]
+    elif isinstance(curve, Bspline):
+        ends = [curve.control_points[0], curve.control_points[-1]]
+    elif isinstance(curve, (CircleArc, EllipseArc)):
+        ends = [curve.start, curve.end]
+    elif isinstance(curve, CompoundLine) and curve.lines:
+        first = _end_points(curve.lines[0])
+        last = _end_points(curve.lines[-1])
+        if first is None or last is None:
+            return None
+        ends = [first[0], last[1]]
+    else:
+        return None
+    return ends if sign > 0 else ends[::-1]
+
+
+def _circle_arcs(arcs):
+    '''Points on the circle `arcs`, all at once, as an array of shape
+    `(len(arcs), _ARC_SAMPLES, 3)`; the points of each arc start at its start
+    point and don't include its end point.
+    '''
+    S, C, E = [
+        numpy.array([_coordinates(p) for p in points])
+        for points in zip(*[(a.start, a.center, a.end) for a in arcs])
+        ]
+    u = S - C
+    v = E - C
+    r = numpy.linalg.norm(u, axis=1)
+    e1 = u / r[:, None]
+    e2 = v - numpy.einsum('ij,ij->i', v, e1)[:, None] * e1
+    norm = numpy.linalg.norm(e2, axis=1)
+    e2 /= numpy.where(norm > 0.0, norm, 1.0)[:, None]
+    # Gmsh's arcs are the shorter ones, with angles in [0, pi].
+    angle = numpy.arctan2(
+        numpy.einsum('ij,ij->i', v, e2), numpy.einsum('ij,ij->i', v, e1)
+        )
+    t = numpy.outer(angle, numpy.arange(_ARC_SAMPLES) / float(_ARC_SAMPLES))
+    return C[:, None] + r[:, None, None] * (
+        numpy.cos(t)[..., None] * e1[:, None]
+        + numpy.sin(t)[..., None] * e2[:, None]
+        )
+
+
+def _ellipse_arc(start, center, major, end):
+    '''Points on the ellipse arc from `start` to `end`, without `end`, with
+    the major axis through the point `major`.
+    '''
+    u = start - center
+    v = end - center
+    e1 = (major - center) / numpy.linalg.norm(major - center)
+    w = u if numpy.linalg.norm(u - numpy.dot(u, e1) * e1) \
+        > numpy.linalg.norm(v - numpy.dot(v, e1) * e1) else v
+    e2 = w - numpy.dot(w, e1) * e1
+    norm = numpy.linalg.norm(e2)
+    if norm == 0.0:
+        return numpy.array([start])
+    e2 /= norm
+
+    # semi-axes a, b from x^2/a^2 + y^2/b^2 = 1 at both end points
+    X = numpy.array([[numpy.dot(u, e1), numpy.dot(u, e2)],
+                     [numpy.dot(v, e1), numpy.dot(v, e2)]])
+    try:
+        inv = numpy.linalg.solve(X**2, numpy.ones(2))
+    except numpy.linalg.LinAlgError:
+        return numpy.array([start])
+    if numpy.any(inv <= 0.0):
+        return numpy.array([start])
+    a, b = 1.0 / numpy.sqrt(inv)
+
+    t0, t1 = numpy.arctan2(X[:, 1] / b, X[:, 0] / a)
+    # Gmsh's arcs are the shorter ones.
+    if t1 - t0 > numpy.pi:
+        t1 -= 2 * numpy.pi
+    elif t0 - t1 > numpy.pi:
+        t1 += 2 * numpy.pi
+    t = numpy.linspace(t0, t1, _ARC_SAMPLES, endpoint=False)
+    return center + numpy.outer(a * numpy.cos(t), e1) \
+        + numpy.outer(b * numpy.sin(t), e2)
+
+
+def _curve_points(curve, arcs):
+    '''Points along `curve` in its orientation, without the last one, or
+    `None` if the curve isn't known. `arcs` are the points on the circle arcs
+    by their `id()`, cf. :func:`_circle_arcs`.
+    '''
+    sign = 1
+    if isinstance(curve, OrientedLine):
+        sign = curve.sign
+        curve = curve.target
+    if isinstance(curve, (Line, Spline)):
+        X = numpy.array([_coordinates(p) for p in curve.points])
+    elif isinstance(curve, Bspline):
+        X = numpy.array([_coordinates(p) for p in curve.control_points])
+    elif isinstance(curve, CircleArc):
+        X = numpy.concatenate([arcs[id(curve)], [_coordinates(curve.end)]])
+    elif isinstance(curve, EllipseArc):
+        X = _ellipse_arc(*[_coordinates(p) for p in [
+            curve.start, curve.center, curve.point_on_major_axis, curve.end
+            ]])
+        X = numpy.concatenate([X, [_coordinates(curve.end)]])
+    else:
+        return None
+    if sign < 0:
+        X = X[::-1]
+    return X[:-1]
+
+
+def _loop_errors(loop):
+    '''Checks that the curves of `loop` form a closed loop: every point has
+    as many curves ending in it as starting from it.
+    '''
+    degree = {}
+    names = {}
+    for curve in loop.lines:
+        ends = _end_points(curve)
+        if ends is None:
+            return []
+        for p, d in zip(ends, [1, -1]):
+            degree[id(p)] = degree.get(id(p), 0) + d
+            names[id(p)] = p.id
+    open_ends = sorted(names[k] for k, d in degree.items() if d != 0)
+    if open_ends:
+        return ['Line loop {} isn\'t closed (at {}).'.format(
+            loop.id, ', '.join(open_ends)
+            )]
+    return []
+
+
+def _polygon(loop, arcs):
+    '''The points along `loop`, or `None` if the curves aren't known or not
+    in order.
+    '''
+    ends = [_end_points(curve) for curve in loop.lines]
+    if any(e is None for e in ends) or any(
+            a[1] is not b[0] for a, b in zip(ends, ends[1:] + ends[:1])
+            ):
+        return None
+    return numpy.concatenate([
+        _curve_points(curve, arcs) for curve in loop.lines
+        ])
+
+
+def _inside(X, polygon):
+    '''Which of the 2D points `X` are inside of `polygon`, by counting the
+    crossings of a ray in x-direction with the edges.
+    '''
+    a = polygon
+    b = numpy.roll(polygon, -1, axis=0)
+    x = X[:, [0]]
+    y = X[:, [1]]
+    crosses = (a[:, 1] > y) != (b[:, 1] > y)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        xc = a[:, 0] \
+            + (y - a[:, 1]) * (b[:, 0] - a[:, 0]) / (b[:, 1] - a[:, 1])
+    return numpy.sum(crosses & (x < xc), axis=1) % 2 == 1
+
+
+def _overlapping_boxes(lower, upper):
+    '''The pairs `(i, j)`, `i < j`, of boxes `[lower, upper]` that overlap,
+    by sweeping in x-direction.
+    '''
+    n = len(lower)
+    order = numpy.argsort(lower[:, 0], kind='mergesort')
+    lower = lower[order]
+    upper = upper[order]
+    # candidates j of i: the boxes that start before i ends
+    end = numpy.searchsorted(lower[:, 0], upper[:, 0], side='right')
+    counts = numpy.maximum(end - numpy.arange(n) - 1, 0)
+    i = numpy.repeat(numpy.arange(n), counts)
+    j = i + 1 + numpy.arange(len(i)) \
+        - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+    mask = numpy.all((lower[j] <= upper[i]) & (lower[i] <= upper[j]), axis=1)
+    i = order[i[mask]]
+    j = order[j[mask]]
+    return zip(numpy.minimum(i, j), numpy.maximum(i, j))
+
+
+def _hole_errors(surface):
+    '''Checks that the holes of the plane `surface` lie inside of its outer
+    loop and don't overlap each other.
+    '''
+    if not surface.holes:
+        return []
+    loops = [surface.line_loop] + surface.holes
+    circle_arcs = [
+        c for loop in loops for c in (_target(c) for c in loop.lines)
+        if isinstance(c, CircleArc)
+        ]
+    arcs = {} if not circle_arcs else \
+        dict(zip(map(id, circle_arcs), _circle_arcs(circle_arcs)))
+
+    outer = _polygon(surface.line_loop, arcs)
+    if outer is None or len(outer) < 3:
+        return []
+    holes = [(h, _polygon(h, arcs)) for h in surface.holes]
+    holes = [(h, X) for h, X in holes if X is not None and len(X) > 2]
+    if not holes:
+        return []
+
+    # project onto the plane of the outer loop (Newell's normal)
+    center = numpy.mean(outer, axis=0)
+    normal = numpy.sum(numpy.cross(outer, numpy.roll(outer, -1, axis=0)), 0)
+    norm = numpy.linalg.norm(normal)
+    if norm == 0.0:
+        return []
+    normal /= norm
+    e1 = outer[numpy.argmax(numpy.linalg.norm(outer - center, axis=1))] \
+        - center
+    e1 -= numpy.dot(e1, normal) * normal
+    e1 /= numpy.linalg.norm(e1)
+    e2 = numpy.cross(normal, e1)
+
+    def project(X):
+        return numpy.column_stack([
+            numpy.dot(X - center, e1), numpy.dot(X - center, e2)
+            ])
+
+    outer = project(outer)
+    X = project(numpy.concatenate([X for _, X in holes]))
+    offsets = numpy.cumsum([0] + [len(X) for _, X in holes])
+    holes = [
+        (h, X[offsets[k]:offsets[k+1]]) for k, (h, _) in enumerate(holes)
+        ]
+
+    # all points of the holes at once, in chunks of limited memory
+    chunk = max(1, 2**20 // len(outer))
+    inside = numpy.concatenate([
+        _inside(X[k:k+chunk], outer) for k in range(0, len(X), chunk)
+        ])
+    errors = [
+        'Hole {} of plane surface {} isn\'t inside of its outer line loop '
+        '{}.'.format(h.id, surface.id, surface.line_loop.id)
+        for (h, _), ok in zip(
+            holes, numpy.logical_and.reduceat(inside, offsets[:-1])
+            )
+        if not ok
+        ]
+
+    lower = numpy.array([numpy.min(X, axis=0) for _, X in holes])
+    upper = numpy.array([numpy.max(X, axis=0) for _, X in holes])
+    for i, j in sorted(_overlapping_boxes(lower, upper)):
+        (hi, Xi), (hj, Xj) = holes[i], holes[j]
+        if numpy.any(_inside(Xi, Xj)) or numpy.any(_inside(Xj, Xi)):
+            errors.append(
+                'Holes {} and {} of plane surface {} overlap.'.format(
+                    hi.id, hj.id, surface.id
+                    ))
+    return errors
+
+
+def _surface_loop_errors(loop):
+    '''Checks that every curve of the surfaces of `loop` is shared by exactly
+    two of them.
+    '''
+    count = {}
+    names = {}
+    for surface in loop.surfaces:
+        surface = _target(surface)
+        if not isinstance(surface, (PlaneSurface, Surface)) \
+                or isinstance(surface, PlaneSurface) and surface.holes:
+            return []
+        for curve in surface.line_loop.lines:
+            curve = _target(curve)
+            count[id(curve)] = count.get(id(curve), 0) + 1
+            names[id(curve)] = curve.id
+    open_curves = sorted(names[k] for k, c in count.items() if c != 2)
+    if open_curves:
+        return ['Surface loop {} isn\'t closed (at {}).'.format(
+            loop.id, ', '.join(open_curves)
+            )]
+    return []
+
+
+def check(statements):
+    '''Returns the problems found in `statements`, as a list of messages,
+    cf. :meth:`Geometry.validate`.
+    '''
+    errors = []
+    defined = set()
+    names = set()
+    for s in statements:
+        if _is_string(s):
+            names.update(_IDENTIFIER.findall(s))
+            continue
+
+        # Entities with generated ids must be defined before; others (like
+        # the results of extrusions) are defined in code strings.
+        for e in _referenced(s):
+            if id(e) not in defined and e.id not in names \
+                    and id_counter(e) is not None:
+                errors.append(
+                    '{} references {}, which isn\'t defined before.'.format(
+                        s.id, e.id
+                        ))
+        defined.add(id(s))
+
+        if isinstance(s, LineLoop):
+            errors.extend(_loop_errors(s))
+        elif isinstance(s, PlaneSurface):
+            errors.extend(_hole_errors(s))
+        elif isinstance(s, SurfaceLoop):
+            errors.extend(_surface_loop_errors(s))
+    return errors
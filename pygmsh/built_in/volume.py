@@ -4,6 +4,8 @@
 from .volume_base import VolumeBase
 
 class Volume(VolumeBase):
+    __slots__ = ('surface_loop', 'holes')
+
     def __init__(self, surface_loop, holes=None):
         super(Volume, self).__init__()
 
@@ -11,13 +13,14 @@ class Volume(VolumeBase):
             holes = []
 
         self.surface_loop = surface_loop
-        self.holes = holes
-
-        surface_loops = [surface_loop] + holes
+        self.holes = list(holes)
+        return
 
-        self.code = '\n'.join([
+    @property
+    def code(self):
+        surface_loops = [self.surface_loop] + self.holes
+        return '\n'.join([
             '{} = newv;'.format(self.id),
             'Volume({}) = {{{}}};'.format(
                 self.id, ', '.join([s.id for s in surface_loops])
             )])
-        return
@@ -5,6 +5,7 @@
 class VolumeBase(object):
     _ID = 0
     dimension = 3
+    __slots__ = ('id',)
 
     def __init__(self, id0=None):
         if id0:
@@ -0,0 +1,1097 @@
+# -*- coding: utf-8 -*-
+#
+'''Pre-flight estimate of the size of the mesh of a geometry, without running
+Gmsh.
+
+The lengths, areas, and volumes of the entities are computed from the point
+coordinates (lines, circle and ellipse arcs, splines via their control
+polygons) and from the parameters of the OpenCASCADE primitives. Extrusions,
+copies (`Duplicata`), and Boolean operations written by pygmsh are followed.
+The mesh size is evaluated at sample points of each entity: the point sizes
+(interpolated along curves and into surfaces and volumes, like Gmsh does), the
+background size field, and the global size limits. The number of cells of an
+entity of dimension `d` is then about
+
+.. math::
+    c_d \\int h^{-d} \\, dx
+
+with the number of ideal (equilateral) simplices per unit measure `c_d`.
+'''
+import collections
+import math
+
+import numpy
+
+from .helpers import _is_string
+from .parameter import _evaluate
+from .spatial_index import _primitive_box
+
+from .built_in.bspline import Bspline
+from .built_in.circle_arc import CircleArc
+from .built_in.compound_line import CompoundLine
+from .built_in.compound_surface import CompoundSurface
+from .built_in.compound_volume import CompoundVolume
+from .built_in.ellipse_arc import EllipseArc
+from .built_in.extrusion import Extrusion
+from .built_in.field import Field
+from .built_in.line import Line
+from .built_in.line_base import OrientedLine
+from .built_in.line_loop import LineLoop
+from .built_in.option import Option
+from .built_in.pattern import GridPattern, Pattern, PolarPattern
+from .built_in.plane_surface import PlaneSurface
+from .built_in.spline import Spline
+from .built_in.surface import Surface
+from .built_in.surface_base import OrientedSurface
+from .built_in.surface_loop import SurfaceLoop
+from .built_in.volume import Volume
+from .opencascade.ball import Ball
+from .opencascade.boolean import Boolean
+from .opencascade.box import Box
+from .opencascade.cone import Cone
+from .opencascade.cylinder import Cylinder
+from .opencascade.disk import Disk
+from .opencascade.rectangle import Rectangle
+from .opencascade.torus import Torus
+from .opencascade.wedge import Wedge
+
+MeshSizeEstimate = collections.namedtuple(
+    'MeshSizeEstimate', ['num_nodes', 'num_cells', 'unknown']
+    )
+
+_CELL_TYPES = {1: 'line', 2: 'triangle', 3: 'tetra'}
+_PRIMITIVES = (Rectangle, Disk, Box, Ball, Cylinder, Cone, Torus, Wedge)
+
+# Number of equilateral simplices with edge length 1 per unit measure.
+_CELLS_PER_MEASURE = {
+    1: 1.0,
+    2: 4.0 / math.sqrt(3.0),
+    3: 6.0 * math.sqrt(2.0),
+    }
+# Average number of cells per node in large meshes.
+_CELLS_PER_NODE = {1: 1.0, 2: 2.0, 3: 5.5}
+
+# subdivisions of each polyline segment for the sampling of curves
+_NUM_SUBDIVISIONS = 8
+# samples per axis of the grids in the bounding boxes of surfaces, volumes
+_NUM_GRID_SAMPLES = {2: 24, 3: 10}
+# refinements of the triangulations of curved surfaces
+_NUM_REFINEMENTS = 3
+
+
+class _Part(object):
+    '''Measure and samples (points, weights, mesh sizes from the points) of an
+    entity. `cells` overrides the number of cells (structured extrusions),
+    `loops` are the boundary polylines of surfaces, `edges` the boundary
+    lines with their orientations, `flux` is the integral of `x.n/3` over
+    surfaces (for volumes), and `normal` the normal of plane surfaces.
+    '''
+    __slots__ = (
+        'dim', 'measure', 'X', 'weights', 'h', 'cells', 'loops', 'edges',
+        'flux', 'normal'
+        )
+
+    def __init__(self, dim, measure, X, weights, h):
+        self.dim = dim
+        self.measure = measure
+        self.X = numpy.asarray(X, dtype=float).reshape(-1, 3)
+        self.weights = numpy.asarray(weights, dtype=float)
+        self.h = numpy.asarray(h, dtype=float)
+        self.cells = None
+        self.loops = None
+        self.edges = None
+        self.flux = None
+        self.normal = None
+        return
+
+    @property
+    def centroid(self):
+        return numpy.dot(self.weights, self.X) / numpy.sum(self.weights)
+
+
+def _norm(x):
+    return numpy.sqrt(numpy.einsum('...k,...k', x, x))
+
+
+def _arc(x0, x1, center, num):
+    '''Points on the circular arc around `center`.'''
+    u = x0 - center
+    v = x1 - center
+    angle = math.acos(
+        numpy.clip(numpy.dot(u, v) / (_norm(u) * _norm(v)), -1.0, 1.0)
+        )
+    if angle < 1.0e-12:
+        return numpy.array([x0, x1])
+    t = numpy.linspace(0.0, 1.0, num)
+    a = numpy.sin((1.0 - t) * angle) / math.sin(angle)
+    b = numpy.sin(t * angle) / math.sin(angle)
+    return center + numpy.outer(a, u) + numpy.outer(b, v)
+
+
+def _ellipse_arc(x0, x1, center, major, num):
+    '''Points on the elliptic arc; the chord if the ellipse can't be
+    determined from the points.
+    '''
+    e1 = major - center
+    e1 /= _norm(e1)
+    n = numpy.cross(x0 - center, x1 - center)
+    if _norm(n) < 1.0e-14 * _norm(x0 - center)**2:
+        n = numpy.cross(x0 - center, e1)
+    if _norm(n) < 1.0e-14 * _norm(x0 - center):
+        return numpy.array([x0, x1])
+    n /= _norm(n)
+    e2 = numpy.cross(n, e1)
+    # coordinates of the end points in the axes of the ellipse
+    xy = numpy.array([
+        [numpy.dot(x - center, e1), numpy.dot(x - center, e2)]
+        for x in [x0, x1]
+        ])
+    try:
+        inv_a2, inv_b2 = numpy.linalg.solve(xy**2, [1.0, 1.0])
+    except numpy.linalg.LinAlgError:
+        return numpy.array([x0, x1])
+    if inv_a2 <= 0.0 or inv_b2 <= 0.0:
+        return numpy.array([x0, x1])
+    a, b = 1.0 / math.sqrt(inv_a2), 1.0 / math.sqrt(inv_b2)
+    t0, t1 = numpy.arctan2(xy[:, 1] / b, xy[:, 0] / a)
+    # the shorter arc
+    dt = (t1 - t0 + numpy.pi) % (2 * numpy.pi) - numpy.pi
+    t = t0 + numpy.linspace(0.0, 1.0, num) * dt
+    return center + numpy.outer(a * numpy.cos(t), e1) \
+        + numpy.outer(b * numpy.sin(t), e2)
+
+
+def _polyline(curve, lc):
+    '''Polyline approximation of the curve and the point sizes at its
+    vertices.
+    '''
+    if isinstance(curve, Line):
+        points = curve.points
+        V = numpy.array([p.x for p in points], dtype=float)
+    elif isinstance(curve, (Spline, Bspline)):
+        points = curve.points if isinstance(curve, Spline) \
+            else curve.control_points
+        V = numpy.array([p.x for p in points], dtype=float)
+    elif isinstance(curve, CircleArc):
+        points = [curve.start, curve.end]
+        V = _arc(
+            numpy.array(curve.start.x, dtype=float),
+            numpy.array(curve.end.x, dtype=float),
+            numpy.array(curve.center.x, dtype=float),
+            17
+            )
+    else:
+        assert isinstance(curve, EllipseArc)
+        points = [curve.start, curve.end]
+        V = _ellipse_arc(
+            numpy.array(curve.start.x, dtype=float),
+            numpy.array(curve.end.x, dtype=float),
+            numpy.array(curve.center.x, dtype=float),
+            numpy.array(curve.point_on_major_axis.x, dtype=float),
+            17
+            )
+
+    sizes = numpy.array([lc if p.lcar is None else p.lcar for p in points])
+    if len(points) == len(V):
+        return V, sizes
+    # Interpolate the sizes of the end points along the arc length.
+    s = numpy.concatenate([[0.0], numpy.cumsum(_norm(numpy.diff(V, axis=0)))])
+    s /= max(s[-1], numpy.finfo(float).tiny)
+    return V, sizes[0] + s * (sizes[1] - sizes[0])
+
+
+def _subdivide(V, sizes):
+    '''Samples (midpoints of subsegments) of the polyline, their weights
+    (lengths), and the linearly interpolated sizes.
+    '''
+    t = (numpy.arange(_NUM_SUBDIVISIONS) + 0.5) / _NUM_SUBDIVISIONS
+    X = V[:-1, None, :] + t[None, :, None] * numpy.diff(V, axis=0)[:, None, :]
+    h = sizes[:-1, None] + t[None, :] * numpy.diff(sizes)[:, None]
+    weights = numpy.repeat(
+        _norm(numpy.diff(V, axis=0)) / _NUM_SUBDIVISIONS, _NUM_SUBDIVISIONS
+        )
+    return X.reshape(-1, 3), weights, h.reshape(-1)
+
+
+def _curve_part(curve, ctx):
+    V, sizes = _polyline(curve, ctx['lc'])
+    if not ctx['from_points']:
+        sizes[:] = ctx['lc']
+    X, weights, h = _subdivide(V, sizes)
+    part = _Part(1, numpy.sum(weights), X, weights, h)
+    part.loops = [(V, sizes)]
+    return part
+
+
+def _interpolate(X, Y, h):
+    '''Inverse distance weighted interpolation of the sizes `h` at the points
+    `Y` to the points `X`.
+    '''
+    out = numpy.empty(len(X))
+    chunk = max(1, 2**20 // max(len(Y), 1))
+    for start in range(0, len(X), chunk):
+        d2 = numpy.sum(
+            (X[start:start+chunk, None, :] - Y[None, :, :])**2, axis=2
+            )
+        w = 1.0 / numpy.maximum(d2, numpy.finfo(float).tiny)
+        out[start:start+chunk] = numpy.dot(w, h) / numpy.sum(w, axis=1)
+    return out
+
+
+def _loop(line_loop, parts, closed=True):
+    '''The closed polyline (vertices and sizes) of a line loop, and the lines
+    with their orientations; `None` if a line is unknown. Like Gmsh, the
+    lines are chained in the direction of the first one.
+    '''
+    pieces = []
+    for line in line_loop.lines:
+        sign = 1
+        if isinstance(line, OrientedLine):
+            sign = line.sign
+            line = line.target
+        if line.id not in parts:
+            return None
+        pieces.append((line.id, sign))
+
+    def polyline(piece):
+        v, s = parts[piece[0]].loops[0]
+        return (v[::-1], s[::-1]) if piece[1] < 0 else (v, s)
+
+    chain = [pieces.pop(0)]
+    while pieces:
+        end = polyline(chain[-1])[0][-1]
+        gaps = [
+            min(_norm(v[0] - end), _norm(v[-1] - end))
+            for v, _ in [polyline(p) for p in pieces]
+            ]
+        k = int(numpy.argmin(gaps))
+        line, sign = pieces.pop(k)
+        if _norm(polyline((line, sign))[0][0] - end) > gaps[k]:
+            sign = -sign
+        chain.append((line, sign))
+
+    V, sizes = zip(*[polyline(piece) for piece in chain])
+    if not closed:
+        V += ([V[-1][-1]] * 2,)
+        sizes += ([sizes[-1][-1]] * 2,)
+    return (
+        numpy.concatenate([v[:-1] for v in V]),
+        numpy.concatenate([s[:-1] for s in sizes]),
+        chain
+        )
+
+
+def _vector_area(V):
+    # Newell's method
+    return 0.5 * numpy.sum(numpy.cross(V, numpy.roll(V, -1, axis=0)), axis=0)
+
+
+def _plane_surface_part(surface, parts, ctx):
+    loops = [_loop(ll, parts) for ll in [surface.line_loop] + surface.holes]
+    if any(loop is None for loop in loops):
+        return None
+
+    N = _vector_area(loops[0][0])
+    area = _norm(N)
+    if area == 0.0:
+        return None
+    n = N / area
+    area -= sum(abs(numpy.dot(_vector_area(V), n)) for V, _, _ in loops[1:])
+
+    # samples: grid points inside (even-odd rule) in the plane coordinates
+    e1 = loops[0][0][1] - loops[0][0][0]
+    e1 -= numpy.dot(e1, n) * n
+    e1 /= _norm(e1)
+    e2 = numpy.cross(n, e1)
+    o = loops[0][0][0]
+    loops2 = [numpy.column_stack([(V - o).dot(e1), (V - o).dot(e2)])
+              for V, _, _ in loops]
+    lo = loops2[0].min(axis=0)
+    hi = loops2[0].max(axis=0)
+    num = _NUM_GRID_SAMPLES[2]
+    xy = numpy.array(numpy.meshgrid(
+        lo[0] + (numpy.arange(num) + 0.5) / num * (hi[0] - lo[0]),
+        lo[1] + (numpy.arange(num) + 0.5) / num * (hi[1] - lo[1]),
+        )).reshape(2, -1).T
+    is_inside = numpy.zeros(len(xy), dtype=bool)
+    for V2 in loops2:
+        a, b = V2, numpy.roll(V2, -1, axis=0)
+        crosses = (a[None, :, 1] > xy[:, None, 1]) \
+            != (b[None, :, 1] > xy[:, None, 1])
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            x = a[None, :, 0] + (xy[:, None, 1] - a[None, :, 1]) \
+                * (b[None, :, 0] - a[None, :, 0]) \
+                / (b[None, :, 1] - a[None, :, 1])
+        is_inside ^= numpy.sum(crosses & (xy[:, None, 0] < x), axis=1) % 2 == 1
+    xy = xy[is_inside]
+    if len(xy) == 0:
+        xy = loops2[0]
+    X = o + numpy.outer(xy[:, 0], e1) + numpy.outer(xy[:, 1], e2)
+
+    part = _Part(
+        2, area, X, numpy.full(len(X), area / len(X)),
+        _interior_sizes(X, loops, ctx)
+        )
+    part.loops = loops
+    part.edges = [e for _, _, edges in loops for e in edges]
+    part.normal = n
+    # x.n is constant on the plane.
+    part.flux = numpy.dot(N / _norm(N), o) * area / 3.0
+    return part
+
+
+def _interior_sizes(X, loops, ctx):
+    if not ctx['extend_from_boundary']:
+        return numpy.full(len(X), ctx['lc'])
+    Y = numpy.concatenate([V for V, _, _ in loops])
+    h = numpy.concatenate([s for _, s, _ in loops])
+    return _interpolate(X, Y, h)
+
+
+def _sphere(line_loop):
+    '''Center and radius if all lines of the loop are arcs on one sphere.
+    '''
+    lines = [
+        l.target if isinstance(l, OrientedLine) else l
+        for l in line_loop.lines
+        ]
+    if not all(isinstance(l, (CircleArc, EllipseArc)) for l in lines):
+        return None
+    if any(l.center is not lines[0].center for l in lines):
+        return None
+    c = numpy.array(lines[0].center.x, dtype=float)
+    radii = [
+        _norm(numpy.array(p.x, dtype=float) - c)
+        for l in lines for p in [l.start, l.end]
+        ]
+    if max(radii) - min(radii) > 1.0e-10 * max(radii):
+        return None
+    return c, radii[0]
+
+
+def _surface_part(surface, parts, ctx):
+    loop = _loop(surface.line_loop, parts)
+    if loop is None:
+        return None
+    V = loop[0]
+    # fan triangulation around the centroid of the boundary, refined
+    c = numpy.mean(V, axis=0)
+    T = numpy.array([
+        [c] * len(V), V, numpy.roll(V, -1, axis=0)
+        ]).transpose(1, 0, 2)
+    for _ in range(_NUM_REFINEMENTS):
+        m = 0.5 * (T + numpy.roll(T, -1, axis=1))
+        T = numpy.concatenate([
+            numpy.stack([T[:, 0], m[:, 0], m[:, 2]], axis=1),
+            numpy.stack([m[:, 0], T[:, 1], m[:, 1]], axis=1),
+            numpy.stack([m[:, 2], m[:, 1], T[:, 2]], axis=1),
+            m
+            ])
+    sphere = _sphere(surface.line_loop)
+    if sphere is not None:
+        # Gmsh interpolates arcs around one center on the sphere.
+        center, radius = sphere
+        d = T - center
+        T = center + radius * d / _norm(d)[..., None]
+
+    N = 0.5 * numpy.cross(T[:, 1] - T[:, 0], T[:, 2] - T[:, 0])
+    areas = _norm(N)
+    X = numpy.mean(T, axis=1)
+    part = _Part(
+        2, numpy.sum(areas), X, areas, _interior_sizes(X, [loop], ctx)
+        )
+    part.loops = [loop]
+    part.edges = loop[2]
+    part.flux = numpy.sum(numpy.einsum('ij,ij', X, N)) / 3.0
+    return part
+
+
+def _compound_part(entity, ctx):
+    '''The union of the parts of the entities of a compound, which are
+    replaced by the compound.
+    '''
+    parts = ctx['parts']
+    members = getattr(entity, 'lines', None) \
+        or getattr(entity, 'surfaces', None) or entity.volumes
+    ids = [(m.target if hasattr(m, 'target') else m).id for m in members]
+    if any(i not in parts for i in ids):
+        return None
+    part = _Part(
+        parts[ids[0]].dim,
+        sum(parts[i].measure for i in ids),
+        numpy.concatenate([parts[i].X for i in ids]),
+        numpy.concatenate([parts[i].weights for i in ids]),
+        numpy.concatenate([parts[i].h for i in ids])
+        )
+    if part.dim == 1:
+        loop = _loop(entity, parts, closed=False)
+        part.loops = [loop[:2]]
+    elif part.dim == 2:
+        orientation = _orient(members, parts)
+        if orientation is not None:
+            # The boundary consists of the lines used once.
+            count = collections.Counter(
+                line for i, _ in orientation for line, _ in parts[i].edges
+                )
+            part.edges = [
+                (line, sign * line_sign)
+                for i, sign in orientation
+                for line, line_sign in parts[i].edges
+                if count[line] == 1
+                ]
+            part.flux = sum(sign * parts[i].flux for i, sign in orientation)
+    ctx['alive'] = [e for e in ctx['alive'] if e not in ids]
+    return part
+
+
+def _grid(lo, hi, num):
+    '''Cell centers of a grid in the box from `lo` to `hi`.'''
+    axes = [
+        a + (numpy.arange(num) + 0.5) / num * (b - a) for a, b in zip(lo, hi)
+        ]
+    return numpy.array(numpy.meshgrid(*axes)).reshape(len(lo), -1).T
+
+
+def _orient(surfaces, parts):
+    '''Consistent orientations of the surfaces: neighboring surfaces traverse
+    their common line in opposite directions. Returns the ids and signs of
+    the surfaces, or `None` if a surface is unknown.
+    '''
+    signs = []
+    ids = []
+    for s in surfaces:
+        sign = 1
+        if isinstance(s, OrientedSurface):
+            sign = s.sign
+            s = s.target
+        if s.id not in parts or parts[s.id].edges is None:
+            return None
+        signs.append(sign)
+        ids.append(s.id)
+
+    line_users = {}
+    for k, (i, sign) in enumerate(zip(ids, signs)):
+        for line, line_sign in parts[i].edges:
+            line_users.setdefault(line, []).append((k, sign * line_sign))
+
+    orientation = [None] * len(ids)
+    for start in range(len(ids)):
+        if orientation[start] is not None:
+            continue
+        orientation[start] = 1
+        stack = [start]
+        while stack:
+            k = stack.pop()
+            for line, line_sign in parts[ids[k]].edges:
+                direction = orientation[k] * signs[k] * line_sign
+                for j, other in line_users[line]:
+                    if orientation[j] is None:
+                        orientation[j] = -1 if other == direction else 1
+                        stack.append(j)
+    return [(i, o * sign) for i, o, sign in zip(ids, orientation, signs)]
+
+
+def _enclosed_volume(surfaces, parts):
+    orientation = _orient(surfaces, parts)
+    if orientation is None \
+            or any(parts[i].flux is None for i, _ in orientation):
+        return None
+    return abs(sum(sign * parts[i].flux for i, sign in orientation))
+
+
+def _volume_part(volume, parts):
+    surface_loops = [volume.surface_loop] + volume.holes
+    fluxes = [_enclosed_volume(sl.surfaces, parts) for sl in surface_loops]
+    if any(flux is None for flux in fluxes):
+        return None
+    measure = fluxes[0] - sum(fluxes[1:])
+
+    surfaces = [
+        parts[(s.target if isinstance(s, OrientedSurface) else s).id]
+        for s in volume.surface_loop.surfaces
+        ]
+    Y = numpy.concatenate([p.X for p in surfaces])
+    h = numpy.concatenate([p.h for p in surfaces])
+    X = _grid(Y.min(axis=0), Y.max(axis=0), _NUM_GRID_SAMPLES[3])
+    return _Part(
+        3, measure, X, numpy.full(len(X), measure / len(X)),
+        _interpolate(X, Y, h)
+        )
+
+
+def _primitive_part(entity, ctx):
+    '''Parts of the OpenCASCADE primitives.'''
+    lc = ctx['lc'] if entity.char_length is None else entity.char_length
+    lo, hi = _primitive_box(entity)
+    dim = 2 if isinstance(entity, (Rectangle, Disk)) else 3
+    if isinstance(entity, Rectangle):
+        r = entity.corner_radius or 0.0
+        measure = entity.a * entity.b - (4.0 - math.pi) * r**2
+    elif isinstance(entity, Disk):
+        r1 = entity.radius0 if entity.radius1 is None else entity.radius1
+        measure = math.pi * entity.radius0 * r1
+    elif isinstance(entity, Box):
+        measure = float(numpy.prod(entity.extents))
+    elif isinstance(entity, Ball):
+        # polar angles from x0 to x1, azimuthal angle alpha
+        a0 = -0.5 * math.pi if entity.x0 is None else entity.x0
+        a1 = 0.5 * math.pi if entity.x1 is None else entity.x1
+        alpha = 2 * math.pi if entity.alpha is None else entity.alpha
+        measure = alpha / 3.0 * entity.radius**3 \
+            * (math.sin(a1) - math.sin(a0))
+    elif isinstance(entity, Cylinder):
+        angle = 2 * math.pi if entity.angle is None else entity.angle
+        measure = 0.5 * angle * entity.radius**2 * _norm(
+            numpy.array(entity.axis, dtype=float)
+            )
+    elif isinstance(entity, Cone):
+        alpha = 2 * math.pi if entity.alpha is None else entity.alpha
+        r0, r1 = entity.radius0, entity.radius1
+        measure = alpha / 6.0 * (r0**2 + r0 * r1 + r1**2) * _norm(
+            numpy.array(entity.axis, dtype=float)
+            )
+    elif isinstance(entity, Torus):
+        alpha = 2 * math.pi if entity.alpha is None else entity.alpha
+        measure = alpha * math.pi * entity.radius0 * entity.radius1**2
+    else:
+        assert isinstance(entity, Wedge)
+        dx, dy, dz = entity.extents
+        top = entity.top_extent or 0.0
+        measure = 0.5 * dy * dz * (dx + top)
+
+    if dim == 2:
+        X = _grid(lo[:2], hi[:2], _NUM_GRID_SAMPLES[2])
+        X = numpy.column_stack([X, numpy.full(len(X), lo[2])])
+    else:
+        X = _grid(lo, hi, _NUM_GRID_SAMPLES[3])
+    part = _Part(
+        dim, measure, X, numpy.full(len(X), measure / len(X)),
+        numpy.full(len(X), lc)
+        )
+    if dim == 2:
+        # in the x-y-plane
+        part.normal = numpy.array([0.0, 0.0, 1.0])
+    return part
+
+
+def _copy(part, dim=None, measure=None, shift=None):
+    out = _Part(
+        part.dim if dim is None else dim,
+        part.measure if measure is None else measure,
+        part.X if shift is None else part.X + shift,
+        part.weights, part.h
+        )
+    if measure is not None:
+        out.weights = part.weights * measure / part.measure
+    if out.dim == part.dim:
+        out.loops = part.loops
+        out.normal = part.normal
+    return out
+
+
+def _value(x, ctx):
+    '''The number `x` or the value of the Gmsh expression `x`, with the
+    defaults of the parameters.
+    '''
+    if _is_string(x):
+        return float(_evaluate(x, ctx['parameters']))
+    return float(x)
+
+
+def _target_id(entity):
+    return getattr(entity, 'target', entity).id
+
+
+def _extrusion_parts(extrusion, ctx):
+    '''The parts of `id[0]` (top) and `id[1]` (extruded) of an extrusion.
+    '''
+    if _is_string(extrusion.entity) \
+            or _target_id(extrusion.entity) not in ctx['parts']:
+        return {}
+    source = _target_id(extrusion.entity)
+    part = ctx['parts'][source]
+    if extrusion.translation_axis is not None:
+        # translation; twisted extrusions are approximated by it
+        t = numpy.array([_value(x, ctx) for x in extrusion.translation_axis])
+        if part.normal is not None:
+            measure = part.measure * abs(numpy.dot(t, part.normal))
+        else:
+            # upper bound
+            measure = part.measure * _norm(t)
+        shift = t
+    else:
+        # rotation (Pappus)
+        axis = numpy.array([_value(x, ctx) for x in extrusion.rotation_axis])
+        point = numpy.array([_value(x, ctx) for x in extrusion.point_on_axis])
+        axis /= _norm(axis)
+        r = part.centroid - point
+        r = _norm(r - numpy.dot(r, axis) * axis)
+        measure = part.measure * abs(_value(extrusion.angle, ctx)) * r
+        shift = numpy.zeros(3)
+
+    top = _copy(part, shift=shift)
+    extruded = _copy(
+        part, dim=part.dim + 1, measure=measure, shift=0.5 * shift
+        )
+    if part.dim == 1 and extrusion.rotation_axis is None:
+        V = part.loops[0][0]
+        n = numpy.cross(V[-1] - V[0], shift)
+        if numpy.allclose(numpy.cross(V - V[0], V[-1] - V[0]), 0.0) \
+                and _norm(n) > 0.0:
+            # straight lines extrude to plane surfaces
+            extruded.normal = n / _norm(n)
+    if extrusion.num_layers is not None:
+        n = int(_value(extrusion.num_layers, ctx))
+        # Extruded simplices are split unless recombined.
+        factor = 1 if extrusion.recombine else part.dim + 1
+        extruded.cells = n * factor * _num_cells(part, ctx, source)
+    return {
+        '{}[0]'.format(extrusion.id): top,
+        '{}[1]'.format(extrusion.id): extruded,
+        }
+
+
+def _boolean_part(boolean, parts):
+    '''The part of the result of a Boolean operation, and the ids of the
+    deleted operands.
+    '''
+    objects = [e.id for e in boolean.input_entities]
+    tools = [e.id for e in boolean.tool_entities]
+    if any(e not in parts for e in objects + tools):
+        return None, []
+    first = parts[objects[0]]
+    measures = [parts[e].measure for e in objects + tools]
+    if boolean.operation == 'BooleanIntersection':
+        measure = min(measures)
+        operands = objects
+    elif boolean.operation == 'BooleanDifference':
+        measure = max(
+            sum(measures[:len(objects)]) - sum(measures[len(objects):]),
+            0.0
+            )
+        operands = objects
+    else:
+        # union and fragments: overlaps are counted twice
+        measure = sum(measures)
+        operands = objects + tools
+    part = _Part(
+        first.dim, measure,
+        numpy.concatenate([parts[e].X for e in operands]),
+        numpy.concatenate([parts[e].weights for e in operands]),
+        numpy.concatenate([parts[e].h for e in operands])
+        )
+    part.weights *= measure / max(numpy.sum(part.weights), 1.0e-300)
+    deleted = (objects if boolean.delete_first else []) \
+        + (tools if boolean.delete_other else [])
+    return part, deleted
+
+
+def _min_max_field(tpe, option, X, entity, ctx):
+    values = [
+        _evaluate_field(f, X, entity, ctx)
+        for f in option('FieldsList', [])
+        ]
+    if not values:
+        return numpy.full(len(X), numpy.inf)
+    if tpe == 'Min':
+        return numpy.min(values, axis=0)
+    values = numpy.array(values)
+    values[numpy.isinf(values)] = -numpy.inf
+    values = numpy.max(values, axis=0)
+    values[numpy.isinf(values)] = numpy.inf
+    return values
+
+
+def _restrict_field(_tpe, option, X, entity, ctx):
+    ids = sum([
+        option(key, []) for key in [
+            'VerticesList', 'EdgesList', 'CurvesList', 'FacesList',
+            'SurfacesList', 'RegionsList', 'VolumesList'
+            ]], [])
+    if entity not in ids:
+        return numpy.full(len(X), numpy.inf)
+    return _evaluate_field(option('IField'), X, entity, ctx)
+
+
+def _shape_distances(tpe, option, X):
+    # distances of the points `X` to a `Box`, `Ball`, or `Cylinder` field
+    if tpe == 'Box':
+        lo = numpy.array([option('XMin'), option('YMin'), option('ZMin')])
+        hi = numpy.array([option('XMax'), option('YMax'), option('ZMax')])
+        return _norm(numpy.maximum(numpy.maximum(lo - X, X - hi), 0.0))
+    c = numpy.array([
+        option('XCenter'), option('YCenter'), option('ZCenter')
+        ])
+    if tpe == 'Ball':
+        return numpy.maximum(_norm(X - c) - option('Radius'), 0.0)
+    axis = numpy.array([
+        option('XAxis'), option('YAxis'), option('ZAxis', 1.0)
+        ])
+    a = numpy.dot(X - c, axis) / numpy.dot(axis, axis)
+    radial = _norm(X - c - numpy.outer(a, axis))
+    return numpy.where(
+        (numpy.abs(a) <= 1.0) & (radial <= option('Radius')),
+        0.0, numpy.inf
+        )
+
+
+def _shape_field(tpe, option, X, _entity, _ctx):
+    v_in, v_out = option('VIn'), option('VOut')
+    d = _shape_distances(tpe, option, X)
+    thickness = option('Thickness')
+    if thickness > 0.0:
+        t = numpy.minimum(d / thickness, 1.0)
+    else:
+        t = (d > 0.0).astype(float)
+    return v_in + t * (v_out - v_in)
+
+
+def _distance_field(_tpe, option, X, _entity, ctx):
+    Y = [
+        ctx['parts'][p].X
+        for key in [
+            'NodesList', 'PointsList', 'EdgesList', 'CurvesList',
+            'FacesList', 'SurfacesList'
+            ]
+        for p in option(key, []) if p in ctx['parts']
+        ]
+    if not Y:
+        return numpy.full(len(X), numpy.inf)
+    Y = numpy.concatenate(Y)
+    d = numpy.empty(len(X))
+    chunk = max(1, 2**20 // len(Y))
+    for start in range(0, len(X), chunk):
+        d[start:start+chunk] = numpy.sqrt(numpy.min(numpy.sum(
+            (X[start:start+chunk, None, :] - Y[None, :, :])**2, axis=2
+            ), axis=1))
+    return d
+
+
+def _threshold_field(_tpe, option, X, entity, ctx):
+    d = _evaluate_field(option('IField'), X, entity, ctx)
+    lc_min, lc_max = option('LcMin'), option('LcMax')
+    d_min, d_max = option('DistMin'), option('DistMax')
+    t = numpy.clip((d - d_min) / max(d_max - d_min, 1.0e-300), 0.0, 1.0)
+    if option('Sigmoid'):
+        t = 1.0 / (1.0 + numpy.exp(-12.0 * (t - 0.5)))
+    values = lc_min + t * (lc_max - lc_min)
+    if option('StopAtDistMax'):
+        values[d > d_max] = numpy.inf
+    return values
+
+
+def _math_eval_field(_tpe, option, X, _entity, ctx):
+    names = dict(ctx['parameters'])
+    names.update({'x': X[:, 0], 'y': X[:, 1], 'z': X[:, 2]})
+    try:
+        values = _evaluate(str(option('F')).strip('"'), names)
+    except (ValueError, ArithmeticError, TypeError):
+        return numpy.full(len(X), numpy.inf)
+    return numpy.broadcast_to(numpy.asarray(values, dtype=float), len(X))
+
+
+# the size fields that the estimate evaluates, by their types; all others
+# (PostView, BoundaryLayer, ...) are ignored
+_FIELD_TYPES = {
+    'Min': _min_max_field,
+    'Max': _min_max_field,
+    'Restrict': _restrict_field,
+    'Box': _shape_field,
+    'Ball': _shape_field,
+    'Cylinder': _shape_field,
+    'Attractor': _distance_field,
+    'Distance': _distance_field,
+    'Threshold': _threshold_field,
+    'MathEval': _math_eval_field,
+    }
+
+
+def _evaluate_field(name, X, entity, ctx):
+    '''Values of the size field `name` at the points `X` of the entity with
+    the id `entity`; `inf` where the field is unknown or doesn't apply.
+    '''
+    field = ctx['fields'].get(name)
+    if field is None or field.field_type not in _FIELD_TYPES:
+        return numpy.full(len(X), numpy.inf)
+
+    def option(key, default=0.0):
+        # entities by their ids, numbers as floats, and other Gmsh code (field
+        # names, strings) as is
+        value = field.option(key, default)
+        if isinstance(value, list):
+            return [v if _is_string(v) else v.id for v in value]
+        try:
+            return _value(value, ctx)
+        except (ValueError, ArithmeticError, TypeError):
+            return value
+
+    return _FIELD_TYPES[field.field_type](
+        field.field_type, option, X, entity, ctx
+        )
+
+
+def _add_field(field, ctx):
+    ctx['fields'][field.id] = field
+    if field.background:
+        ctx['background'].append(field.id)
+    return
+
+
+def _set_option(option, ctx):
+    keys = {
+        'Mesh.CharacteristicLengthFromPoints': 'from_points',
+        'Mesh.CharacteristicLengthExtendFromBoundary': 'extend_from_boundary',
+        'Mesh.CharacteristicLengthMin': 'lc_min',
+        'Mesh.CharacteristicLengthMax': 'lc_max',
+        'Mesh.CharacteristicLengthFactor': 'factor',
+        }
+    if option.name in keys:
+        ctx[keys[option.name]] = _value(option.value, ctx)
+    return
+
+
+def _add_extrusion(extrusion, ctx):
+    new = _extrusion_parts(extrusion, ctx)
+    if not new:
+        ctx['unknown'].append(extrusion.id + '[]')
+    ctx['parts'].update(new)
+    ctx['alive'] += sorted(new)
+    return
+
+
+def _add_boolean(boolean, ctx):
+    part, deleted = _boolean_part(boolean, ctx['parts'])
+    name = boolean.id + '[]'
+    if part is None:
+        ctx['unknown'].append(name)
+    else:
+        ctx['parts'][name] = part
+        ctx['alive'].append(name)
+    ctx['alive'] = [e for e in ctx['alive'] if e not in deleted]
+    return
+
+
+def _add_copies(pattern, ctx):
+    source = _target_id(pattern.entity)
+    if source not in ctx['parts']:
+        ctx['unknown'].append(pattern.id + '[]')
+        return
+    names = [
+        '{}[{}]'.format(pattern.id, k) for k in range(pattern.num_copies)
+        ]
+    for name in names:
+        ctx['parts'][name] = ctx['parts'][source]
+    ctx['alive'] += names
+    return
+
+
+# how the estimate follows the commands, by their types
+_COMMANDS = {
+    Field: _add_field,
+    Option: _set_option,
+    Extrusion: _add_extrusion,
+    Boolean: _add_boolean,
+    Pattern: _add_copies,
+    GridPattern: _add_copies,
+    PolarPattern: _add_copies,
+    }
+
+
+def _context(geometry):
+    '''Parts of all entities, the ids of the entities that are still there at
+    the end and of those whose measures couldn't be estimated, the size
+    fields, and the mesh size options.
+    '''
+    # pylint: disable=protected-access
+    statements = geometry._GMSH_CODE
+    ctx = {
+        'from_points': True,
+        'extend_from_boundary': True,
+        'lc_min': 0.0,
+        'lc_max': numpy.inf,
+        'factor': 1.0,
+        'parts': {},
+        'alive': [],
+        'unknown': [],
+        'fields': {},
+        'background': [],
+        # the defaults of the parameters
+        'parameters': {
+            key: float(value) for key, value in geometry._PARAMETERS.items()
+            },
+        }
+
+    # Gmsh's default size is the diameter of the model.
+    X = [
+        s.x for s in statements
+        if not _is_string(s) and hasattr(s, 'x') and hasattr(s, 'lcar')
+        ] + [
+            s.x0 for s in statements
+            if isinstance(s, (Box, Wedge, Rectangle, Disk, Cylinder))
+            ] + [
+                s.center for s in statements
+                if isinstance(s, (Ball, Cone, Torus))
+                ]
+    ctx['lc'] = 1.0
+    if X:
+        X = numpy.array(X, dtype=float)
+        ctx['lc'] = max(_norm(X.max(axis=0) - X.min(axis=0)), ctx['lc'])
+
+    for s in statements:
+        # Raw code isn't followed.
+        if _is_string(s):
+            continue
+        if type(s) in _COMMANDS:
+            _COMMANDS[type(s)](s, ctx)
+            continue
+
+        part = _entity_part(s, ctx)
+        if part is None:
+            if not isinstance(s, (LineLoop, SurfaceLoop)) \
+                    and getattr(s, 'dimension', 0) > 0:
+                ctx['unknown'].append(s.id)
+            continue
+        ctx['parts'][s.id] = part
+        ctx['alive'].append(s.id)
+    return ctx
+
+
+def _entity_part(s, ctx):
+    '''Part of the entity `s`; `None` for loops and for entities whose
+    measures can't be estimated.
+    '''
+    part = None
+    if isinstance(s, (Line, CircleArc, EllipseArc, Spline, Bspline)):
+        part = _curve_part(s, ctx)
+    elif isinstance(s, PlaneSurface):
+        part = _plane_surface_part(s, ctx['parts'], ctx)
+    elif isinstance(s, Surface):
+        part = _surface_part(s, ctx['parts'], ctx)
+    elif isinstance(s, Volume):
+        part = _volume_part(s, ctx['parts'])
+    elif isinstance(s, _PRIMITIVES):
+        part = _primitive_part(s, ctx)
+    elif isinstance(s, (CompoundLine, CompoundSurface, CompoundVolume)):
+        part = _compound_part(s, ctx)
+    elif hasattr(s, 'x') and hasattr(s, 'lcar'):
+        # Points don't get cells, but distance fields need them.
+        part = _Part(0, 0.0, s.x, [0.0], [0.0])
+    return part
+
+
+def _num_cells(part, ctx, entity):
+    if part.cells is not None:
+        return part.cells
+    h = part.h
+    for name in ctx['background']:
+        h = numpy.minimum(h, _evaluate_field(name, part.X, entity, ctx))
+    h = numpy.clip(h, ctx['lc_min'], ctx['lc_max']) * ctx['factor']
+    h = numpy.maximum(h, 1.0e-50)
+    num = _CELLS_PER_MEASURE[part.dim] * numpy.sum(
+        part.weights * h**(-part.dim)
+        ) * part.measure / max(numpy.sum(part.weights), 1.0e-300)
+    # at least one cell per entity
+    return max(num, 1.0)
+
+
+def estimate_mesh_size(geometry, dim=3):
+    '''Estimates the size of the mesh that :func:`pygmsh.generate_mesh`
+    creates for `geometry` with `dim`, without running Gmsh.
+
+    Returns a :class:`MeshSizeEstimate` with the number of nodes, the number
+    of cells per cell type (`line`, `triangle`, `tetra`), and the ids of the
+    entities whose measures couldn't be estimated (e.g., entities defined in
+    raw code, or lateral surfaces of extrusions); their cells are missing in
+    the counts.
+
+    The estimate is rough: Booleans unions count overlaps twice, boundary
+    layers and background meshes from views are ignored. Gmsh's runtime and
+    memory aren't predicted; `benchmarks/mesh_size.py` compares them and the
+    actual cell counts to the estimates for the geometries of the test suite.
+    '''
+    ctx = _context(geometry)
+
+    num_cells = {}
+    for e in ctx['alive']:
+        part = ctx['parts'][e]
+        if 1 <= part.dim <= dim:
+            cell_type = _CELL_TYPES[part.dim]
+            num_cells[cell_type] = num_cells.get(cell_type, 0.0) \
+                + _num_cells(part, ctx, e)
+
+    top = max([
+        d for d, cell_type in _CELL_TYPES.items() if cell_type in num_cells
+        ] or [0])
+    if top == 0:
+        num_nodes = 0.0
+    else:
+        # Nodes of the cells of highest dimension, plus half of the ones on
+        # the boundary, cf. Euler's formula.
+        num_nodes = num_cells[_CELL_TYPES[top]] / _CELLS_PER_NODE[top]
+        if top > 1 and _CELL_TYPES[top - 1] in num_cells:
+            num_nodes += num_cells[_CELL_TYPES[top - 1]] \
+                / _CELLS_PER_NODE[top - 1] / 2.0
+
+    return MeshSizeEstimate(
+        int(round(num_nodes)),
+        {key: int(round(value)) for key, value in num_cells.items()},
+        ctx['unknown']
+        )
+
+
+# factor and number of cells of the last scaled mesh, by geometry and
+# dimension
+_SCALING_CACHE = {}
+
+
+def _rescale(factor, num_cells, target_num_cells, dim):
+    # The number of cells scales with factor**-dim.
+    if num_cells <= 0:
+        return factor
+    return factor * (float(num_cells) / target_num_cells)**(1.0 / dim)
+
+
+def scale_to_target(geometry, dim, target_num_cells, mesh, parameters=None):
+    '''Meshes `geometry` with all mesh sizes scaled by one factor such that
+    the mesh has about `target_num_cells` cells of dimension `dim`.
+    `mesh(d, factor)` meshes the geometry with dimension `d` and the sizes
+    scaled by `factor`, and returns the number of cells of dimension `d`.
+    `parameters` are the values of the parameters of the geometry.
+
+    The factor is predicted by :func:`estimate_mesh_size` and corrected by
+    the ratio of the actual to the predicted size of a trial mesh of
+    dimension `dim-1`, which is cheap compared to the final mesh. The final
+    factor and number of cells are cached; a repeated request for the same
+    geometry is scaled from them, and needs only the final mesh. Returns the
+    factor.
+    '''
+    assert target_num_cells > 0
+    key = (
+        geometry.get_code_hash(), dim,
+        tuple(sorted((parameters or {}).items()))
+        )
+    if key in _SCALING_CACHE:
+        factor, num_cells = _SCALING_CACHE[key]
+        factor = _rescale(factor, num_cells, target_num_cells, dim)
+    else:
+        estimate = estimate_mesh_size(geometry, dim=dim).num_cells
+        num_cells = estimate.get(_CELL_TYPES[dim], 0)
+        if num_cells > 0:
+            factor = _rescale(1.0, num_cells, target_num_cells, dim)
+            predicted = estimate.get(_CELL_TYPES.get(dim - 1), 0)
+            if predicted > 0:
+                # The boundary mesh gives the actual sizes on the boundary,
+                # which mostly determine the ones inside.
+                actual = mesh(dim - 1, factor)
+                if actual > 0:
+                    predicted *= factor**(1 - dim)
+                    factor *= (actual / predicted)**(1.0 / (dim - 1))
+        else:
+            # No prediction (e.g., the geometry is raw code): scale from the
+            # unscaled mesh.
+            factor = _rescale(1.0, mesh(dim, 1.0), target_num_cells, dim)
+
+    num_cells = mesh(dim, factor)
+    if num_cells > 0:
+        _SCALING_CACHE[key] = (factor, num_cells)
+    return factor
@@ -67,6 +67,75 @@ def _is_flat(X, tol=1.0e-15):
         ).all()
 
 
+def _segment_distances(X, A, B):
+    '''Distances of the points `X` to the segments from `A` to `B`.
+    '''
+    AB = B - A
+    AB_dot_AB = numpy.einsum('ij, ij->i', AB, AB)
+    t = numpy.einsum('ij, ij->i', X - A, AB) \
+        / numpy.where(AB_dot_AB > 0.0, AB_dot_AB, 1.0)
+    d = X - A - numpy.clip(t, 0.0, 1.0)[:, None] * AB
+    return numpy.sqrt(numpy.einsum('ij, ij->i', d, d))
+
+
+def simplify_polyline(X, max_deviation, closed=False):
+    '''Returns the (sorted) indices of the points of the polyline `X` that the
+    Douglas-Peucker algorithm keeps such that every point of `X` is within
+    `max_deviation` of the polyline through the kept points. The end points
+    are always kept. All segments are refined at once, so that the work is
+    vectorized over the polyline.
+
+    :param closed: If `True`, `X` is a closed polygon (without the first
+        point repeated at the end), and at least three points are kept.
+    '''
+    X = numpy.array(X, dtype=float)
+    n = len(X)
+    if closed:
+        # Split the polygon at the point farthest from the first one, and
+        # keep the point farthest from that chord, too.
+        assert n > 2
+        X = numpy.concatenate([X, X[:1]])
+        far = numpy.argmax(numpy.einsum('ij, ij->i', X - X[0], X - X[0]))
+        d = _segment_distances(
+            X, numpy.tile(X[0], (n + 1, 1)), numpy.tile(X[far], (n + 1, 1))
+            )
+        third = numpy.argmax(d)
+        if far == 0:
+            # All points coincide; keep three of them anyway.
+            far, third = n // 3, 2 * n // 3
+        elif d[third] == 0.0:
+            # All points sit on a line; split the longer one of the two arcs.
+            third = (far + n) // 2 if n - far > far else far // 2
+        seeds = [0, far, third, n]
+    else:
+        assert n > 1
+        seeds = [0, n - 1]
+
+    keep = numpy.zeros(len(X), dtype=bool)
+    keep[seeds] = True
+    while True:
+        idx = numpy.flatnonzero(keep)
+        # the segment of every point, between two kept ones
+        segment = numpy.minimum(
+            numpy.searchsorted(idx, numpy.arange(len(X)), side='right') - 1,
+            len(idx) - 2
+            )
+        d = _segment_distances(X, X[idx[segment]], X[idx[segment + 1]])
+        d[keep] = 0.0
+        # the farthest point of every segment, if too far
+        max_d = numpy.maximum.reduceat(d, idx[:-1])
+        candidates = numpy.flatnonzero(
+            (d == max_d[segment]) & (d > max_deviation)
+            )
+        if len(candidates) == 0:
+            break
+        _, first = numpy.unique(segment[candidates], return_index=True)
+        keep[candidates[first]] = True
+
+    idx = numpy.flatnonzero(keep)
+    return idx[idx < n]
+
+
 def _get_gmsh_exe():
     macos_gmsh_location = '/Applications/Gmsh.app/Contents/MacOS/gmsh'
     if os.path.isfile(macos_gmsh_location):
@@ -76,6 +145,15 @@ def _get_gmsh_exe():
     return gmsh_executable
 
 
+def _num_cells(cells, dim):
+    '''Number of cells of dimension `dim`.'''
+    dims = {
+        'line': 1, 'triangle': 2, 'quad': 2,
+        'tetra': 3, 'hexahedron': 3, 'wedge': 3, 'pyramid': 3,
+        }
+    return sum(len(c) for key, c in cells.items() if dims.get(key) == dim)
+
+
 def get_gmsh_major_version(gmsh_exe=_get_gmsh_exe()):
     out = subprocess.check_output(
             [gmsh_exe, '--version'],
@@ -85,6 +163,24 @@ def get_gmsh_major_version(gmsh_exe=_get_gmsh_exe()):
     return int(ex[0])
 
 
+def _run_gmsh(cmd, verbose):
+    # https://stackoverflow.com/a/803421/353337
+    p = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+        )
+    if verbose:
+        while True:
+            line = p.stdout.readline()
+            if not line:
+                break
+            print(line.decode('utf-8'), end='')
+
+    p.communicate()
+    assert p.returncode == 0, \
+        'Gmsh exited with error (return code {}).'.format(p.returncode)
+    return
+
+
 # pylint: disable=too-many-branches
 def generate_mesh(
         geo_object,
@@ -95,9 +191,30 @@ def generate_mesh(
         prune_vertices=True,
         gmsh_path=None,
         geom_order=1,
+        target_num_cells=None,
+        parameters=None,
+        validate=False,
         # for debugging purposes:
         geo_filename=None
         ):
+    '''Meshes `geo_object` with Gmsh.
+
+    :param target_num_cells: If given, all mesh sizes are scaled by one
+        factor (Gmsh's `-clscale`) such that the mesh has about this many
+        cells of dimension `dim`. The factor is predicted with
+        :func:`pygmsh.estimate_mesh_size` and corrected with a mesh of
+        dimension `dim-1`. The factor and the resulting number of cells are
+        remembered, so that a repeated request for the same geometry needs
+        a single Gmsh run.
+    :param parameters: Values of parameters of the geometry (see
+        :meth:`pygmsh.built_in.Geometry.parameter`) by their names, to be
+        used instead of the defaults.
+    :param validate: If `True`, check the geometry with its `validate()`
+        method before Gmsh is started.
+    '''
+    if validate:
+        geo_object.validate()
+
     preserve_geo = geo_filename is not None
     if geo_filename is None:
         with tempfile.NamedTemporaryFile(suffix='.geo') as f:
@@ -111,33 +228,47 @@ def generate_mesh(
 
     gmsh_executable = gmsh_path if gmsh_path is not None else _get_gmsh_exe()
 
-    cmd = [
-        gmsh_executable,
-        '-{}'.format(dim), '-bin', geo_filename, '-o', msh_filename
-        ]
+    options = []
+    if parameters is not None:
+        for name, value in sorted(parameters.items()):
+            options += ['-setnumber', name, repr(float(value))]
 
     gmsh_major_version = get_gmsh_major_version(gmsh_executable)
     if gmsh_major_version < 3 and optimize:
-        cmd += ['-optimize']
+        options += ['-optimize']
 
     assert geom_order > 0
     if geom_order > 1:
-        cmd += ['-order', str(geom_order)]
+        options += ['-order', str(geom_order)]
+
+    def mesh(mesh_dim, factor):
+        # Meshes with the sizes scaled by `factor`.
+        _run_gmsh(
+            [
+                gmsh_executable,
+                '-{}'.format(mesh_dim), '-bin', geo_filename,
+                '-o', msh_filename
+                ]
+            + options
+            + ([] if factor is None else ['-clscale', repr(factor)]),
+            verbose
+            )
+        return
+
+    if target_num_cells is None:
+        mesh(dim, None)
+    else:
+        # estimate imports helpers
+        # pylint: disable=cyclic-import
+        from .estimate import scale_to_target
 
-    # https://stackoverflow.com/a/803421/353337
-    p = subprocess.Popen(
-        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
-        )
-    if verbose:
-        while True:
-            line = p.stdout.readline()
-            if not line:
-                break
-            print(line.decode('utf-8'), end='')
+        def num_cells(mesh_dim, factor):
+            mesh(mesh_dim, factor)
+            return _num_cells(meshio.read(msh_filename)[1], mesh_dim)
 
-    p.communicate()
-    assert p.returncode == 0, \
-        'Gmsh exited with error (return code {}).'.format(p.returncode)
+        scale_to_target(
+            geo_object, dim, target_num_cells, num_cells, parameters
+            )
 
     X, cells, pt_data, cell_data, field_data = meshio.read(msh_filename)
 
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+#
+'''Meshing of congruent copies of a part: the part (the prototype) is meshed
+once by Gmsh, the copies are created by transforming the resulting mesh.
+
+Meshes are tuples `(points, cells, point_data, cell_data, field_data)` as
+returned by :func:`pygmsh.generate_mesh`.
+'''
+import numpy
+
+from .helpers import generate_mesh
+from .merge import merge_meshes
+
+# Vertex permutations that invert the orientation of a cell.
+_FLIP = {
+    'line': [1, 0],
+    'triangle': [0, 2, 1],
+    'quad': [0, 3, 2, 1],
+    'tetra': [0, 2, 1, 3],
+    'pyramid': [0, 3, 2, 1, 4],
+    'wedge': [0, 2, 1, 3, 5, 4],
+    'hexahedron': [0, 3, 2, 1, 4, 7, 6, 5],
+    }
+
+
+def instantiate(mesh, transforms):
+    '''Returns one copy of `mesh` for each of the
+    :class:`pygmsh.Transform` s `transforms`, combined into one mesh. All
+    copies are computed in one vectorized operation. The cell data gets the
+    entry `instance` with the index of the transformation; the point data is
+    copied as is.
+    '''
+    points, cells, point_data, cell_data, field_data = mesh
+
+    Rs = numpy.array([t.R for t in transforms])
+    x0s = numpy.array([t.x0 for t in transforms])
+    num = len(transforms)
+
+    X = numpy.einsum('kij,nj->kni', Rs, points) + x0s[:, None, :]
+    X = X.reshape(-1, points.shape[1])
+
+    # Reflections invert the orientation of the cells; permute the vertices to
+    # restore it.
+    flipped = numpy.linalg.det(Rs) < 0.0
+    offsets = len(points) * numpy.arange(num)
+    new_cells = {}
+    new_cell_data = {}
+    for key, c in cells.items():
+        c = numpy.repeat(c[None], num, axis=0)
+        if key != 'vertex' and numpy.any(flipped):
+            assert key in _FLIP, \
+                'Don\'t know how to reflect cells of type \'{}\'.'.format(key)
+            c[flipped] = c[flipped][:, :, _FLIP[key]]
+        new_cells[key] = (c + offsets[:, None, None]).reshape(-1, c.shape[2])
+
+        data = cell_data.get(key, {})
+        new_cell_data[key] = {
+            name: numpy.concatenate(num * [value])
+            for name, value in data.items()
+            }
+        new_cell_data[key]['instance'] = \
+            numpy.repeat(numpy.arange(num), len(cells[key]))
+
+    new_point_data = {
+        name: numpy.concatenate(num * [value])
+        for name, value in point_data.items()
+        }
+    return X, new_cells, new_point_data, new_cell_data, dict(field_data)
+
+
+def generate_instanced_mesh(
+        prototype, transforms, geo_object=None, tol=None, **kwargs
+        ):
+    '''Meshes the geometry `prototype` once and places one copy of the mesh
+    for each of the rigid :class:`pygmsh.Transform` s `transforms`. The copies
+    are told apart by the cell data `instance`.
+
+    If given, `geo_object` (the rest of the geometry, without the copies) is
+    meshed as well and added to the result with `instance` -1. With `tol`,
+    points closer than `tol` are merged (cf. :func:`pygmsh.merge_meshes`), so
+    that copies that share interfaces with each other or with the rest of the
+    geometry result in one conforming mesh; this requires matching
+    discretizations on the interfaces.
+
+    All other keyword arguments are passed on to
+    :func:`pygmsh.generate_mesh`.
+    '''
+    mesh = instantiate(generate_mesh(prototype, **kwargs), transforms)
+
+    if geo_object is not None:
+        other = generate_mesh(geo_object, **kwargs)
+        for key, c in other[1].items():
+            other[3].setdefault(key, {})['instance'] = \
+                numpy.full(len(c), -1, dtype=int)
+        mesh = merge_meshes([mesh, other], tol)
+    elif tol is not None:
+        mesh = merge_meshes([mesh], tol)
+    return mesh
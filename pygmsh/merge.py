@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+#
+'''Merging of meshes, e.g., of parts that have been meshed separately.
+
+Meshes are tuples `(points, cells, point_data, cell_data, field_data)` as
+returned by :func:`pygmsh.generate_mesh`.
+'''
+import itertools
+
+import numpy
+
+_DIMENSION = {
+    'vertex': 0,
+    'line': 1,
+    'triangle': 2,
+    'quad': 2,
+    'tetra': 3,
+    'pyramid': 3,
+    'wedge': 3,
+    'hexahedron': 3,
+    }
+
+# Local vertex indices of the facets of the cells.
+_FACETS = {
+    'line': [[0], [1]],
+    'triangle': [[0, 1], [1, 2], [2, 0]],
+    'quad': [[0, 1], [1, 2], [2, 3], [3, 0]],
+    'tetra': [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]],
+    'pyramid': [
+        [0, 1, 2, 3], [0, 1, 4], [1, 2, 4], [2, 3, 4], [3, 0, 4]
+        ],
+    'wedge': [
+        [0, 1, 2], [3, 4, 5], [0, 1, 4, 3], [1, 2, 5, 4], [2, 0, 3, 5]
+        ],
+    'hexahedron': [
+        [0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 5, 4],
+        [1, 2, 6, 5], [2, 3, 7, 6], [3, 0, 4, 7]
+        ],
+    }
+
+
+def _boundary_points(points, cells):
+    '''Indices of the points on the boundary of the mesh, i.e., the points of
+    the facets of the highest-dimensional cells that belong to only one cell.
+    If the cell types are unknown, all points are returned.
+    '''
+    if any(key not in _DIMENSION for key in cells):
+        return numpy.arange(len(points))
+    dim = max([_DIMENSION[key] for key in cells] + [0])
+    if dim == 0:
+        return numpy.arange(len(points))
+
+    # Group the facets by their number of points.
+    facets = {}
+    for key, c in cells.items():
+        if _DIMENSION[key] != dim:
+            continue
+        for f in _FACETS[key]:
+            facets.setdefault(len(f), []).append(c[:, f])
+
+    n = len(points)
+    boundary = []
+    for k, f in facets.items():
+        f = numpy.sort(numpy.concatenate(f), axis=1).astype(numpy.int64)
+        # Sort the rows and count the equal ones. If possible, the rows are
+        # encoded in one integer, which sorts much faster than the rows.
+        if float(n)**k < 2.0**62:
+            powers = n**numpy.arange(k - 1, -1, -1, dtype=numpy.int64)
+            keys = numpy.dot(f, powers)
+            order = numpy.argsort(keys)
+            is_new = keys[order][1:] != keys[order][:-1]
+        else:
+            order = numpy.lexsort(f.T)
+            is_new = numpy.any(f[order][1:] != f[order][:-1], axis=1)
+        starts = numpy.flatnonzero(numpy.concatenate([[True], is_new, [True]]))
+        counts = numpy.diff(starts)
+        boundary.append(f[order[starts[:-1][counts == 1]]].flatten())
+    return numpy.unique(numpy.concatenate(boundary))
+
+
+def _cell_pairs(counts, starts, A, B, same):
+    '''Pairs of the points in the cells `A` and `B` (given by their `counts`
+    and `starts` in the sorted points). With `same`, `A` and `B` are the same
+    cells, and each pair of different points is returned once.
+    '''
+    na = counts[A]
+    nb = counts[B]
+    total = na * nb
+    k = numpy.repeat(numpy.arange(len(A)), total)
+    within = numpy.arange(total.sum()) - numpy.repeat(
+        numpy.cumsum(total) - total, total
+        )
+    i = within // nb[k]
+    j = within % nb[k]
+    if same:
+        is_pair = i < j
+        k = k[is_pair]
+        i = i[is_pair]
+        j = j[is_pair]
+    return starts[A][k] + i, starts[B][k] + j
+
+
+def _coincident_pairs(X, tol):
+    '''Pairs `(i, j)`, `i < j`, of points with a distance smaller than `tol`.
+    The points are hashed into a grid of cells of size `tol`; only points in
+    the same and in neighboring cells are compared.
+    '''
+    # Number the occupied cell coordinates in each dimension and pack the
+    # numbers of a cell into one integer key, such that the keys of the
+    # neighboring cells differ by constant offsets. Cells that are only
+    # neighbors by their numbers are compared needlessly, but nothing is
+    # missed. If the keys don't fit into 64 bits, they wrap around, which
+    # only adds candidates, too.
+    keys = numpy.zeros(len(X), dtype=numpy.int64)
+    strides = []
+    stride = numpy.ones(1, dtype=numpy.int64)
+    for x in X.T:
+        values, ranks = numpy.unique(
+            numpy.floor(x / tol).astype(numpy.int64), return_inverse=True
+            )
+        keys += stride[0] * ranks.reshape(-1)
+        strides.append(stride[0])
+        stride = stride * (len(values) + 1)
+
+    order = numpy.argsort(keys, kind='mergesort')
+    sorted_keys = keys[order]
+    starts = numpy.flatnonzero(
+        numpy.concatenate([[True], sorted_keys[1:] != sorted_keys[:-1]])
+        )
+    counts = numpy.diff(numpy.append(starts, len(X)))
+    cell_keys = sorted_keys[starts]
+
+    cells = numpy.arange(len(starts))
+    I, J = [], []
+    for offset in itertools.product([-1, 0, 1], repeat=X.shape[1]):
+        # Every pair of neighboring cells is visited once: for the offsets
+        # whose first nonzero entry is positive (and the cells themselves).
+        nonzero = [o for o in offset if o != 0]
+        if nonzero and nonzero[0] < 0:
+            continue
+        if not nonzero:
+            i, j = _cell_pairs(counts, starts, cells, cells, True)
+        else:
+            q = cell_keys + numpy.dot(offset, strides)
+            k = numpy.minimum(
+                numpy.searchsorted(cell_keys, q), len(cell_keys) - 1
+                )
+            is_found = cell_keys[k] == q
+            i, j = _cell_pairs(
+                counts, starts, cells[is_found], k[is_found], False
+                )
+        I.append(order[i])
+        J.append(order[j])
+    I = numpy.concatenate(I)
+    J = numpy.concatenate(J)
+
+    diff = X[I] - X[J]
+    is_close = numpy.einsum('ij,ij->i', diff, diff) < tol**2
+    I = I[is_close]
+    J = J[is_close]
+    return numpy.minimum(I, J), numpy.maximum(I, J)
+
+
+def _connected_components(n, I, J):
+    '''Labels the points `0, ..., n-1` connected by the edges `(I, J)` with
+    the smallest index in their component.
+    '''
+    labels = numpy.arange(n)
+    while True:
+        new_labels = labels.copy()
+        numpy.minimum.at(new_labels, I, labels[J])
+        numpy.minimum.at(new_labels, J, labels[I])
+        new_labels = new_labels[new_labels]
+        if numpy.array_equal(new_labels, labels):
+            return labels
+        labels = new_labels
+
+
+def _dimension(cell_type):
+    # higher-order cells (e.g., `triangle6`) like the linear ones; -1 for
+    # unknown types
+    return _DIMENSION.get(cell_type.rstrip('0123456789'), -1)
+
+
+def _physical_tags(mesh):
+    '''The physical tags in the cell data of `mesh`, as pairs `(tag, dim)`.
+    '''
+    tags = set()
+    for key, data in mesh[3].items():
+        for name, value in data.items():
+            if name.endswith('physical'):
+                tags.update(
+                    (int(tag), _dimension(key)) for tag in numpy.unique(value)
+                    )
+    return tags
+
+
+def _physical_maps(meshes):
+    '''For each mesh, a map from its physical tags to the tags in the merged
+    mesh, per dimension. Physical groups with the same name and dimension get
+    the same tag; all other tags, named or not, keep their tag unless another
+    mesh has taken it. A name can't be used for several dimensions.
+    '''
+    tags = {}
+    taken = set()
+    maps = []
+
+    def new_tag(tag, dim):
+        while (tag, dim) in taken:
+            tag += 1
+        taken.add((tag, dim))
+        return tag
+
+    for mesh in meshes:
+        m = {}
+        for name, (tag, dim) in sorted(mesh[4].items()):
+            tag, dim = int(tag), int(dim)
+            if name in tags:
+                assert tags[name][1] == dim, \
+                    'Physical group \'{}\' has the dimensions {} and {}.' \
+                    .format(name, tags[name][1], dim)
+            else:
+                tags[name] = numpy.array([new_tag(tag, dim), dim])
+            m[(tag, dim)] = tags[name][0]
+        # unnamed groups
+        for tag, dim in sorted(_physical_tags(mesh) - set(m)):
+            m[(tag, dim)] = new_tag(tag, dim)
+        maps.append(m)
+    return maps, tags
+
+
+def _remap_physical(mesh, tag_map):
+    points, cells, point_data, cell_data, field_data = mesh
+    if not tag_map:
+        return mesh
+    new_cell_data = {}
+    for key, data in cell_data.items():
+        new_cell_data[key] = dict(data)
+        dim = _dimension(key)
+        for name, value in data.items():
+            if not name.endswith('physical') or len(value) == 0:
+                continue
+            lut = numpy.arange(max(value.max(), *[t for t, _ in tag_map]) + 1)
+            for (old, d), new in tag_map.items():
+                if d == dim:
+                    lut[old] = new
+            new_cell_data[key][name] = lut[value]
+    return points, cells, point_data, new_cell_data, field_data
+
+
+def _concatenate(meshes):
+    '''Puts the meshes side by side without merging anything. Point and cell
+    data are kept where all meshes provide them.
+    '''
+    offsets = numpy.cumsum([0] + [len(mesh[0]) for mesh in meshes])
+    points = numpy.concatenate([mesh[0] for mesh in meshes])
+
+    cells = {}
+    cell_data = {}
+    for mesh, offset in zip(meshes, offsets):
+        for key, c in mesh[1].items():
+            cells.setdefault(key, []).append(c + offset)
+            cell_data.setdefault(key, []).append(mesh[3].get(key, {}))
+    cells = {key: numpy.concatenate(value) for key, value in cells.items()}
+    cell_data = {
+        key: {
+            name: numpy.concatenate([d[name] for d in data])
+            for name in set.intersection(*[set(d) for d in data])
+            }
+        for key, data in cell_data.items()
+        }
+
+    point_data = {
+        name: numpy.concatenate([mesh[2][name] for mesh in meshes])
+        for name in set.intersection(*[set(mesh[2]) for mesh in meshes])
+        }
+
+    field_data = {}
+    for mesh in meshes:
+        field_data.update(mesh[4])
+    return points, cells, point_data, cell_data, field_data
+
+
+def merge_meshes(meshes, tol=None):
+    '''Combines the meshes `meshes` into one. Cells of the same type go into
+    one block; physical groups with the same name (`field_data`) and
+    dimension are joined, all other physical tags, also the ones without a
+    name, are renumbered if their tags collide.
+
+    With `tol`, points closer than `tol` are merged. Only points on the
+    boundaries of the meshes are considered; they are found through a hash
+    grid, so the cost is about linear in the number of points.
+    '''
+    maps, field_data = _physical_maps(meshes)
+    meshes = [_remap_physical(mesh, m) for mesh, m in zip(meshes, maps)]
+
+    offsets = numpy.cumsum([0] + [len(mesh[0]) for mesh in meshes])
+    points, cells, point_data, cell_data, _ = _concatenate(meshes)
+
+    if tol is None:
+        return points, cells, point_data, cell_data, field_data
+
+    candidates = numpy.concatenate([
+        _boundary_points(mesh[0], mesh[1]) + offset
+        for mesh, offset in zip(meshes, offsets)
+        ])
+    I, J = _coincident_pairs(points[candidates], tol)
+    labels = numpy.arange(len(points))
+    labels[candidates] = candidates[
+        _connected_components(len(candidates), I, J)
+        ]
+
+    return _identify_points(
+        (points, cells, point_data, cell_data, field_data), labels
+        )
+
+
+def _identify_points(mesh, labels):
+    '''Replaces each point `i` by the point `labels[i]` (with
+    `labels[labels[i]] == labels[i]`) and renumbers the points in one pass.
+    '''
+    points, cells, point_data, cell_data, field_data = mesh
+    keep = labels == numpy.arange(len(points))
+    new_index = numpy.cumsum(keep) - 1
+    inv = new_index[labels]
+    cells = {key: inv[c] for key, c in cells.items()}
+    point_data = {name: value[keep] for name, value in point_data.items()}
+    return points[keep], cells, point_data, cell_data, field_data
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
 #
+from ..parameter import _array
+
 from .volume_base import VolumeBase
 
 
 class Ball(VolumeBase):
+    __slots__ = ('center', 'radius', 'x0', 'x1', 'alpha', 'char_length')
+
     def __init__(
             self, center, radius, x0=None, x1=None, alpha=None,
             char_length=None
@@ -35,22 +39,27 @@ class Ball(VolumeBase):
         '''
         super(Ball, self).__init__()
 
-        self.center = center
+        self.center = _array(center)
         self.radius = radius
+        self.x0 = x0
+        self.x1 = x1
+        self.alpha = alpha
         self.char_length = char_length
+        return
 
-        args = list(center) + [radius]
-        if x0 is not None:
-            args.append(x0)
-            if x1 is not None:
-                args.append(x1)
-                if alpha is not None:
-                    args.append(alpha)
+    @property
+    def code(self):
+        args = list(self.center) + [self.radius]
+        if self.x0 is not None:
+            args.append(self.x0)
+            if self.x1 is not None:
+                args.append(self.x1)
+                if self.alpha is not None:
+                    args.append(self.alpha)
         args = ', '.join(['{}'.format(arg) for arg in args])
 
-        self.code = '\n'.join([
+        return '\n'.join([
             '{} = newv;'.format(self.id),
             'Sphere({}) = {{{}}};'.format(self.id, args)
-            ] + self.char_length_code(char_length)
+            ] + self.char_length_code(self.char_length)
             )
-        return
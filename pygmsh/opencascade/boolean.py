@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+from ..built_in.command import Command
+
+_KINDS = {1: 'Line', 2: 'Surface', 3: 'Volume'}
+
+
+class Boolean(Command):
+    '''The Boolean operation `operation` (e.g., `BooleanDifference`) of the
+    `input_entities` and the `tool_entities`, cf.
+    https://gmsh.info/doc/texinfo/gmsh.html#Boolean-operations; the operands
+    are deleted with `delete_first` and `delete_other`, respectively. Gmsh
+    collects the resulting entities in the list `id[]`.
+    '''
+    __slots__ = (
+        'id', 'operation', 'input_entities', 'tool_entities', 'delete_first',
+        'delete_other'
+        )
+
+    def __init__(
+            self, id0, operation, input_entities, tool_entities,
+            delete_first=True, delete_other=True
+            ):
+        self.id = id0
+        self.operation = operation
+        self.input_entities = list(input_entities)
+        self.tool_entities = list(tool_entities)
+        self.delete_first = delete_first
+        self.delete_other = delete_other
+        return
+
+    @property
+    def dim(self):
+        return self.input_entities[0].dimension
+
+    @property
+    def code(self):
+        kind = _KINDS[self.dim]
+
+        def formatted(entities):
+            if not entities:
+                return ''
+            return ';'.join([
+                '{}{{{}}}'.format(kind, e.id) for e in entities
+                ]) + ';'
+
+        return '{}[] = {}{{ {} {} }} {{ {} {}}};'.format(
+            self.id, self.operation,
+            formatted(self.input_entities),
+            'Delete;' if self.delete_first else '',
+            formatted(self.tool_entities),
+            'Delete;' if self.delete_other else '',
+            )
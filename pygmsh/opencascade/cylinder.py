@@ -1,24 +1,31 @@
 # -*- coding: utf-8 -*-
 #
+from ..parameter import _array
+
 from .volume_base import VolumeBase
 
 
 class Cylinder(VolumeBase):
+    __slots__ = ('x0', 'axis', 'radius', 'angle', 'char_length')
+
     def __init__(self, x0, axis, radius, angle=None, char_length=None):
         super(Cylinder, self).__init__()
 
         assert len(x0) == 3
         assert len(axis) == 3
 
-        self.x0 = x0
-        self.axis = axis
+        self.x0 = _array(x0)
+        self.axis = _array(axis)
         self.radius = radius
         self.angle = angle
         self.char_length = char_length
+        return
 
-        args = list(x0) + list(axis) + [radius]
-        if angle is not None:
-            args.append(angle)
+    @property
+    def code(self):
+        args = list(self.x0) + list(self.axis) + [self.radius]
+        if self.angle is not None:
+            args.append(self.angle)
         args = ', '.join(['{}'.format(arg) for arg in args])
 
         code = [
@@ -32,9 +39,8 @@ class Cylinder(VolumeBase):
                     self.id, self.id
                     ),
                 'Characteristic Length{{pts_{}[]}} = {};'.format(
-                    self.id, char_length
+                    self.id, self.char_length
                     ),
                 ])
 
-        self.code = '\n'.join(code)
-        return
+        return '\n'.join(code)
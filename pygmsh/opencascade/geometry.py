@@ -5,26 +5,29 @@ from ..__about__ import __version__
 from .. import built_in
 
 from .ball import Ball
+from .boolean import Boolean
 from .box import Box
 from .cone import Cone
 from .cylinder import Cylinder
 from .disk import Disk
-from .dummy import Dummy
 from .rectangle import Rectangle
 from .surface_base import SurfaceBase
 from .torus import Torus
 from .wedge import Wedge
 from .volume_base import VolumeBase
 from ..built_in import geometry as bl
+from ..built_in.extrusion import Extrusion
+from ..built_in.option import Option
 
 
 class Geometry(bl.Geometry):
     def __init__(
             self,
             characteristic_length_min=None,
-            characteristic_length_max=None
+            characteristic_length_max=None,
+            merge_tolerance=None
             ):
-        super(Geometry, self).__init__()
+        super(Geometry, self).__init__(merge_tolerance=merge_tolerance)
         self._BOOLEAN_ID = 0
         self._EXTRUDE_ID = 0
         self._GMSH_CODE = [
@@ -33,61 +36,54 @@ class Geometry(bl.Geometry):
             ]
 
         if characteristic_length_min is not None:
-            self._GMSH_CODE.append(
-                'Mesh.CharacteristicLengthMin = {};'.format(
-                    characteristic_length_min
-                    ))
+            self._GMSH_CODE.append(Option(
+                'Mesh.CharacteristicLengthMin', characteristic_length_min
+                ))
 
         if characteristic_length_max is not None:
-            self._GMSH_CODE.append(
-                'Mesh.CharacteristicLengthMax = {};'.format(
-                    characteristic_length_max
-                    ))
+            self._GMSH_CODE.append(Option(
+                'Mesh.CharacteristicLengthMax', characteristic_length_max
+                ))
         return
 
-    def get_code(self):
-        '''Returns properly formatted Gmsh code.
-        '''
-        return '\n'.join(self._GMSH_CODE)
-
     def add_rectangle(self, *args, **kwargs):
         p = Rectangle(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_disk(self, *args, **kwargs):
         p = Disk(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_ball(self, *args, **kwargs):
         p = Ball(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_box(self, *args, **kwargs):
         p = Box(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_cone(self, *args, **kwargs):
         p = Cone(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_cylinder(self, *args, **kwargs):
         p = Cylinder(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_torus(self, *args, **kwargs):
         p = Torus(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     def add_wedge(self, *args, **kwargs):
         p = Wedge(*args, **kwargs)
-        self._GMSH_CODE.append(p.code)
+        self._GMSH_CODE.append(p)
         return p
 
     # pylint: disable=too-many-branches
@@ -127,49 +123,12 @@ class Geometry(bl.Geometry):
                     )
 
         name = 'bo{}'.format(self._BOOLEAN_ID)
-
-        input_delete = 'Delete;' if delete_first else ''
-
-        tool_delete = 'Delete;' if delete_other else ''
-
-        legal_dim_type = legal_dim_types[dim]
-
-        if input_entities:
-            formatted_input_entities = ';'.join(["%s{%s}" %
-                (legal_dim_type, e.id) for e in input_entities]) + ';'
-        else:
-            formatted_input_entities = ''
-
-        if tool_entities:
-            formatted_tool_entities = ';'.join(["%s{%s}" %
-                (legal_dim_type, e.id) for e in tool_entities]) + ';'
-        else:
-            formatted_tool_entities = ''
-
-        self._GMSH_CODE.append(
-            # I wonder what this line does in Lisp.
-            #'{}[] = {}{{{} {{{}}}; {}}} {{{} {{{}}}; {}}};'
-            #.format(
-            #    name,
-            #    operation,
-            #    legal_dim_types[dim],
-            #    ';'.join(e.id for e in input_entities),
-            #    'Delete;' if delete_first else '',
-            #    legal_dim_types[dim],
-            #    ';'.join(e.id for e in tool_entities),
-            #    'Delete;' if delete_other else ''
-            #    ))
-            '%(name)s[] = %(op)s{ %(ientities)s %(idelete)s } { %(tentities)s %(tdelete)s};' % {
-              'name' : name,
-              'op' : operation,
-              'ientities' : formatted_input_entities,
-              'idelete'   : input_delete,
-              'tentities' : formatted_tool_entities,
-              'tdelete'   : tool_delete,
-            }
-          )
-        mapping = {'Line': None, 'Surface': SurfaceBase, 'Volume': VolumeBase}
-        return mapping[legal_dim_types[dim]](id0=name, is_list=True)
+        self._GMSH_CODE.append(Boolean(
+            name, operation, input_entities, tool_entities,
+            delete_first=delete_first, delete_other=delete_other
+            ))
+        mapping = {1: None, 2: SurfaceBase, 3: VolumeBase}
+        return mapping[dim](id0=name, is_list=True)
 
     def boolean_intersection(
             self, entities, delete_first=True, delete_other=True
@@ -223,18 +182,14 @@ class Geometry(bl.Geometry):
         self._EXTRUDE_ID += 1
 
         assert isinstance(input_entity, built_in.surface_base.SurfaceBase)
-        entity = Dummy('Surface{{{}}}'.format(input_entity.id))
 
         # out[] = Extrude{0,1,0}{ Line{1}; };
         name = 'ex{}'.format(self._EXTRUDE_ID)
 
         # Only translation
         self._GMSH_CODE.append(
-            '{}[] = Extrude{{{}}}{{{};}};'.format(
-                name,
-                ','.join(repr(x) for x in translation_axis),
-                entity.id
-            ))
+            Extrusion(name, input_entity, translation_axis=translation_axis)
+            )
 
         # From <https://www.manpagez.com/info/gmsh/gmsh-2.4.0/gmsh_66.php>:
         #
@@ -1,29 +1,35 @@
 # -*- coding: utf-8 -*-
 #
+from ..parameter import _array
+
 from .surface_base import SurfaceBase
 
 
 class Rectangle(SurfaceBase):
+    __slots__ = ('x0', 'a', 'b', 'corner_radius', 'char_length')
+
     def __init__(self, x0, a, b, corner_radius=None, char_length=None):
         super(Rectangle, self).__init__()
 
         assert len(x0) == 3
 
-        self.x0 = x0
+        self.x0 = _array(x0)
         self.a = a
         self.b = b
         self.corner_radius = corner_radius
         self.char_length = char_length
+        return
 
-        args = list(x0) + [a, b]
-        if corner_radius is not None:
-            args.append(corner_radius)
+    @property
+    def code(self):
+        args = list(self.x0) + [self.a, self.b]
+        if self.corner_radius is not None:
+            args.append(self.corner_radius)
 
         args = ', '.join(['{}'.format(arg) for arg in args])
 
-        self.code = '\n'.join([
+        return '\n'.join([
             '{} = news;'.format(self.id),
             'Rectangle({}) = {{{}}};'.format(self.id, args)
-            ] + self.char_length_code(char_length)
+            ] + self.char_length_code(self.char_length)
             )
-        return
@@ -5,6 +5,7 @@ from .. import built_in
 class SurfaceBase(built_in.surface_base.SurfaceBase):
     _ID = 0
     dimension = 2
+    __slots__ = ('is_list',)
 
     def __init__(self, is_list=False, id0=None):
         super(SurfaceBase, self).__init__()
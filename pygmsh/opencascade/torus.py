@@ -1,28 +1,34 @@
 # -*- coding: utf-8 -*-
 #
+from ..parameter import _array
+
 from .volume_base import VolumeBase
 
 
 class Torus(VolumeBase):
+    __slots__ = ('center', 'radius0', 'radius1', 'alpha', 'char_length')
+
     def __init__(self, center, radius0, radius1, alpha=None, char_length=None):
         super(Torus, self).__init__()
 
         assert len(center) == 3
 
-        self.center = center
+        self.center = _array(center)
         self.radius0 = radius0
         self.radius1 = radius1
         self.alpha = alpha
         self.char_length = char_length
+        return
 
-        args = list(center) + [radius0] + [radius1]
-        if alpha is not None:
-            args.append(alpha)
+    @property
+    def code(self):
+        args = list(self.center) + [self.radius0] + [self.radius1]
+        if self.alpha is not None:
+            args.append(self.alpha)
         args = ', '.join(['{}'.format(arg) for arg in args])
 
-        self.code = '\n'.join([
+        return '\n'.join([
             '{} = newv;'.format(self.id),
             'Torus({}) = {{{}}};'.format(self.id, args)
-            ] + self.char_length_code(char_length)
+            ] + self.char_length_code(self.char_length)
             )
-        return
@@ -6,6 +6,7 @@ from .. import built_in
 class VolumeBase(built_in.volume_base.VolumeBase):
     _ID = 0
     dimension = 3
+    __slots__ = ('is_list',)
 
     def __init__(self, is_list=False, id0=None):
         super(VolumeBase, self).__init__()
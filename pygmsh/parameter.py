@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Named parameters of geometries.
+
+A :class:`Parameter` is a float with the value of its default, such that it can
+be used wherever numbers are accepted, and arithmetic with it gives an
+:class:`Expression`, another float that remembers how it was computed. Both
+are written to the Gmsh code by their expressions, so that the parameters can
+be overridden when meshing (Gmsh's `-setnumber`) without rebuilding the
+geometry. Values that pass through functions other than the arithmetic
+operators and the NumPy functions in `_OPERATIONS` (e.g., the ones in `math`)
+are plain numbers again and are written to the code as such.
+
+The other way round, :func:`_evaluate` computes the values of Gmsh expressions
+(e.g., in size fields) without passing them to `eval()`.
+'''
+import ast
+import functools
+import math
+import operator
+import re
+
+import numpy
+
+from .helpers import _is_string
+
+# functions on floats and the Gmsh expressions, by the name of the ufunc
+_OPERATIONS = {
+    'add': (operator.add, '({} + {})'),
+    'subtract': (operator.sub, '({} - {})'),
+    'multiply': (operator.mul, '({} * {})'),
+    'divide': (operator.truediv, '({} / {})'),
+    'true_divide': (operator.truediv, '({} / {})'),
+    'power': (operator.pow, '({}^{})'),
+    'negative': (operator.neg, '(-{})'),
+    'positive': (operator.pos, '{}'),
+    'absolute': (abs, 'Fabs({})'),
+    'sqrt': (math.sqrt, 'Sqrt({})'),
+    'exp': (math.exp, 'Exp({})'),
+    'log': (math.log, 'Log({})'),
+    'sin': (math.sin, 'Sin({})'),
+    'cos': (math.cos, 'Cos({})'),
+    'tan': (math.tan, 'Tan({})'),
+    'arctan': (math.atan, 'Atan({})'),
+    'arctan2': (math.atan2, 'Atan2({}, {})'),
+    }
+
+
+def _code(x):
+    '''Gmsh code of the number `x`; strings are Gmsh code already.'''
+    if _is_string(x):
+        return x
+    if isinstance(x, numpy.generic):
+        # NumPy 2 writes its scalars as, e.g., `np.float64(0.5)`.
+        x = x.item()
+    return repr(x)
+
+
+def _dtype(*values):
+    '''NumPy dtype for arrays of `values`: `object` if there are expressions
+    among them, which NumPy would convert to plain floats, or Gmsh code.
+    '''
+    for value in values:
+        if isinstance(value, Expression) or _is_string(value):
+            return object
+        if isinstance(value, (list, tuple, numpy.ndarray)) \
+                and _dtype(*value) is object:
+            return object
+    return float
+
+
+def _array(x):
+    '''A copy of the vector `x` as a NumPy array of floats, or of objects if
+    there are expressions or Gmsh code among the entries.
+    '''
+    return numpy.array(x, dtype=_dtype(x))
+
+
+# the operators and functions of the Gmsh expressions that `_evaluate`
+# evaluates
+_BINARY_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow,
+    }
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_FUNCTIONS = {
+    'Sqrt': numpy.sqrt, 'Exp': numpy.exp, 'Log': numpy.log,
+    'Sin': numpy.sin, 'Cos': numpy.cos, 'Tan': numpy.tan,
+    'Atan': numpy.arctan, 'Atan2': numpy.arctan2, 'Fabs': numpy.abs,
+    'Abs': numpy.abs, 'Min': numpy.minimum, 'Max': numpy.maximum,
+    }
+
+
+def _node_value(node, names):
+    tpe = type(node).__name__
+    if tpe in ['Num', 'Constant']:
+        value = node.n if tpe == 'Num' else node.value
+        valid = isinstance(value, (int, float)) \
+            and not isinstance(value, bool)
+    elif tpe == 'Name':
+        value = names.get(node.id, math.pi if node.id == 'Pi' else None)
+        valid = value is not None
+    elif tpe == 'BinOp' and type(node.op) in _BINARY_OPERATORS:
+        value = _BINARY_OPERATORS[type(node.op)](
+            _node_value(node.left, names), _node_value(node.right, names)
+            )
+        valid = True
+    elif tpe == 'UnaryOp' and type(node.op) in _UNARY_OPERATORS:
+        value = _UNARY_OPERATORS[type(node.op)](
+            _node_value(node.operand, names)
+            )
+        valid = True
+    elif tpe == 'Call' and isinstance(node.func, ast.Name) \
+            and node.func.id in _FUNCTIONS and not node.keywords:
+        value = _FUNCTIONS[node.func.id](
+            *[_node_value(arg, names) for arg in node.args]
+            )
+        valid = True
+    else:
+        valid = False
+    if not valid:
+        raise ValueError('Unsupported expression: {}'.format(ast.dump(node)))
+    return value
+
+
+def _evaluate(string, names=None):
+    '''Value of the Gmsh expression `string` with numbers, the variables
+    `names`, `Pi`, the operators `+ - * / ^`, and the functions in
+    `_FUNCTIONS`; raises a `ValueError` for anything else.
+    '''
+    try:
+        tree = ast.parse(string.strip().replace('^', '**'), mode='eval')
+    except SyntaxError:
+        tree = None
+    if tree is None:
+        raise ValueError('Invalid expression: {}'.format(string))
+    return _node_value(tree.body, names or {})
+
+
+def _combine(name, *args):
+    function, template = _OPERATIONS[name]
+    value = function(*[float(a) for a in args])
+    if not any(isinstance(a, Expression) for a in args):
+        return value
+    return Expression(value, template.format(*[_code(a) for a in args]))
+
+
+def _function(name):
+    # NumPy calls these methods for the elements of arrays of objects.
+    def method(self):
+        return _combine(name, self)
+    return method
+
+
+def _operator(name, reflected=False):
+    def method(self, other):
+        if isinstance(other, numpy.ndarray):
+            ufunc = getattr(numpy, name)
+            return ufunc(other, self) if reflected else ufunc(self, other)
+        if not isinstance(other, (int, float, numpy.number)):
+            return NotImplemented
+        return _combine(name, other, self) if reflected \
+            else _combine(name, self, other)
+    return method
+
+
+class Expression(float):
+    '''A number and the Gmsh expression that computes it.'''
+    __slots__ = ('code',)
+
+    def __new__(cls, value, code):
+        self = float.__new__(cls, value)
+        self.code = code
+        return self
+
+    def __repr__(self):
+        return self.code
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return (Expression, (float(self), self.code))
+
+    __add__ = _operator('add')
+    __radd__ = _operator('add', reflected=True)
+    __sub__ = _operator('subtract')
+    __rsub__ = _operator('subtract', reflected=True)
+    __mul__ = _operator('multiply')
+    __rmul__ = _operator('multiply', reflected=True)
+    __truediv__ = __div__ = _operator('divide')
+    __rtruediv__ = __rdiv__ = _operator('divide', reflected=True)
+    __pow__ = _operator('power')
+    __rpow__ = _operator('power', reflected=True)
+
+    def __neg__(self):
+        return _combine('negative', self)
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return _combine('absolute', self)
+
+    sqrt = _function('sqrt')
+    exp = _function('exp')
+    log = _function('log')
+    sin = _function('sin')
+    cos = _function('cos')
+    tan = _function('tan')
+    arctan = _function('arctan')
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method == '__call__' and not kwargs \
+                and ufunc.__name__ in _OPERATIONS:
+            # element-wise, into arrays of objects; NumPy would convert
+            # expressions to plain floats
+            inputs = [
+                numpy.array(x, dtype=object) if isinstance(x, Expression)
+                else x
+                for x in inputs
+                ]
+            return numpy.frompyfunc(
+                functools.partial(_combine, ufunc.__name__), ufunc.nin, 1
+                )(*inputs)
+        # anything else on the values
+        inputs = [numpy.asarray(x).astype(float) for x in inputs]
+        return getattr(ufunc, method)(*inputs, **kwargs)
+
+
+class Parameter(Expression):
+    '''A named number of a geometry, written to the Gmsh code by its name.
+    Create parameters with :meth:`pygmsh.built_in.Geometry.parameter`.
+    '''
+    __slots__ = ()
+
+    def __new__(cls, name, value):
+        assert re.match(r'^[A-Za-z_]\w*$', name), \
+            'Invalid parameter name \'{}\'.'.format(name)
+        return Expression.__new__(cls, value, name)
+
+    def __reduce__(self):
+        return (Parameter, (self.code, float(self)))
+
+    @property
+    def name(self):
+        return self.code
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+'''Tiling of periodic meshes: a unit cell, meshed with periodic constraints
+(cf. :meth:`pygmsh.built_in.Geometry.set_periodic_surfaces`), is replicated
+by translations.
+
+Meshes are tuples `(points, cells, point_data, cell_data, field_data)` as
+returned by :func:`pygmsh.generate_mesh`.
+'''
+import itertools
+
+import numpy
+
+from .instancing import instantiate
+from .merge import (
+    _boundary_points, _coincident_pairs, _connected_components,
+    _identify_points
+    )
+from .transform import Transform
+
+
+def periodic_point_pairs(mesh, period, tol=None):
+    '''Pairs `(masters, slaves)` of point indices of the periodic mesh
+    `mesh` with `points[slaves] == points[masters] + period`. Only the
+    boundary points of the mesh are compared.
+    '''
+    points, cells = mesh[0], mesh[1]
+    if tol is None:
+        tol = 1.0e-10 * numpy.max(points.max(axis=0) - points.min(axis=0))
+
+    b = _boundary_points(points, cells)
+    X = numpy.concatenate([points[b] + period, points[b]])
+    I, J = _coincident_pairs(X, tol)
+    # pairs between the shifted and the original points
+    n = len(b)
+    is_cross = (I < n) & (J >= n)
+    masters = b[I[is_cross]]
+    slaves = b[J[is_cross] - n]
+    assert len(numpy.unique(slaves)) == len(slaves), \
+        'Ambiguous periodic correspondence; decrease tol.'
+    return masters, slaves
+
+
+def tile_periodic_mesh(mesh, periods, num, tol=None):
+    '''Replicates the periodic mesh `mesh` (the unit cell) `num[k]` times along
+    each of the translation vectors `periods[k]`. The points of the unit cell
+    that are identified by the periodicity are computed once (cf.
+    :func:`periodic_point_pairs`); the points of the copies are then merged by
+    index arithmetic only. The cell data `instance` numbers the copies.
+    '''
+    periods = numpy.asarray(periods, dtype=float)
+    assert len(periods) == len(num)
+    n = len(mesh[0])
+
+    # multi-indices of the copies, in the order of the copies
+    grid = numpy.array(list(itertools.product(*[range(m) for m in num])))
+    tiled = instantiate(
+        mesh, [Transform.translation(numpy.dot(g, periods)) for g in grid]
+        )
+
+    # linear index of the copy shifted by one in direction k
+    strides = numpy.cumprod([1] + list(num[::-1]))[:-1][::-1]
+    I = []
+    J = []
+    for k, period in enumerate(periods):
+        masters, slaves = periodic_point_pairs(mesh, period, tol)
+        copies = numpy.flatnonzero(grid[:, k] < num[k] - 1)
+        # The slave points of a copy coincide with the master points of its
+        # neighbor in direction k.
+        I.append((copies[:, None] * n + slaves[None, :]).reshape(-1))
+        J.append(
+            ((copies[:, None] + strides[k]) * n + masters[None, :]).reshape(-1)
+            )
+    I = numpy.concatenate(I)
+    J = numpy.concatenate(J)
+    labels = _connected_components(len(tiled[0]), I, J)
+    return _identify_points(tiled, labels)
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+#
+'''Writer for Gmsh post-processing views (legacy binary `.pos` format 1.4),
+e.g., for background meshes. Scalar values are given at the nodes of
+triangles, quadrilaterals, tetrahedra, or hexahedra.
+'''
+import numpy
+
+try:
+    # pylint: disable=no-name-in-module
+    from scipy.spatial import Delaunay
+except ImportError:
+    Delaunay = None
+
+# Position of the scalar list of each cell type among the 24 lists of the
+# first-order cells (points, lines, triangles, quadrangles, tetrahedra,
+# hexahedra, prisms, pyramids; scalar, vector, tensor each).
+_SCALAR_LIST = {
+    'triangle': 6,
+    'quad': 9,
+    'tetra': 12,
+    'hexahedron': 15,
+    }
+
+# Corners of a grid cell in Gmsh order.
+_QUAD_CORNERS = numpy.array([[0, 0], [1, 0], [1, 1], [0, 1]])
+_HEXAHEDRON_CORNERS = numpy.array([
+    [0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+    [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1],
+    ])
+
+
+def write_pos(filename, cell_type, X, values, name='values'):
+    '''Writes a view with one time step.
+
+    :param cell_type: one of `triangle`, `quad`, `tetra`, `hexahedron`
+    :param X: node coordinates, shape `(num_cells, num_nodes_per_cell, 3)`
+    :param values: values at the nodes, shape `(num_cells,
+        num_nodes_per_cell)`
+    '''
+    X = numpy.asarray(X, dtype=float)
+    values = numpy.asarray(values, dtype=float)
+    assert X.shape[:2] == values.shape
+    assert X.shape[2] == 3
+    assert ' ' not in name
+
+    counts = numpy.zeros(52, dtype=int)
+    counts[_SCALAR_LIST[cell_type]] = len(X)
+
+    # Per cell: all x, all y, all z coordinates, then the values.
+    data = numpy.concatenate([
+        X.transpose(0, 2, 1).reshape(len(X), -1), values
+        ], axis=1)
+
+    with open(filename, 'wb') as f:
+        f.write(
+            '$PostFormat\n1.4 1 8\n$EndPostFormat\n$View\n'.encode('utf-8')
+            )
+        f.write('{} 1 {}\n'.format(
+            name, ' '.join([str(c) for c in counts])
+            ).encode('utf-8'))
+        # endianness check
+        numpy.array([1], dtype=numpy.int32).tofile(f)
+        # time step values
+        numpy.array([0.0]).tofile(f)
+        data.astype(numpy.float64).tofile(f)
+        f.write('\n$EndView\n'.encode('utf-8'))
+    return
+
+
+def grid_cells(axes, values):
+    '''Quadrilaterals (hexahedra) of the 2D (3D) tensor-product grid with the
+    coordinates `axes` and the node values `values` of shape
+    `(len(axes[0]), len(axes[1]), ...)`. Returns the cell type, the node
+    coordinates, and the node values per cell.
+    '''
+    axes = [numpy.asarray(a, dtype=float) for a in axes]
+    values = numpy.asarray(values, dtype=float)
+    dim = len(axes)
+    assert values.shape == tuple(len(a) for a in axes)
+    corners = _QUAD_CORNERS if dim == 2 else _HEXAHEDRON_CORNERS
+
+    # grid indices of the lower corners of all cells
+    idx = numpy.meshgrid(
+        *[numpy.arange(len(a) - 1) for a in axes], indexing='ij'
+        )
+    idx = [i.reshape(-1, 1) + corners[:, k] for k, i in enumerate(idx)]
+
+    X = numpy.zeros(idx[0].shape + (3,))
+    for k in range(dim):
+        X[..., k] = axes[k][idx[k]]
+    return (
+        'quad' if dim == 2 else 'hexahedron',
+        X,
+        values[tuple(idx)]
+        )
+
+
+def mesh_cells(points, cells, values):
+    '''Cells of the triangle or tetrahedron mesh `(points, cells)` with the
+    node values `values`. Returns the cell type, the node coordinates, and the
+    node values per cell.
+    '''
+    points = numpy.asarray(points, dtype=float)
+    cells = numpy.asarray(cells)
+    values = numpy.asarray(values, dtype=float)
+    assert cells.shape[1] in [3, 4]
+
+    X = numpy.zeros(cells.shape + (3,))
+    X[..., :points.shape[1]] = points[cells]
+    return (
+        'triangle' if cells.shape[1] == 3 else 'tetra',
+        X,
+        values[cells]
+        )
+
+
+def scattered_cells(points, values):
+    '''Delaunay triangulation (tetrahedralization) of the scattered 2D (3D)
+    points `points`; needs SciPy. Returns the cell type, the node
+    coordinates, and the node values per cell.
+    '''
+    assert Delaunay is not None, \
+        'Mesh sizes at scattered points need SciPy (scipy.spatial.Delaunay).'
+    return mesh_cells(points, Delaunay(points).simplices, values)
@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+#
+'''
+Bounding boxes of the entities of a geometry and an index over them for
+finding the entities in a region or next to a point.
+
+The boxes are computed from the point coordinates (exactly for circle and
+ellipse arcs; B-splines are bounded by their control points) and from the
+parameters of the OpenCASCADE primitives. Entities that are only known from
+code strings (e.g., the results of extrusions and Boolean operations) aren't
+indexed.
+
+The index is a forest of packed R-trees: a tree is built at once from boxes
+sorted along a Z-order curve, and trees of similar size are merged as
+entities are added, so that adding entities takes amortized `O(log n)` time
+per entity and queries visit `O(log^2 n)` nodes plus the results.
+'''
+import heapq
+import math
+
+import numpy
+
+from .helpers import _is_string
+
+from .built_in.bspline import Bspline
+from .built_in.circle_arc import CircleArc
+from .built_in.ellipse_arc import EllipseArc
+from .built_in.line_base import OrientedLine
+from .built_in.line_loop import LineLoop
+from .built_in.point import Point
+from .built_in.spline import Spline
+from .built_in.surface_base import OrientedSurface
+from .built_in.surface_loop import SurfaceLoop
+from .opencascade.ball import Ball
+from .opencascade.box import Box
+from .opencascade.cone import Cone
+from .opencascade.cylinder import Cylinder
+from .opencascade.disk import Disk
+from .opencascade.rectangle import Rectangle
+from .opencascade.torus import Torus
+from .opencascade.wedge import Wedge
+
+# number of children of the nodes of the trees
+_FANOUT = 8
+
+
+def _coordinates(point):
+    return numpy.array([float(x) for x in point.x])
+
+
+def _ellipse_box(center, U, V, t0, t1):
+    '''Bounding box of the curve `center + U cos(t) + V sin(t)`, `t` in
+    `[t0, t1]`: the end points and the extrema in between.
+    '''
+    t = [t0, t1]
+    # The coordinate k is extremal where tan(t) = V[k] / U[k].
+    for phi in numpy.arctan2(V, U):
+        for s in phi + math.pi * numpy.arange(-4, 5):
+            if t0 < s < t1:
+                t.append(s)
+    t = numpy.array(t)
+    X = center + numpy.outer(numpy.cos(t), U) + numpy.outer(numpy.sin(t), V)
+    return X.min(axis=0), X.max(axis=0)
+
+
+def _circle_arc_box(arc):
+    start, center, end = [
+        _coordinates(p) for p in [arc.start, arc.center, arc.end]
+        ]
+    u = start - center
+    v = end - center
+    r = numpy.linalg.norm(u)
+    e2 = v - numpy.dot(v, u) / r**2 * u
+    norm = numpy.linalg.norm(e2)
+    if norm == 0.0:
+        return numpy.minimum(start, end), numpy.maximum(start, end)
+    # Gmsh's arcs are the shorter ones, with angles in [0, pi].
+    angle = math.atan2(numpy.dot(v, e2) / norm, numpy.dot(v, u) / r)
+    return _ellipse_box(center, u, r / norm * e2, 0.0, angle)
+
+
+def _ellipse_arc_box(arc):
+    start, center, major, end = [
+        _coordinates(p)
+        for p in [arc.start, arc.center, arc.point_on_major_axis, arc.end]
+        ]
+    chord = numpy.minimum(start, end), numpy.maximum(start, end)
+    u = start - center
+    v = end - center
+    e1 = (major - center) / numpy.linalg.norm(major - center)
+    w = u if numpy.linalg.norm(u - numpy.dot(u, e1) * e1) \
+        > numpy.linalg.norm(v - numpy.dot(v, e1) * e1) else v
+    e2 = w - numpy.dot(w, e1) * e1
+    norm = numpy.linalg.norm(e2)
+    if norm == 0.0:
+        return chord
+    e2 /= norm
+    # semi-axes a, b from x^2/a^2 + y^2/b^2 = 1 at both end points
+    X = numpy.array([[numpy.dot(u, e1), numpy.dot(u, e2)],
+                     [numpy.dot(v, e1), numpy.dot(v, e2)]])
+    try:
+        inv = numpy.linalg.solve(X**2, numpy.ones(2))
+    except numpy.linalg.LinAlgError:
+        return chord
+    if numpy.any(inv <= 0.0):
+        return chord
+    a, b = 1.0 / numpy.sqrt(inv)
+    t0, t1 = numpy.arctan2(X[:, 1] / b, X[:, 0] / a)
+    # the shorter arc
+    dt = (t1 - t0 + math.pi) % (2 * math.pi) - math.pi
+    t0, t1 = min(t0, t0 + dt), max(t0, t0 + dt)
+    return _ellipse_box(center, a * e1, b * e2, t0, t1)
+
+
+def _primitive_box(entity):
+    '''Bounding box of the OpenCASCADE primitive `entity`.'''
+    if isinstance(entity, Rectangle):
+        lo = numpy.array(entity.x0, dtype=float)
+        hi = lo + [entity.a, entity.b, 0.0]
+    elif isinstance(entity, Disk):
+        r1 = entity.radius0 if entity.radius1 is None else entity.radius1
+        lo = numpy.array(entity.x0, dtype=float) - [entity.radius0, r1, 0.0]
+        hi = numpy.array(entity.x0, dtype=float) + [entity.radius0, r1, 0.0]
+    elif isinstance(entity, (Box, Wedge)):
+        lo = numpy.array(entity.x0, dtype=float)
+        hi = lo + numpy.array(entity.extents, dtype=float)
+    elif isinstance(entity, Ball):
+        lo = numpy.array(entity.center, dtype=float) - entity.radius
+        hi = numpy.array(entity.center, dtype=float) + entity.radius
+    elif isinstance(entity, Cylinder):
+        ends = numpy.array(
+            [entity.x0, numpy.add(entity.x0, entity.axis)], dtype=float
+            )
+        lo = ends.min(axis=0) - entity.radius
+        hi = ends.max(axis=0) + entity.radius
+    elif isinstance(entity, Cone):
+        ends = numpy.array(
+            [entity.center, numpy.add(entity.center, entity.axis)],
+            dtype=float
+            )
+        r = max(entity.radius0, entity.radius1)
+        lo = ends.min(axis=0) - r
+        hi = ends.max(axis=0) + r
+    else:
+        assert isinstance(entity, Torus)
+        r = entity.radius0 + entity.radius1
+        lo = numpy.array(entity.center, dtype=float) \
+            - [r, r, entity.radius1]
+        hi = numpy.array(entity.center, dtype=float) \
+            + [r, r, entity.radius1]
+    return lo, hi
+
+
+def _references(entity):
+    '''The entities whose boxes make up the box of `entity`.'''
+    for name in [
+            'lines', 'surfaces', 'volumes', 'line_loop', 'surface_loop'
+            ]:
+        value = getattr(entity, name, None)
+        if value is not None:
+            return value if isinstance(value, list) else [value]
+    return None
+
+
+def bounding_box(entity, boxes=None):
+    '''The bounding box `(lower, upper)` of `entity`, or `None` if it isn't
+    known. `boxes` are known boxes of entities by their `id()`.
+    '''
+    while isinstance(entity, (OrientedLine, OrientedSurface)):
+        entity = entity.target
+    if boxes is not None and id(entity) in boxes:
+        return boxes[id(entity)]
+
+    if isinstance(entity, Point):
+        x = _coordinates(entity)
+        return x, x
+    if isinstance(entity, CircleArc):
+        return _circle_arc_box(entity)
+    if isinstance(entity, EllipseArc):
+        return _ellipse_arc_box(entity)
+    if isinstance(entity, (Spline, Bspline)) or hasattr(entity, 'points'):
+        # lines, splines, and B-splines (within their control polygons)
+        points = entity.control_points if isinstance(entity, Bspline) \
+            else entity.points
+        X = numpy.array([_coordinates(p) for p in points])
+        return X.min(axis=0), X.max(axis=0)
+    if hasattr(entity, 'char_length') and hasattr(entity, 'dimension'):
+        return _primitive_box(entity)
+
+    # loops, surfaces, volumes, and compounds, from their boundaries
+    references = _references(entity)
+    if not references:
+        return None
+    references = [bounding_box(e, boxes) for e in references]
+    if any(box is None for box in references):
+        return None
+    return (
+        numpy.min([box[0] for box in references], axis=0),
+        numpy.max([box[1] for box in references], axis=0),
+        )
+
+
+def _morton(X):
+    '''Position of the points `X` along a Z-order curve through their
+    bounding box.
+    '''
+    lo = X.min(axis=0)
+    scale = X.max(axis=0) - lo
+    scale[scale == 0.0] = 1.0
+    Q = ((X - lo) / scale * 1023).astype(numpy.int64)
+    code = numpy.zeros(len(X), dtype=numpy.int64)
+    for bit in range(10):
+        for k in range(3):
+            code |= ((Q[:, k] >> bit) & 1) << (3 * bit + k)
+    return code
+
+
+class _Tree(object):
+    '''Packed R-tree over fixed boxes.'''
+    def __init__(self, lower, upper, entities, order):
+        perm = numpy.argsort(_morton(0.5 * (lower + upper)), kind='mergesort')
+        self.entities = [entities[i] for i in perm]
+        self.order = order[perm]
+        # the boxes of the nodes, from the leaves (the entities) up
+        self.levels = [(lower[perm], upper[perm])]
+        while len(self.levels[-1][0]) > _FANOUT:
+            lo, hi = self.levels[-1]
+            starts = numpy.arange(0, len(lo), _FANOUT)
+            self.levels.append((
+                numpy.minimum.reduceat(lo, starts, axis=0),
+                numpy.maximum.reduceat(hi, starts, axis=0),
+                ))
+        return
+
+    def __len__(self):
+        return len(self.entities)
+
+    def merge(self, other):
+        lower = numpy.concatenate([self.levels[0][0], other.levels[0][0]])
+        upper = numpy.concatenate([self.levels[0][1], other.levels[0][1]])
+        return _Tree(
+            lower, upper, self.entities + other.entities,
+            numpy.concatenate([self.order, other.order])
+            )
+
+    def query_box(self, lower, upper):
+        '''Indices of the entities whose boxes intersect `[lower, upper]`.'''
+        idx = numpy.arange(len(self.levels[-1][0]))
+        for level in range(len(self.levels) - 1, -1, -1):
+            lo, hi = self.levels[level]
+            mask = numpy.all((lo[idx] <= upper) & (lower <= hi[idx]), axis=1)
+            idx = idx[mask]
+            if level > 0:
+                n = len(self.levels[level - 1][0])
+                idx = (idx[:, None] * _FANOUT + numpy.arange(_FANOUT)).ravel()
+                idx = idx[idx < n]
+        return idx
+
+    def _distances(self, x, level, idx):
+        lo, hi = self.levels[level]
+        d = numpy.maximum(numpy.maximum(lo[idx] - x, x - hi[idx]), 0.0)
+        return numpy.sqrt(numpy.einsum('ij,ij->i', d, d))
+
+    def nearest(self, x, bound=numpy.inf):
+        '''The distance to and the index of the entity whose box is nearest
+        to `x`, if closer than `bound`; best-first search.
+        '''
+        top = len(self.levels) - 1
+        idx = numpy.arange(len(self.levels[top][0]))
+        heap = [
+            (d, top, i) for d, i in zip(self._distances(x, top, idx), idx)
+            ]
+        heapq.heapify(heap)
+        while heap:
+            d, level, i = heapq.heappop(heap)
+            if d >= bound:
+                break
+            if level == 0:
+                return d, i
+            n = len(self.levels[level - 1][0])
+            idx = numpy.arange(i * _FANOUT, min((i + 1) * _FANOUT, n))
+            for dc, c in zip(self._distances(x, level - 1, idx), idx):
+                heapq.heappush(heap, (dc, level - 1, c))
+        return None
+
+
+class SpatialIndex(object):
+    '''Index of the bounding boxes of the entities in a list of statements,
+    by dimension; cf. :meth:`pygmsh.built_in.Geometry.query_box`. Loops
+    aren't indexed.
+    '''
+    def __init__(self):
+        self._reset(None)
+        return
+
+    def _reset(self, statements):
+        self._statements = statements
+        self._num_statements = 0
+        self._last = None
+        self._boxes = {}
+        self._trees = {}
+        return
+
+    def update(self, statements):
+        '''Indexes the statements added since the last update. If earlier
+        statements were changed (e.g., by :meth:`Geometry.optimize`), the
+        index is rebuilt.
+        '''
+        n = self._num_statements
+        if statements is not self._statements or len(statements) < n \
+                or n > 0 and statements[n - 1] is not self._last:
+            self._reset(statements)
+            n = 0
+
+        new = {}
+        for k in range(n, len(statements)):
+            s = statements[k]
+            if _is_string(s) or isinstance(s, (LineLoop, SurfaceLoop)):
+                continue
+            box = bounding_box(s, self._boxes)
+            if box is None:
+                continue
+            self._boxes[id(s)] = box
+            new.setdefault(s.dimension, []).append((k, s, box))
+
+        for dim, items in new.items():
+            tree = _Tree(
+                numpy.array([box[0] for _, _, box in items]),
+                numpy.array([box[1] for _, _, box in items]),
+                [s for _, s, _ in items],
+                numpy.array([k for k, _, _ in items])
+                )
+            # Merge trees of similar size such that there are O(log n).
+            trees = self._trees.setdefault(dim, [])
+            while trees and len(trees[-1]) <= 2 * len(tree):
+                tree = trees.pop().merge(tree)
+            trees.append(tree)
+
+        self._num_statements = len(statements)
+        self._last = statements[-1] if statements else None
+        return
+
+    def _dims(self, dim):
+        return sorted(self._trees) if dim is None else [dim]
+
+    def query_box(self, lower, upper, dim=None):
+        lower = numpy.array(lower, dtype=float)
+        upper = numpy.array(upper, dtype=float)
+        found = []
+        for d in self._dims(dim):
+            for tree in self._trees.get(d, []):
+                found.extend(
+                    (tree.order[i], tree.entities[i])
+                    for i in tree.query_box(lower, upper)
+                    )
+        # in the order in which the entities were added
+        return [e for _, e in sorted(found, key=lambda item: item[0])]
+
+    def nearest(self, x, dim=None):
+        x = numpy.array(x, dtype=float)
+        best = None
+        bound = numpy.inf
+        for d in self._dims(dim):
+            for tree in self._trees.get(d, []):
+                result = tree.nearest(x, bound)
+                if result is not None:
+                    bound = result[0]
+                    best = tree.entities[result[1]]
+        return best
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+'''Meshing of symmetric geometries: only the fundamental sector is meshed by
+Gmsh, the full mesh is assembled by rotating and reflecting the sector mesh.
+'''
+import itertools
+
+import numpy
+
+from .helpers import generate_mesh
+from .instancing import instantiate
+from .merge import merge_meshes
+from .transform import Transform
+
+
+class RotationalSymmetry(object):
+    '''Cyclic group of the `num` rotations around `axis` (through
+    `point_on_axis`) by multiples of :math:`2\\pi/\\text{num}`.
+    '''
+    def __init__(
+            self, num, axis=(0.0, 0.0, 1.0), point_on_axis=(0.0, 0.0, 0.0)
+            ):
+        self.num = num
+        self.axis = numpy.array(axis, dtype=float)
+        self.point_on_axis = numpy.array(point_on_axis, dtype=float)
+        return
+
+    @property
+    def angle(self):
+        return 2 * numpy.pi / self.num
+
+    def transforms(self):
+        return Transform.rotations(
+            numpy.tile(self.axis, (self.num, 1)),
+            self.angle * numpy.arange(self.num),
+            self.point_on_axis
+            )
+
+    def set_periodic(self, geometry, slaves, masters):
+        '''Makes the mesh on the cut `slaves` (lines in 2D, surfaces in 3D) of
+        the sector the rotation of the mesh on the cut `masters` by
+        :attr:`angle`, such that the rotated copies of the sector mesh fit
+        together.
+        '''
+        transform = Transform.rotation(
+            self.axis, self.angle, self.point_on_axis
+            )
+        if slaves[0].dimension == 1:
+            geometry.set_periodic_lines(slaves, masters, transform)
+        else:
+            geometry.set_periodic_surfaces(slaves, masters, transform)
+        return
+
+
+class ReflectionSymmetry(object):
+    '''Group generated by the reflections at the planes through `point` with
+    the (mutually orthogonal) `normals`; :math:`2^k` elements for `k`
+    normals.
+    '''
+    def __init__(self, normals, point=(0.0, 0.0, 0.0)):
+        normals = numpy.array(normals, dtype=float).reshape(-1, 3)
+        self.normals = normals / numpy.sqrt(
+            numpy.einsum('ij,ij->i', normals, normals)
+            )[:, None]
+        self.point = numpy.array(point, dtype=float)
+        return
+
+    def transforms(self):
+        # Householder reflections
+        mirrors = [
+            Transform(numpy.eye(3) - 2 * numpy.outer(n, n))
+            for n in self.normals
+            ]
+        transforms = []
+        p = self.point
+        for selection in itertools.product([False, True], repeat=len(mirrors)):
+            R = numpy.eye(3)
+            for mirror, selected in zip(mirrors, selection):
+                if selected:
+                    R = numpy.dot(mirror.R, R)
+            transforms.append(Transform(R, p - numpy.dot(R, p)))
+        return transforms
+
+
+def generate_symmetric_mesh(sector, symmetries, tol=None, **kwargs):
+    '''Meshes the fundamental sector `sector` of a geometry with the
+    symmetries `symmetries` (a :class:`RotationalSymmetry`, a
+    :class:`ReflectionSymmetry`, or a list of them, in which case all
+    combinations are used) and assembles the full mesh from copies of the
+    sector mesh. Points on the seams closer than `tol` (default:
+    :math:`10^{-10}` times the size of the sector) are merged; the cell data
+    `instance` tells the sectors apart.
+
+    The discretizations of the cuts have to match; for rotations, use
+    :meth:`RotationalSymmetry.set_periodic`. Cuts on mirror planes always
+    match.
+
+    All other keyword arguments are passed on to
+    :func:`pygmsh.generate_mesh`.
+    '''
+    if not isinstance(symmetries, (list, tuple)):
+        symmetries = [symmetries]
+
+    transforms = [Transform()]
+    for symmetry in symmetries:
+        transforms = [a * b for a in symmetry.transforms() for b in transforms]
+
+    mesh = generate_mesh(sector, **kwargs)
+    if tol is None:
+        points = mesh[0]
+        tol = 1.0e-10 * numpy.max(points.max(axis=0) - points.min(axis=0))
+
+    return merge_meshes([instantiate(mesh, transforms)], tol)
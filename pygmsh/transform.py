@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+import numpy
+
+
+def _rotation_matrices(axes, angles):
+    '''Vectorized version of :func:`pygmsh.helpers.rotation_matrix`: one
+    rotation matrix for each pair of (unit) axis and angle.
+    '''
+    u = numpy.asarray(axes, dtype=float).reshape(-1, 3)
+    theta = numpy.asarray(angles, dtype=float).reshape(-1)
+    assert numpy.allclose(numpy.einsum('ij,ij->i', u, u), 1.0), \
+        'the rotation axes must be unitary'
+
+    # Cross-product matrices.
+    zero = numpy.zeros(len(u))
+    cpm = numpy.array([
+        [zero, -u[:, 2], u[:, 1]],
+        [u[:, 2], zero, -u[:, 0]],
+        [-u[:, 1], u[:, 0], zero],
+        ]).transpose(2, 0, 1)
+    c = numpy.cos(theta)[:, None, None]
+    s = numpy.sin(theta)[:, None, None]
+    return numpy.eye(3) * c \
+        + s * cpm \
+        + (1.0 - c) * numpy.einsum('ij,ik->ijk', u, u)
+
+
+class Transform(object):
+    '''Affine transformation
+
+    .. math::
+        \\hat{x} = R x + x_0.
+
+    Transformations are composed with `*`, `(a * b).apply(x)` being
+    `a.apply(b.apply(x))`, and applied to whole arrays of coordinates at once.
+    '''
+    def __init__(self, R=None, x0=None):
+        self.R = numpy.eye(3) if R is None else numpy.array(R, dtype=float)
+        self.x0 = numpy.zeros(3) if x0 is None \
+            else numpy.array(x0, dtype=float)
+        assert self.R.shape == (3, 3)
+        assert self.x0.shape == (3,)
+        return
+
+    @classmethod
+    def translation(cls, vector):
+        return cls(x0=vector)
+
+    @classmethod
+    def rotation(cls, axis, angle, point_on_axis=None):
+        '''Rotation around `axis` (through `point_on_axis`, default: origin) by
+        `angle`.
+        '''
+        return cls.rotations([axis], [angle], point_on_axis)[0]
+
+    @classmethod
+    def rotations(cls, axes, angles, point_on_axis=None):
+        '''List of rotations for many pairs of axes and angles; the matrices
+        are computed in one vectorized operation.
+        '''
+        axes = numpy.asarray(axes, dtype=float).reshape(-1, 3)
+        axes = axes / numpy.sqrt(numpy.einsum('ij,ij->i', axes, axes))[:, None]
+        Rs = _rotation_matrices(axes, angles)
+        if point_on_axis is None:
+            return [cls(R) for R in Rs]
+        p = numpy.asarray(point_on_axis, dtype=float)
+        # x -> R (x - p) + p
+        x0s = p - numpy.dot(Rs, p)
+        return [cls(R, x0) for R, x0 in zip(Rs, x0s)]
+
+    @classmethod
+    def scaling(cls, factor, center=None):
+        '''Uniform scaling by `factor` around `center` (default: origin).
+        '''
+        R = factor * numpy.eye(3)
+        if center is None:
+            return cls(R)
+        c = numpy.asarray(center, dtype=float)
+        return cls(R, c - factor * c)
+
+    def __mul__(self, other):
+        return Transform(
+            numpy.dot(self.R, other.R),
+            numpy.dot(self.R, other.x0) + self.x0
+            )
+
+    def inverse(self):
+        Rinv = numpy.linalg.inv(self.R)
+        return Transform(Rinv, -numpy.dot(Rinv, self.x0))
+
+    def apply(self, X):
+        '''Applies the transformation to a point or an `(n, 3)` array of
+        points.
+        '''
+        return numpy.dot(numpy.asarray(X), self.R.T) + self.x0
+
+    def apply_linear(self, X):
+        '''Applies only the linear part, e.g., to direction vectors.
+        '''
+        return numpy.dot(numpy.asarray(X), self.R.T)
+
+    def is_rigid(self, tol=1.0e-12):
+        return numpy.allclose(numpy.dot(self.R.T, self.R), numpy.eye(3),
+                              atol=tol) \
+            and numpy.linalg.det(self.R) > 0.0
+
+    def axis_angle(self):
+        '''Axis and angle of the rotation part of a rigid transformation.
+        '''
+        assert self.is_rigid()
+        R = self.R
+        cos_angle = numpy.clip(0.5 * (numpy.trace(R) - 1.0), -1.0, 1.0)
+        angle = numpy.arccos(cos_angle)
+        axis = numpy.array([
+            R[2, 1] - R[1, 2], R[0, 2] - R[2, 0], R[1, 0] - R[0, 1]
+            ])
+        norm = numpy.sqrt(numpy.dot(axis, axis))
+        if norm > 1.0e-10:
+            return axis / norm, angle
+        if cos_angle > 0.0:
+            # identity
+            return numpy.array([0.0, 0.0, 1.0]), 0.0
+        # rotation by pi: R = 2 u u^T - I
+        B = 0.5 * (R + numpy.eye(3))
+        k = numpy.argmax(numpy.diag(B))
+        axis = B[:, k] / numpy.sqrt(B[k, k])
+        return axis / numpy.sqrt(numpy.dot(axis, axis)), numpy.pi
+
+    def gmsh_transformation(self):
+        '''The transformation as one Gmsh transformation, as needed by
+        `Periodic` constraints: `Translate`, `Rotate` (rotations around an
+        axis through a point), or `Affine`.
+        '''
+        def fmt(x):
+            return ','.join([repr(float(xi)) for xi in x])
+
+        if numpy.allclose(self.R, numpy.eye(3)):
+            return 'Translate {{{}}}'.format(fmt(self.x0))
+
+        if self.is_rigid():
+            axis, angle = self.axis_angle()
+            # x0 = (I - R) p for a point p on the axis?
+            p = numpy.linalg.lstsq(
+                numpy.eye(3) - self.R, self.x0, rcond=None
+                )[0]
+            if numpy.allclose(p - numpy.dot(self.R, p), self.x0):
+                return 'Rotate {{{{{}}}, {{{}}}, {!r}}}'.format(
+                    fmt(axis), fmt(p), float(angle)
+                    )
+
+        return 'Affine {{{}}}'.format(
+            fmt(numpy.column_stack([self.R, self.x0]).flatten())
+            )
+
+    def gmsh_code(self, code):
+        '''Wraps the Gmsh transform-list `code` (e.g., a `Duplicata{...}`)
+        into the Gmsh transformations that implement this transformation.
+        Rigid transformations are expressed by `Rotate` and `Translate`,
+        uniform scalings by `Dilate`, everything else by `Affine` (Gmsh 4).
+        '''
+        def fmt(x):
+            return ','.join([repr(float(xi)) for xi in x])
+
+        if self.is_rigid():
+            axis, angle = self.axis_angle()
+            if angle != 0.0:
+                code = 'Rotate {{{{{}}}, {{0.0,0.0,0.0}}, {!r}}} {{ {} }}' \
+                    .format(fmt(axis), float(angle), code)
+        else:
+            factor = self.R[0, 0]
+            if numpy.allclose(self.R, factor * numpy.eye(3)):
+                code = 'Dilate {{{{0.0,0.0,0.0}}, {!r}}} {{ {} }}'.format(
+                    float(factor), code
+                    )
+            else:
+                return 'Affine {{{}}} {{ {} }}'.format(
+                    fmt(numpy.column_stack([self.R, self.x0]).flatten()),
+                    code
+                    )
+        if numpy.any(self.x0 != 0.0):
+            code = 'Translate {{{}}} {{ {} }}'.format(fmt(self.x0), code)
+        return code
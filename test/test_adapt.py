@@ -0,0 +1,69 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import shutil
+import tempfile
+
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test_sizes():
+    sizes = numpy.full(4, 0.1)
+    errors = numpy.array([1.0, 1.0, 4.0, 0.25])
+    new = pygmsh.adapt.new_sizes(sizes, errors, 2, order=2, target_error=2.0)
+    # cell error 1.0 is the target
+    assert numpy.allclose(new, [0.1, 0.1, 0.05, 0.2])
+
+    # budget
+    new = pygmsh.adapt.new_sizes(
+        sizes, errors, 2, order=2, target_error=2.0, max_num_cells=4
+        )
+    assert abs(numpy.sum((sizes / new)**2) - 4.0) < 1.0e-12
+
+    points = numpy.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]])
+    h = pygmsh.adapt.cell_sizes(points, numpy.array([[0, 1, 2]]))
+    assert abs(h[0] - (2.0 + numpy.sqrt(2.0)) / 3.0) < 1.0e-14
+    return
+
+
+def _errors(mesh):
+    # error concentrated around the origin
+    points, cells = mesh[0], mesh[1]['triangle']
+    h = pygmsh.adapt.cell_sizes(points, cells)
+    midpoints = numpy.mean(points[cells], axis=1)
+    r = numpy.sqrt(numpy.einsum('ij,ij->i', midpoints, midpoints))
+    return h**2 / (0.01 + r)
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+
+    cache_dir = tempfile.mkdtemp()
+    mesh = pygmsh.adapt_mesh(
+        geom, _errors, max_num_cells=2000, order=2, max_steps=3,
+        cache_dir=cache_dir
+        )
+    # A restart resumes from the cache.
+    mesh2 = pygmsh.adapt_mesh(
+        geom, None, max_num_cells=2000, order=2, max_steps=3,
+        cache_dir=cache_dir
+        )
+    shutil.rmtree(cache_dir)
+    assert numpy.all(mesh[0] == mesh2[0])
+    # The steps don't lock the points of the geometry.
+    geom.set_lcar_from_feature_size()
+
+    points, cells = mesh[0], mesh[1]
+    assert len(cells['triangle']) < 4000
+    ref = 1.0
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('adapted.vtu', *test())
@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test_write():
+    x = numpy.linspace(0.0, 1.0, 3)
+    y = numpy.linspace(0.0, 2.0, 4)
+    values = numpy.add.outer(x, y)
+    cell_type, X, v = pygmsh.post_view.grid_cells([x, y], values)
+    assert cell_type == 'quad'
+    assert X.shape == (6, 4, 3)
+    # nodal values are x + y
+    assert numpy.allclose(v, X[..., 0] + X[..., 1])
+
+    with tempfile.NamedTemporaryFile(suffix='.pos') as f:
+        filename = f.name
+    pygmsh.post_view.write_pos(filename, cell_type, X, v)
+    with open(filename, 'rb') as f:
+        content = f.read()
+    os.remove(filename)
+
+    header = b'$PostFormat\n1.4 1 8\n$EndPostFormat\n$View\nvalues 1 '
+    assert content.startswith(header)
+    assert content.endswith(b'\n$EndView\n')
+    start = content.index(b'\n', len(header)) + 1
+    assert numpy.frombuffer(content[start:start+4], dtype=numpy.int32) == 1
+    data = numpy.frombuffer(content[start+4:-len(b'\n$EndView\n')])
+    # time step, then 4*3 coordinates and 4 values per cell
+    assert len(data) == 1 + 6 * 16
+    assert numpy.allclose(data[1:].reshape(6, 16)[:, 12:], v)
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+
+    # finer towards x = 0
+    x = numpy.linspace(-0.1, 1.1, 25)
+    y = numpy.linspace(-0.1, 1.1, 25)
+    X, _ = numpy.meshgrid(x, y, indexing='ij')
+    tmp_dir = tempfile.mkdtemp()
+    filename = os.path.join(tmp_dir, 'lcar.pos')
+    geom.add_background_mesh_from_array(
+        0.01 + 0.1 * abs(X), axes=[x, y], filename=filename
+        )
+    # The code doesn't depend on random file names.
+    assert 'Merge "{}";'.format(filename) in geom.get_code()
+
+    ref = 1.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    shutil.rmtree(tmp_dir)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('background_mesh.vtu', *test())
@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import hashlib
+
+import pytest
+
+import pygmsh
+
+
+def _sha1(code):
+    return hashlib.sha1(code.encode('utf-8')).hexdigest()
+
+
+def _join(statements):
+    return '\n'.join([
+        s if isinstance(s, str) else s.code for s in statements
+        ])
+
+
+# pylint: disable=protected-access
+def test():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_circle([0.0, 0.0, 0.0], 1.0, 0.1)
+
+    code = geom.get_code()
+    assert code == _join(geom._GMSH_CODE)
+    # Unchanged geometry: the very same object is returned.
+    assert geom.get_code() is code
+    assert geom.get_code_hash() == _sha1(code)
+
+    # Appending only extends the cache.
+    geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, 0.1)
+    new_code = geom.get_code()
+    assert new_code.startswith(code + '\n')
+    assert new_code == _join(geom._GMSH_CODE)
+    assert geom.get_code_hash() == _sha1(new_code)
+
+    # Any other modification invalidates the cache.
+    geom._GMSH_CODE.pop()
+    assert geom.get_code() == _join(geom._GMSH_CODE)
+    assert geom.get_code_hash() == _sha1(geom.get_code())
+
+    geom._GMSH_CODE[-1] = '// replaced'
+    assert geom.get_code().endswith('\n// replaced')
+    return
+
+
+def test_merge_lcar():
+    geom = pygmsh.built_in.Geometry(merge_tolerance=1.0e-10)
+    p = geom.add_point([0.0, 0.0, 0.0], 0.1)
+    geom.get_code()
+    geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, 0.1)
+    geom.get_code()
+    q = geom.add_point([4.0, 0.0, 0.0], 0.1)
+    code = geom.get_code()
+
+    # A smaller size changes the code of the merged point; only the chunk
+    # of the point is joined again.
+    assert geom.add_point([4.0, 0.0, 0.0], 0.05) is q
+    assert len(geom._code_cache_chunks) == 2
+    assert geom.get_code() == _join(geom._GMSH_CODE)
+    assert geom.get_code() == code.replace(
+        'Point({}) = {{4.0, 0.0, 0.0, 0.1}}'.format(q.id),
+        'Point({}) = {{4.0, 0.0, 0.0, 0.05}}'.format(q.id)
+        )
+    assert geom.get_code_hash() == _sha1(geom.get_code())
+
+    # Points shared with forks can't be changed.
+    fork = geom.fork()
+    fork.add_point([1.0, 1.0, 0.0], 0.1)
+    with pytest.raises(AssertionError):
+        fork.add_point([0.0, 0.0, 0.0], 0.05)
+    assert p.lcar == 0.1
+    return
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,48 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    x = numpy.array([0.0, 0.0, 0.0])
+    poly = geom.add_polygon([
+        x,
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        ], lcar=0.1)
+
+    # Entities don't carry a __dict__ ...
+    entities = [
+        poly.line_loop, poly.surface,
+        poly.line_loop.lines[0], poly.line_loop.lines[0].points[0],
+        -poly.line_loop.lines[0],
+        ]
+    for e in entities:
+        assert not hasattr(e, '__dict__')
+
+    # ... and their code is only generated when the geometry is written out,
+    # from a copy of the input.
+    x[0] = 5.0
+    code = geom.get_code()
+    assert 'Point(p' in code
+    assert '5.0' not in code
+    # The coordinates are still arrays.
+    point = poly.line_loop.lines[0].points[0]
+    assert isinstance(point.x, numpy.ndarray)
+    assert numpy.all(point.x == 0.0)
+
+    occ = pygmsh.opencascade.Geometry()
+    x0 = numpy.array([0.0, 0.0, 0.0])
+    box = occ.add_box(x0, [1.0, 1.0, 1.0], char_length=0.1)
+    assert not hasattr(box, '__dict__')
+    x0[0] = 5.0
+    assert box.code in occ.get_code()
+    assert '5.0' not in occ.get_code()
+    return
+
+
+if __name__ == '__main__':
+    test()
@@ -0,0 +1,130 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import math
+
+import pygmsh
+
+
+def test_measures():
+    # unit square: 4/sqrt(3) equilateral triangles of edge length lcar per
+    # lcar**2
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    estimate = pygmsh.estimate_mesh_size(geom, dim=2)
+    assert estimate.num_cells['line'] == 40
+    assert estimate.num_cells['triangle'] == 231
+    assert 'tetra' not in estimate.num_cells
+    assert not estimate.unknown
+
+    # The volume of the built-in ball is computed from its surfaces.
+    geom = pygmsh.built_in.Geometry()
+    geom.add_ball([0.0, 0.0, 0.0], 1.0, lcar=0.1)
+    ball = pygmsh.estimate_mesh_size(geom)
+    geom = pygmsh.opencascade.Geometry()
+    geom.add_ball([0.0, 0.0, 0.0], 1.0, char_length=0.1)
+    ref = pygmsh.estimate_mesh_size(geom)
+    assert abs(ref.num_cells['tetra'] - 4.0 / 3.0 * math.pi * 8485) < 10
+    assert abs(ball.num_cells['tetra'] - ref.num_cells['tetra']) \
+        < 1.0e-2 * ref.num_cells['tetra']
+
+    # Boolean operations (the tools of differences are assumed to be inside)
+    geom = pygmsh.opencascade.Geometry(
+        characteristic_length_min=0.1,
+        characteristic_length_max=0.1,
+        )
+    rectangle = geom.add_rectangle([-1.0, -1.0, 0.0], 2.0, 2.0)
+    disk_w = geom.add_disk([-0.5, 0.0, 0.0], 0.25)
+    disk_e = geom.add_disk([+0.5, 0.0, 0.0], 0.25)
+    geom.boolean_difference([rectangle], [disk_w, disk_e])
+    estimate = pygmsh.estimate_mesh_size(geom, dim=2)
+    ref = (4.0 - 0.125 * math.pi) * 4.0 / math.sqrt(3.0) / 0.01
+    assert abs(estimate.num_cells['triangle'] - ref) < 1.0
+    return
+
+
+def test_size_fields():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    coarse = pygmsh.estimate_mesh_size(geom, dim=2)
+
+    # half the size in the left half: about 2.5 times the cells
+    field = geom.add_box_field([0.0, 0.0, 0.0], [0.5, 1.0, 0.0], 0.05, 1.0)
+    geom.add_background_field([field])
+    fine = pygmsh.estimate_mesh_size(geom, dim=2)
+    ratio = float(fine.num_cells['triangle']) / coarse.num_cells['triangle']
+    assert 2.3 < ratio < 2.7
+    assert fine.num_nodes > coarse.num_nodes
+
+    # Expressions are evaluated without eval().
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    geom.add_background_field([geom.add_math_eval_field('0.1 - 0.05*x')])
+    ref = fine.num_cells['triangle']
+    estimate = pygmsh.estimate_mesh_size(geom, dim=2)
+    assert 0.8 * ref < estimate.num_cells['triangle'] < 1.2 * ref
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    geom.add_background_field([
+        geom.add_math_eval_field('__import__("os").getpid()')
+        ])
+    assert pygmsh.estimate_mesh_size(geom, dim=2) == coarse
+    return
+
+
+def test_commands():
+    # extrusions and patterns are followed
+    geom = pygmsh.built_in.Geometry()
+    square = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    geom.extrude(square.surface, [0.0, 0.0, 2.0])
+    geom.add_grid_pattern(square.surface, [[2.0, 0.0, 0.0]], [3])
+    estimate = pygmsh.estimate_mesh_size(geom)
+    ref = pygmsh.estimate_mesh_size(geom, dim=2).num_cells['triangle']
+    assert abs(estimate.num_cells['tetra'] - 2.0 * 6.0 * math.sqrt(2.0)
+               / 0.1**3) < 0.1 * estimate.num_cells['tetra']
+    single = pygmsh.built_in.Geometry()
+    single.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    single = pygmsh.estimate_mesh_size(single, dim=2).num_cells['triangle']
+    # the square, its top, and the two copies
+    assert ref == 4 * single
+    return
+
+
+def test_scale_to_target():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+
+    # a model of Gmsh with 1.5 times the predicted boundary cells
+    runs = []
+
+    def mesh(dim, factor):
+        runs.append(dim)
+        return {1: 60.0, 2: 520.0}[dim] * factor**(-dim)
+
+    factor = pygmsh.estimate.scale_to_target(geom, 2, 2000, mesh)
+    assert runs == [1, 2]
+    assert abs(mesh(2, factor) - 2000) < 0.2 * 2000
+
+    # repeated request: one run, right on target
+    runs = []
+    factor = pygmsh.estimate.scale_to_target(geom, 2, 8000, mesh)
+    assert runs == [2]
+    assert abs(mesh(2, factor) - 8000) < 1.0e-6
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    geom.add_ball([0.0, 0.0, 0.0], 1.0, lcar=0.1)
+    estimate = pygmsh.estimate_mesh_size(geom)
+
+    _, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    ratio = float(len(cells['tetra'])) / estimate.num_cells['tetra']
+    assert 0.5 < ratio < 2.0
+
+    _, cells, _, _, _ = pygmsh.generate_mesh(geom, target_num_cells=20000)
+    assert abs(len(cells['tetra']) - 20000) < 0.3 * 20000
+    return
+
+
+if __name__ == '__main__':
+    test()
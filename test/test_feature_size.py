@@ -0,0 +1,112 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test_lcar():
+    geom = pygmsh.built_in.Geometry()
+    # a thin slit in a large square, all with the size needed at the slit
+    slit = geom.add_polygon([
+        [4.0, 4.99, 0.0],
+        [6.0, 4.99, 0.0],
+        [6.0, 5.01, 0.0],
+        [4.0, 5.01, 0.0],
+        ], lcar=0.01, make_surface=False)
+    square = geom.add_polygon([
+        [0.0, 0.0, 0.0],
+        [10.0, 0.0, 0.0],
+        [10.0, 10.0, 0.0],
+        [0.0, 10.0, 0.0],
+        ], lcar=0.01, holes=[slit])
+
+    code = geom.get_code()
+    geom.set_lcar_from_feature_size(num_cells_across=2, growth_rate=1.3)
+    assert geom.get_code() != code
+
+    # The slit is 0.02 wide: one cell of 0.01 each across.
+    for p in slit.line_loop.lines[0].points:
+        assert abs(p.lcar - 0.01) < 1.0e-12
+    # The corners of the square are 5 away from the slit and get larger
+    # sizes, but no larger than half the distance (about 6.4).
+    corners = square.line_loop.lines[0].points
+    for p in corners:
+        assert 1.0 < p.lcar <= 3.2
+
+    # Repeated calls don't change the sizes any further.
+    sizes = [p.lcar for p in corners]
+    geom.set_lcar_from_feature_size(num_cells_across=2, growth_rate=1.3)
+    assert numpy.allclose([p.lcar for p in corners], sizes)
+    return
+
+
+def test_parameter():
+    geom = pygmsh.built_in.Geometry()
+    h = geom.parameter('h', 0.01)
+    slit = geom.add_polygon([
+        [4.0, 4.99, 0.0],
+        [6.0, 4.99, 0.0],
+        [6.0, 5.01, 0.0],
+        [4.0, 5.01, 0.0],
+        ], lcar=h, make_surface=False)
+    geom.add_polygon([
+        [0.0, 0.0, 0.0],
+        [10.0, 0.0, 0.0],
+        [10.0, 10.0, 0.0],
+        [0.0, 10.0, 0.0],
+        ], lcar=h, holes=[slit])
+    geom.set_lcar_from_feature_size(num_cells_across=2, growth_rate=1.3)
+
+    # The sizes at the slit are unchanged and still written as `h`.
+    for p in slit.line_loop.lines[0].points:
+        assert p.lcar is h
+    assert 'Point({}) = {{4.0, 4.99, 0.0, h}};'.format(
+        slit.line_loop.lines[0].points[0].id
+        ) in geom.get_code()
+    return
+
+
+def test_graded_sizes():
+    # sizes limited along the edges, as with repeated relaxation
+    numpy.random.seed(0)
+    X = numpy.random.rand(50, 3)
+    sizes = numpy.random.rand(50)
+    sizes[::4] = numpy.inf
+    edges = numpy.random.randint(0, 50, size=(120, 2))
+    graded = pygmsh.built_in.feature_size.graded_sizes(X, sizes, edges, 1.3)
+
+    slope = 0.3 * numpy.sqrt(
+        numpy.sum((X[edges[:, 0]] - X[edges[:, 1]])**2, axis=1)
+        )
+    ref = sizes.copy()
+    for _ in range(len(ref)):
+        numpy.minimum.at(ref, edges[:, 1], ref[edges[:, 0]] + slope)
+        numpy.minimum.at(ref, edges[:, 0], ref[edges[:, 1]] + slope)
+    assert numpy.allclose(graded, ref)
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    circle = geom.add_circle(
+        [0.0, 0.0, 0.0], 0.1, lcar=0.005, make_surface=False
+        )
+    geom.add_rectangle(
+        -1.0, 1.0, -1.0, 1.0, 0.0, lcar=0.005, holes=[circle]
+        )
+    geom.set_lcar_from_feature_size()
+
+    ref = 4.0 - numpy.pi * 0.01
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    # much fewer cells than with the uniform size
+    assert len(cells['triangle']) < 20000
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('feature_size.vtu', *test())
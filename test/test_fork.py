@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test_code():
+    cache_dir = tempfile.mkdtemp()
+    try:
+        base = pygmsh.built_in.Geometry()
+        base.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+
+        a = base.fork(cache_dir=cache_dir)
+        b = base.fork(cache_dir=cache_dir)
+        pa = a.add_point([0.5, 0.5, 0.0], lcar=0.1)
+        pb = b.add_point([0.5, 0.5, 0.0], lcar=0.1)
+        assert pa.id != pb.id
+
+        # The base is written once, when the code is emitted, and included.
+        assert not os.listdir(cache_dir)
+        codes = [a.get_code(), b.get_code()]
+        files = os.listdir(cache_dir)
+        assert len(files) == 1
+        include = 'Include "{}";'.format(os.path.join(cache_dir, files[0]))
+        for code, p in zip(codes, [pa, pb]):
+            assert code.startswith(include + '\n')
+            assert p.id in code
+            assert 'Plane Surface' not in code
+        with open(os.path.join(cache_dir, files[0])) as f:
+            assert f.read() == base.get_code()
+        assert pa.id not in base.get_code()
+        assert a.get_code_hash() != b.get_code_hash()
+
+        # A removed file is written again.
+        os.remove(os.path.join(cache_dir, files[0]))
+        assert a.get_code() == codes[0]
+        assert os.listdir(cache_dir) == files
+
+        # Forks of forks include the fork.
+        c = a.fork(cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+        c.get_code()
+        assert len(os.listdir(cache_dir)) == 2
+
+        # If the statements don't start with the shared ones anymore (here,
+        # the point moves up to the others), the code is written out in full.
+        a.optimize(eliminate_unused=False)
+        assert 'Plane Surface' in a.get_code()
+    finally:
+        shutil.rmtree(cache_dir)
+
+    # Without a cache directory, the code of the fork is self-contained.
+    d = base.fork()
+    pd = d.add_point([0.5, 0.5, 0.0], lcar=0.1)
+    assert d.get_code() == base.get_code() + '\n' + pd.code
+    return
+
+
+def test():
+    base = pygmsh.built_in.Geometry()
+    base.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, lcar=0.1)
+    for x in [0.0, 1.0]:
+        geom = base.fork()
+        geom.add_rectangle(x, x + 1.0, 1.0, 2.0, 0.0, lcar=0.1)
+        points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+        assert abs(compute_volume(points, cells) - 2.0) < 1.0e-10
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('fork.vtu', *test())
@@ -0,0 +1,74 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _plate(x0):
+    geom = pygmsh.built_in.Geometry()
+    r = geom.parameter('r', 0.1)
+    circle = geom.add_circle([x0 + 0.5, 0.5, 0.0], r, 0.05, make_surface=False)
+    rectangle = geom.add_rectangle(
+        x0, x0 + 1.0, 0.0, 1.0, 0.0, 0.05, holes=[circle.line_loop]
+        )
+    geom.add_physical_surface(rectangle.surface, label='plate')
+    geom.add_physical_line(circle.line_loop.lines)
+    _, volume, _ = geom.extrude(rectangle.surface, [0.0, 0.0, 0.3])
+    geom.add_physical_volume(volume)
+    field = geom.add_box_field(
+        [x0, 0.0, 0.0], [x0 + 1.0, 1.0, 1.0], 0.02, 0.1
+        )
+    geom.add_background_field([field])
+    return geom, rectangle
+
+
+def test_code():
+    geom, rectangle = _plate(0.0)
+    other, other_rectangle = _plate(2.0)
+    other_code = other.get_code()
+
+    handles = geom.include(
+        other, transform=pygmsh.Transform.translation([0.0, 0.0, 1.0])
+        )
+    code = geom.get_code()
+    assert other.get_code() == other_code
+
+    # new ids and names
+    surface = handles[other_rectangle.surface.id]
+    assert surface.id != rectangle.surface.id
+    assert 'Plane Surface({})'.format(surface.id) in code
+    assert handles['ex1'] == 'ex2'
+    assert 'Physical Volume(6) = {ex2[1]};' in code
+    assert 'Physical Line(5) = {' in code
+    assert code.count('Physical Surface("plate")') == 2
+    # The background fields are combined.
+    assert 'Field[field5] = Min;\n' \
+        'Field[field5].FieldsList = {field2, field4};\n' \
+        'Background Field = field5;' in code
+    assert 'Background Field = field4;' not in code
+    # the parameter is shared
+    assert code.count('DefineConstant[ r = 0.1 ];') == 1
+
+    # The points are transformed.
+    point = handles[other_rectangle.line_loop.lines[0].points[0].id]
+    assert 'Point({}) = {{2.0, 0.0, 1.0, 0.05}};'.format(point.id) in code
+    # ... with the parameters in their coordinates
+    point = handles[other_rectangle.surface.holes[0].lines[0].start.id]
+    assert 'Point({}) = {{(((r * 1.0) + 2.5) + 0.0), '.format(point.id) \
+        in code
+    return
+
+
+def test():
+    geom, _ = _plate(0.0)
+    geom.include(_plate(2.0)[0])
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    ref = 2 * 0.3 * (1.0 - 3.14159265359 * 0.1**2)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('include.vtu', *test())
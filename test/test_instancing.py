@@ -0,0 +1,75 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _signed_areas(points, triangles):
+    e0 = points[triangles[:, 1]] - points[triangles[:, 0]]
+    e1 = points[triangles[:, 2]] - points[triangles[:, 0]]
+    return 0.5 * (e0[:, 0]*e1[:, 1] - e0[:, 1]*e1[:, 0])
+
+
+def test_instantiate():
+    # unit square
+    points = numpy.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        ])
+    cells = {'triangle': numpy.array([[0, 1, 2], [0, 2, 3]])}
+    cell_data = {'triangle': {'gmsh:physical': numpy.array([1, 1])}}
+    mesh = (points, cells, {}, cell_data, {'square': numpy.array([1, 2])})
+
+    reflection = pygmsh.Transform(numpy.diag([-1.0, 1.0, 1.0]))
+    transforms = [
+        pygmsh.Transform(),
+        pygmsh.Transform.translation([1.0, 0.0, 0.0]),
+        reflection,
+        ]
+    X, cells, _, cell_data, field_data = pygmsh.instantiate(mesh, transforms)
+    assert X.shape == (12, 3)
+    assert numpy.all(_signed_areas(X, cells['triangle']) > 0.0)
+    assert numpy.all(
+        cell_data['triangle']['instance'] == [0, 0, 1, 1, 2, 2]
+        )
+    assert numpy.all(cell_data['triangle']['gmsh:physical'] == 1)
+    assert 'square' in field_data
+    assert abs(numpy.sum(_signed_areas(X, cells['triangle'])) - 3.0) < 1.0e-14
+
+    # Shared edges are merged.
+    X, cells, _, _, _ = pygmsh.merge_meshes(
+        [(X, cells, {}, cell_data, field_data)], 1.0e-10
+        )
+    assert len(X) == 8
+    return
+
+
+def test():
+    prototype = pygmsh.built_in.Geometry()
+    prototype.add_circle([0.0, 0.0, 0.0], 0.5, 0.05)
+
+    rest = pygmsh.built_in.Geometry()
+    rest.add_rectangle(-1.0, 1.0, -1.0, -0.5, 0.0, 0.05)
+
+    transforms = [
+        pygmsh.Transform.translation([x, 0.0, 0.0])
+        for x in numpy.linspace(0.0, 10.0, 11)
+        ]
+    points, cells, _, cell_data, _ = pygmsh.generate_instanced_mesh(
+        prototype, transforms, geo_object=rest, tol=1.0e-10
+        )
+    assert set(cell_data['triangle']['instance']) == set(range(-1, 11))
+
+    ref = 11 * numpy.pi * 0.25 + 1.0
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('instances.vtu', *test())
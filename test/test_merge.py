@@ -0,0 +1,105 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+import pytest
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _square(x0, tag, name):
+    points = numpy.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.5, 0.5, 0.0],
+        ]) + x0
+    cells = {'triangle': numpy.array([
+        [0, 1, 4], [1, 2, 4], [2, 3, 4], [3, 0, 4]
+        ])}
+    cell_data = {'triangle': {'gmsh:physical': numpy.full(4, tag)}}
+    field_data = {} if name is None else {name: numpy.array([tag, 2])}
+    return points, cells, {}, cell_data, field_data
+
+
+def test_merge():
+    meshes = [
+        _square([0.0, 0.0, 0.0], 1, 'left'),
+        # slightly perturbed
+        _square([1.0 + 1.0e-12, 0.0, 0.0], 1, 'right'),
+        _square([2.0, 0.0, 0.0], 1, 'left'),
+        ]
+    points, cells, _, cell_data, field_data = \
+        pygmsh.merge_meshes(meshes, tol=1.0e-10)
+
+    assert len(points) == 15 - 4
+    assert len(cells['triangle']) == 12
+    # the interior points aren't merged
+    assert len(numpy.unique(cells['triangle'])) == 11
+
+    # physical groups
+    assert field_data['left'][0] == 1
+    assert field_data['right'][0] == 2
+    assert numpy.all(
+        cell_data['triangle']['gmsh:physical'] ==
+        numpy.repeat([1, 2, 1], 4)
+        )
+
+    # Tags without names don't collide either.
+    _, _, _, cell_data, field_data = pygmsh.merge_meshes([
+        _square([0.0, 0.0, 0.0], 1, None),
+        _square([1.0, 0.0, 0.0], 1, None),
+        _square([2.0, 0.0, 0.0], 2, 'right'),
+        ])
+    assert field_data['right'][0] == 3
+    assert numpy.all(
+        cell_data['triangle']['gmsh:physical'] ==
+        numpy.repeat([1, 2, 3], 4)
+        )
+
+    # A name can't have several dimensions.
+    line = (
+        numpy.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0]]),
+        {'line': numpy.array([[0, 1]])},
+        {},
+        {'line': {'gmsh:physical': numpy.array([1])}},
+        {'left': numpy.array([1, 1])},
+        )
+    with pytest.raises(AssertionError):
+        pygmsh.merge_meshes([_square([0.0, 0.0, 0.0], 1, 'left'), line])
+
+    # random points against brute force
+    X = numpy.random.rand(500, 3)
+    X = numpy.concatenate([X, X + 1.0e-3 * numpy.random.rand(500, 3)])
+    tol = 1.0e-3
+    # pylint: disable=protected-access
+    I, J = pygmsh.merge._coincident_pairs(X, tol)
+    dist = numpy.sqrt(((X[:, None] - X[None]) ** 2).sum(axis=2))
+    ref = set(zip(*numpy.nonzero(numpy.triu(dist < tol, 1))))
+    assert set(zip(I, J)) == ref
+    return
+
+
+def test():
+    lcar = 0.1
+    meshes = []
+    for k in range(3):
+        geom = pygmsh.built_in.Geometry()
+        geom.add_rectangle(k, k+1, 0.0, 1.0, 0.0, lcar)
+        # Make sure the discretizations of the interfaces match.
+        meshes.append(pygmsh.generate_mesh(geom, num_lloyd_steps=0))
+
+    points, cells, _, _, _ = pygmsh.merge_meshes(meshes, 1.0e-10)
+    n = numpy.sum([len(mesh[0]) for mesh in meshes])
+    assert len(points) < n
+
+    ref = 3.0
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('merged.vtu', *test())
@@ -0,0 +1,43 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test():
+    geom = pygmsh.built_in.Geometry(merge_tolerance=1.0e-10)
+
+    # Two squares sharing an edge; the shared corners and the shared edge are
+    # only created once.
+    left = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, 0.1)
+    right = geom.add_rectangle(1.0, 2.0, 0.0, 1.0, 0.0, 0.1)
+    assert right.line_loop.lines[3].id == '-' + left.line_loop.lines[1].id
+
+    # Repeated centers of circle arcs are merged, too.
+    center = geom.add_point([0.5, 2.0, 0.0], 0.1)
+    assert geom.add_point([0.5, 2.0 + 1.0e-12, 0.0], 0.1) is center
+
+    # The merged point keeps the smaller mesh size.
+    code = geom.get_code()
+    assert geom.add_point([0.5, 2.0, 0.0], 0.05) is center
+    assert geom.add_point([0.5, 2.0, 0.0], 0.2) is center
+    assert geom.add_point([0.5, 2.0, 0.0]) is center
+    assert center.lcar == 0.05
+    assert geom.get_code() == code.replace(
+        '{0.5, 2.0, 0.0, 0.1}', '{0.5, 2.0, 0.0, 0.05}'
+        )
+
+    code = geom.get_code()
+    assert code.count('newp;') == 7
+    assert code.count('newl;') == 7
+
+    ref = 2.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('merge_points.vtu', *test())
@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+
+    # A helper point, a polygon without surface, and a duplicated square are
+    # all removed or merged.
+    geom.add_point([5.0, 5.0, 0.0], 0.1)
+    geom.add_polygon([
+        [2.0, 0.0, 0.0],
+        [3.0, 0.0, 0.0],
+        [3.0, 1.0, 0.0],
+        ], 0.1, make_surface=False)
+    square = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, 0.1)
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, 0.1)
+    # Points used in physical groups are kept.
+    tip = geom.add_point([0.5, 0.5, 0.0], 0.1)
+    geom.add_physical_point(tip)
+    geom.add_raw_code('Point{{{}}} In Surface{{{}}};'.format(
+        tip.id, square.surface.id
+        ))
+
+    geom.optimize()
+
+    code = geom.get_code()
+    assert code.count('newp;') == 5
+    assert code.count('newl;') == 4
+    assert code.count('news;') == 1
+    # The first statements are points.
+    assert code.split('\n')[1:3] == [
+        '{} = newp;'.format(square.line_loop.lines[0].points[0].id),
+        'Point({}) = {{0.0, 0.0, 0.0, 0.1}};'.format(
+            square.line_loop.lines[0].points[0].id
+            ),
+        ]
+
+    ref = 1.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('optimize.vtu', *test())
@@ -0,0 +1,87 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _orientation(surface):
+    '''Sign and normal of the (oriented) plane surface `surface`.'''
+    sign = getattr(surface, 'sign', 1)
+    X = numpy.array([
+        line.points[0].x if getattr(line, 'sign', 1) > 0 else line.points[1].x
+        for line in surface.line_loop.lines
+        ])
+    return sign * numpy.cross(X, numpy.roll(X, -1, axis=0)).sum(axis=0)
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+
+    # The corners of the unit cube, corner k at the binary digits of k.
+    points = [
+        geom.add_point([k & 1, (k >> 1) & 1, (k >> 2) & 1], 0.2)
+        for k in range(8)
+        ]
+    lines = {}
+
+    def edge(a, b):
+        # Every edge is created once and referenced reversed otherwise.
+        if (b, a) in lines:
+            return -lines[(b, a)]
+        lines[(a, b)] = geom.add_line(points[a], points[b])
+        return lines[(a, b)]
+
+    def face(corners):
+        return geom.add_plane_surface(geom.add_line_loop([
+            edge(a, b) for a, b in zip(corners, corners[1:] + corners[:1])
+            ]))
+
+    # All faces with their normals in the positive axis direction; the ones
+    # at 0 then point into the cube and are used reversed.
+    lower = [face([0, 2, 6, 4]), face([0, 4, 5, 1]), face([0, 1, 3, 2])]
+    upper = [face([1, 3, 7, 5]), face([2, 6, 7, 3]), face([4, 5, 7, 6])]
+
+    # Reversing is cheap and doesn't copy the referenced entities.
+    line = lower[0].line_loop.lines[0]
+    assert (-line).points is line.points
+    assert (-line).id == '-' + line.id
+    assert -(-line) is line
+    assert (-lower[0]).line_loop is lower[0].line_loop
+    assert -(-lower[0]) is lower[0]
+
+    surfaces = [-s for s in lower] + upper
+    for k, s in enumerate(surfaces):
+        # outward normal
+        normal = numpy.zeros(3)
+        normal[k % 3] = 1.0 if k > 2 else -1.0
+        assert numpy.allclose(_orientation(s), 2 * normal)
+
+    # closed shell: every edge is passed once in each direction
+    directed = set(
+        (
+            getattr(line, 'target', line).id,
+            getattr(line, 'sign', 1) * getattr(s, 'sign', 1)
+        )
+        for s in surfaces for line in s.line_loop.lines
+        )
+    assert len(directed) == 24
+
+    surface_loop = geom.add_surface_loop(surfaces)
+    assert surface_loop.surfaces[0].num_edges == 4
+    assert 'Surface Loop({}) = {{-{},'.format(
+        surface_loop.id, lower[0].id
+        ) in surface_loop.code
+    geom.add_volume(surface_loop)
+
+    ref = 1.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('oriented_references.vtu', *test())
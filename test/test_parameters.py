@@ -0,0 +1,86 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pickle
+
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _hole_in_square(geom):
+    r = geom.parameter('r', 0.1)
+    lcar = geom.parameter('lcar', 0.02)
+    circle = geom.add_circle(
+        [0.5, 0.5, 0.0], r, lcar, num_sections=4, make_surface=False
+        )
+    geom.add_rectangle(
+        0.0, 1.0, 0.0, 1.0, 0.0, lcar, holes=[circle.line_loop]
+        )
+    return geom
+
+
+def test_code():
+    geom = pygmsh.built_in.Geometry()
+    r = geom.parameter('r', 0.5)
+    assert isinstance(r, float)
+    assert r == 0.5
+    assert repr(r) == 'r'
+
+    # arithmetic, also with NumPy
+    x = 2 * r + 1
+    assert x == 2.0
+    assert repr(x) == '((2 * r) + 1)'
+    assert repr(r**2) == '(r^2)'
+    assert repr(numpy.sqrt(r)) == 'Sqrt(r)'
+    X = numpy.array([1.0, 0.0]) * r
+    assert [repr(x) for x in X] == ['(1.0 * r)', '(0.0 * r)']
+    assert repr(pickle.loads(pickle.dumps(x))) == repr(x)
+
+    geom.add_point([r, 2 * r, 0.0], lcar=r / 10)
+    code = geom.get_code()
+    assert 'DefineConstant[ r = 0.5 ];' in code
+    assert '{r, (2 * r), 0.0, (r / 10)}' in code
+
+    # fields, also with NumPy scalars
+    line = geom.add_line(
+        geom.add_point([0.0, 0.0, 0.0]), geom.add_point([1.0, 0.0, 0.0])
+        )
+    geom.add_boundary_layer(
+        edges_list=[line], hfar=r, hwall_n=r / 100, ratio=numpy.float64(1.1)
+        )
+    code = geom.get_code()
+    assert '.hfar= r;' in code
+    assert '.hwall_n= (r / 100);' in code
+    assert '.ratio= 1.1;' in code
+
+    # The estimate uses the defaults.
+    geom = _hole_in_square(pygmsh.built_in.Geometry())
+    ref = pygmsh.built_in.Geometry()
+    circle = ref.add_circle(
+        [0.5, 0.5, 0.0], 0.1, 0.02, num_sections=4, make_surface=False
+        )
+    ref.add_rectangle(
+        0.0, 1.0, 0.0, 1.0, 0.0, 0.02, holes=[circle.line_loop]
+        )
+    assert pygmsh.estimate_mesh_size(geom) \
+        == pygmsh.estimate_mesh_size(ref)
+    return
+
+
+def test():
+    geom = _hole_in_square(pygmsh.built_in.Geometry())
+
+    for r in [0.1, 0.2, 0.3]:
+        points, cells, _, _, _ = pygmsh.generate_mesh(
+            geom, parameters={'r': r}
+            )
+        ref = 1.0 - numpy.pi * r**2
+        assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('parameters.vtu', *test())
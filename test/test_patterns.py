@@ -0,0 +1,57 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _grid(num):
+    geom = pygmsh.built_in.Geometry()
+    square = geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, 0.1)
+    copies = geom.add_grid_pattern(
+        square.surface, numpy.array([[2.0, 0.0, 0.0], [0.0, 2.0, 0.0]]),
+        [num, 2]
+        )
+    assert len(copies) == 2*num - 1
+    return geom
+
+
+def test():
+    # The copies are created in a loop, with the numbers written out plainly.
+    code = _grid(9).get_code()
+    assert code.count('Duplicata') == 1
+    assert 'For ar1_0 In {0:8}\nFor ar1_1 In {0:1}\n' in code
+    assert 'Translate {ar1_0*2.0 + ar1_1*0.0, ar1_0*0.0 + ar1_1*2.0, ' \
+        'ar1_0*0.0 + ar1_1*0.0} { Duplicata { Surface{' in code
+
+    geom = _grid(3)
+    ref = 6.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+def test_polar():
+    geom = pygmsh.built_in.Geometry()
+    square = geom.add_rectangle(1.0, 1.5, -0.25, 0.25, 0.0, 0.05)
+    geom.add_polar_pattern(
+        square.surface, [0.0, 0.0, 1.0], [0.0, 0.0, 0.0], 6
+        )
+    geom.add_pattern(square.surface, [{
+        'translation_axis': [0.0, 0.0, 1.0],
+        'rotation_axis': [0.0, 0.0, 1.0],
+        'point_on_axis': [0.0, 0.0, 0.0],
+        'angle': numpy.pi / 6,
+        }])
+
+    ref = 7 * 0.25
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('patterns.vtu', *test())
@@ -0,0 +1,79 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _unit_cell(lcar):
+    geom = pygmsh.built_in.Geometry()
+    poly = geom.add_polygon([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        ], lcar)
+    bottom, right, top, left = poly.line_loop.lines
+    geom.set_periodic_lines(
+        [top], [-bottom], pygmsh.Transform.translation([0.0, 1.0, 0.0])
+        )
+    geom.set_periodic_lines(
+        [right], [-left], pygmsh.Transform.translation([1.0, 0.0, 0.0])
+        )
+    return geom
+
+
+def test_tile():
+    # unit square with a midpoint
+    points = numpy.array([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        [0.5, 0.5, 0.0],
+        ])
+    cells = {'triangle': numpy.array([
+        [0, 1, 4], [1, 2, 4], [2, 3, 4], [3, 0, 4]
+        ])}
+    mesh = (points, cells, {}, {}, {})
+
+    X, cells, _, cell_data, _ = pygmsh.tile_periodic_mesh(
+        mesh, [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], [3, 2]
+        )
+    assert len(X) == 4 * 3 + 6
+    assert len(cells['triangle']) == 24
+    assert numpy.all(numpy.bincount(cell_data['triangle']['instance']) == 4)
+    # all points are distinct
+    assert len(numpy.unique(numpy.round(X, 10), axis=0)) == len(X)
+
+    code = _unit_cell(0.1).get_code()
+    assert 'Periodic Line' in code
+    assert '} Translate {0.0,1.0,0.0};' in code
+    return
+
+
+def test():
+    mesh = pygmsh.generate_mesh(_unit_cell(0.1), num_lloyd_steps=0)
+    periods = [[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]]
+    points, cells, _, _, _ = pygmsh.tile_periodic_mesh(mesh, periods, [4, 4])
+
+    # Same result as a geometric search
+    transforms = [
+        pygmsh.Transform.translation([i, j, 0.0])
+        for i in range(4) for j in range(4)
+        ]
+    ref_points, _, _, _, _ = pygmsh.merge_meshes(
+        [pygmsh.instantiate(mesh, transforms)], 1.0e-10
+        )
+    assert len(points) == len(ref_points)
+
+    ref = 16.0
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('tiles.vtu', *test())
@@ -0,0 +1,76 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _grains(geom, n):
+    return [
+        geom.add_rectangle(
+            float(i), i + 1.0, float(j), j + 1.0, 0.0, 0.5
+            ).surface
+        for i in range(n) for j in range(n)
+        ]
+
+
+def test_code():
+    geom = pygmsh.built_in.Geometry()
+    surfaces = _grains(geom, 2)
+    geom.add_physical_surface(surfaces[0], label=3)
+    num_statements = len(geom._GMSH_CODE)
+    tags = geom.add_physical_surfaces([
+        ('grain0', surfaces[1]),
+        (7, surfaces[2]),
+        ('grain1', surfaces[3]),
+        ])
+    assert tags == {'grain0': 4, 7: 7, 'grain1': 8}
+    # one statement for all groups
+    assert len(geom._GMSH_CODE) == num_statements + 1
+    code = geom.get_code()
+    assert 'Physical Surface("grain0", 4) = {{{}}};'.format(surfaces[1].id) \
+        in code
+    assert 'Physical Surface(7) = {{{}}};'.format(surfaces[2].id) in code
+
+    # The tags stay unique.
+    geom.add_physical_line(surfaces[0].line_loop.lines)
+    assert 'Physical Line(9)' in geom.get_code()
+    assert geom.add_physical_volumes({}) == {}
+
+    # many groups
+    geom = pygmsh.built_in.Geometry()
+    points = [geom.add_point([float(k), 0.0, 0.0]) for k in range(10000)]
+    tags = geom.add_physical_points({
+        'p{}'.format(k): p for k, p in enumerate(points)
+        })
+    assert sorted(tags.values()) == list(range(1, 10001))
+
+    # gmsh 2 doesn't take tags with names.
+    geom = pygmsh.built_in.Geometry(gmsh_major_version=2)
+    surface = _grains(geom, 1)[0]
+    geom.add_physical_surfaces({'grain': surface})
+    assert 'Physical Surface("grain") = ' in geom.get_code()
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    surfaces = _grains(geom, 3)
+    tags = geom.add_physical_surfaces({
+        'grain{}'.format(k): s for k, s in enumerate(surfaces)
+        })
+    points, cells, _, cell_data, field_data = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - 9.0) < 1.0e-10
+    physical = cell_data['triangle']['gmsh:physical']
+    assert set(physical) == set(tags.values())
+    for label, tag in tags.items():
+        assert field_data[label][0] == tag
+        assert numpy.any(physical == tag)
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('physical_groups.vtu', *test())
@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pickle
+
+import pygmsh
+from pygmsh.built_in.point import Point
+
+from helpers import compute_volume
+
+
+def _geometry():
+    geom = pygmsh.built_in.Geometry(merge_tolerance=1.0e-10)
+    r = geom.parameter('r', 0.1)
+    circle = geom.add_circle([0.5, 0.5, 0.0], r, 0.05, make_surface=False)
+    geom.add_rectangle(
+        0.0, 1.0, 0.0, 1.0, 0.0, 0.05, holes=[circle.line_loop]
+        )
+    geom.add_ball([3.0, 0.0, 0.0], 0.5, 0.1)
+    geom.add_box(5.0, 6.0, 0.0, 1.0, 0.0, 1.0, 0.1)
+    return geom
+
+
+def test_pickle():
+    geom = _geometry()
+    circle = geom.add_circle([0.0, 0.0, 2.0], 1.0, 0.1)
+    geom2, circle2 = pickle.loads(pickle.dumps((geom, circle)))
+    assert geom2.get_code() == geom.get_code()
+    assert circle2.line_loop.id == circle.line_loop.id
+    assert circle2.line_loop in geom2._GMSH_CODE
+    # reversed lines
+    line = pickle.loads(pickle.dumps(-circle.line_loop.lines[0]))
+    assert line.id == '-' + circle.line_loop.lines[0].id
+    return
+
+
+def test_bytes():
+    geom = _geometry()
+    data = geom.to_bytes()
+    assert len(data) < len(pickle.dumps(geom))
+
+    # as if loaded in a new process
+    Point._POINT_ID = 0
+    geom2 = pygmsh.built_in.Geometry.from_bytes(data)
+    assert type(geom2) is pygmsh.built_in.Geometry
+    assert geom2.get_code() == geom.get_code()
+    assert pygmsh.estimate_mesh_size(geom2) == pygmsh.estimate_mesh_size(geom)
+
+    # New entities get new ids, and the points are still merged.
+    code = geom.get_code()
+    p = geom2.add_point([0.25, 0.25, 0.0])
+    assert 'Point({})'.format(p.id) not in code
+    p = geom2.add_point([1.0, 0.0, 0.0])
+    assert 'Point({})'.format(p.id) in code
+
+    geom = pygmsh.opencascade.Geometry(characteristic_length_max=0.1)
+    ball = geom.add_ball([0.0, 0.0, 0.0], 1.0)
+    box = geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0])
+    geom.boolean_difference([ball], [box])
+    geom2 = pygmsh.opencascade.Geometry.from_bytes(geom.to_bytes())
+    assert type(geom2) is pygmsh.opencascade.Geometry
+    assert geom2.get_code() == geom.get_code()
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry.from_bytes(
+        pygmsh.built_in.Geometry().to_bytes()
+        )
+    geom.add_rectangle(0.0, 1.0, 0.0, 1.0, 0.0, 0.1)
+    geom = pygmsh.built_in.Geometry.from_bytes(geom.to_bytes())
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - 1.0) < 1.0e-10
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('serialization.vtu', *test())
@@ -0,0 +1,104 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _ellipse(n, a=1.0, b=0.3):
+    t = numpy.linspace(0.0, 2 * numpy.pi, n, endpoint=False)
+    return numpy.column_stack([a * numpy.cos(t), b * numpy.sin(t), 0 * t])
+
+
+def _deviation(X, idx, closed):
+    '''Largest distance of the points `X` to the polyline through the ones
+    with the indices `idx`.
+    '''
+    if closed:
+        X = numpy.concatenate([X, X[:1]])
+        idx = numpy.append(idx, len(X) - 1)
+    d = numpy.zeros(len(X))
+    for i, j in zip(idx[:-1], idx[1:]):
+        a, b = X[i], X[j]
+        t = numpy.clip(
+            numpy.dot(X[i:j+1] - a, b - a) / numpy.dot(b - a, b - a), 0, 1
+            )
+        d[i:j+1] = numpy.linalg.norm(
+            X[i:j+1] - a - numpy.outer(t, b - a), axis=1
+            )
+    return d.max()
+
+
+def test_simplify_polyline():
+    X = _ellipse(10000)
+    for closed in [False, True]:
+        for tol in [1.0e-2, 1.0e-4]:
+            idx = pygmsh.simplify_polyline(X, tol, closed=closed)
+            assert idx[0] == 0
+            assert closed or idx[-1] == len(X) - 1
+            assert len(idx) < len(X) // 20
+            assert _deviation(X, idx, closed) <= tol
+
+    # collinear points
+    X = numpy.column_stack([
+        numpy.linspace(0.0, 1.0, 11), numpy.zeros((11, 2))
+        ])
+    assert list(pygmsh.simplify_polyline(X, 1.0e-10)) == [0, 10]
+    assert len(pygmsh.simplify_polyline(_ellipse(4), 10.0, closed=True)) == 3
+    assert len(pygmsh.simplify_polyline(X, 1.0e-10, closed=True)) == 3
+    # coincident points
+    for n in [3, 4, 10]:
+        idx = pygmsh.simplify_polyline(numpy.ones((n, 3)), 1.0, closed=True)
+        assert list(idx) == [0, n // 3, 2 * n // 3]
+    return
+
+
+def test_code():
+    X = _ellipse(2000)
+    geom = pygmsh.built_in.Geometry()
+    polygon = geom.add_polygon(X, 0.1, max_deviation=1.0e-3)
+    assert 10 < len(polygon.line_loop.lines) < 100
+
+    # The dropped points are removed from the geometry.
+    geom = pygmsh.built_in.Geometry()
+    points = [geom.add_point(x, 0.1) for x in X]
+    spline = geom.add_spline(points + points[:1], max_deviation=1.0e-3)
+    assert spline.points[0] is spline.points[-1]
+    assert 10 < len(spline.points) < 100
+    assert geom.get_code().count('newp;') == len(spline.points) - 1
+
+    # ... unless something else references them.
+    geom = pygmsh.built_in.Geometry()
+    points = [geom.add_point(x, 0.1) for x in X[:1000]]
+    line = geom.add_line(points[1], points[2])
+    bspline = geom.add_bspline(points, max_deviation=1.0e-3)
+    assert bspline.control_points[0] is points[0]
+    assert bspline.control_points[-1] is points[999]
+    assert len(bspline.control_points) < 50
+    code = geom.get_code()
+    assert code.count('newp;') == len(bspline.control_points) + 2
+    assert 'Line({}) = {{{}, {}}};'.format(
+        line.id, points[1].id, points[2].id
+        ) in code
+    return
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    lcar = 0.05
+    points = [geom.add_point(x, lcar) for x in _ellipse(20000)]
+    spline = geom.add_spline(points + points[:1], max_deviation=1.0e-4)
+    geom.add_plane_surface(geom.add_line_loop([spline]))
+    geom.optimize()
+    ref = numpy.pi * 0.3
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    assert len(cells['triangle']) < 10 * ref / lcar**2
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('simplify.vtu', *test())
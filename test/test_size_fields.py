@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test():
+    geom = pygmsh.built_in.Geometry()
+    poly = geom.add_polygon([
+        [0.0, 0.0, 0.0],
+        [2.0, 0.0, 0.0],
+        [2.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        ], lcar=0.2)
+
+    # refine towards the bottom edge and one corner
+    distance = geom.add_distance_field(
+        nodes=[poly.line_loop.lines[2].points[0]],
+        edges=[poly.line_loop.lines[0]],
+        num_nodes_per_edge=100
+        )
+    threshold = geom.add_threshold_field(
+        distance, lcar_min=0.01, lcar_max=0.2, dist_min=0.05, dist_max=0.5
+        )
+    box = geom.add_box_field([0.5, 0.5, -1.0], [1.0, 1.0, 1.0], 0.05, 0.2)
+    ball = geom.add_ball_field([1.5, 0.5, 0.0], 0.2, 0.03, 0.2)
+    math_eval = geom.add_math_eval_field('0.05 + 0.1*x')
+    restricted = geom.add_restrict_field(
+        geom.add_min_field([math_eval, ball]), edges=[poly.line_loop.lines[1]]
+        )
+    geom.add_background_field([threshold, box, ball, restricted])
+
+    code = geom.get_code()
+    assert 'Field[{}] = Threshold;'.format(threshold) in code
+    assert 'Field[{}].F = "0.05 + 0.1*x";'.format(math_eval) in code
+
+    ref = 2.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+def test_opencascade():
+    geom = pygmsh.opencascade.Geometry()
+    geom.add_box([0.0, 0.0, 0.0], [1.0, 1.0, 1.0], char_length=0.2)
+    cylinder = geom.add_cylinder_field(
+        [0.5, 0.5, 0.5], [0.0, 0.0, 1.0], 0.2, 0.05, 0.2
+        )
+    geom.add_background_field([cylinder])
+
+    ref = 1.0
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('size_fields.vtu', *test())
@@ -0,0 +1,70 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+from pygmsh.spatial_index import bounding_box
+
+
+def test_bounding_boxes():
+    geom = pygmsh.built_in.Geometry()
+    circle = geom.add_circle([1.0, 2.0, 0.0], 0.5, 0.1)
+    lower, upper = bounding_box(circle.plane_surface)
+    assert numpy.allclose(lower, [0.5, 1.5, 0.0])
+    assert numpy.allclose(upper, [1.5, 2.5, 0.0])
+    # a single arc, from 0 to 120 degrees
+    lower, upper = bounding_box(circle.line_loop.lines[0])
+    assert numpy.allclose(lower, [0.75, 2.0, 0.0])
+    assert numpy.allclose(upper, [1.5, 2.5, 0.0])
+
+    ellipsoid = geom.add_ellipsoid([0.0, 0.0, 0.0], [1.0, 2.0, 3.0], 0.1)
+    lower, upper = bounding_box(ellipsoid.volume)
+    assert numpy.allclose(lower, [-1.0, -2.0, -3.0])
+    assert numpy.allclose(upper, [1.0, 2.0, 3.0])
+
+    geom = pygmsh.opencascade.Geometry()
+    cylinder = geom.add_cylinder([0.0, 0.0, 0.0], [0.0, 0.0, 2.0], 0.5)
+    lower, upper = bounding_box(cylinder)
+    assert numpy.allclose(lower, [-0.5, -0.5, -0.5])
+    assert numpy.allclose(upper, [0.5, 0.5, 2.5])
+    return
+
+
+def test_query():
+    geom = pygmsh.built_in.Geometry()
+    numpy.random.seed(0)
+    X = numpy.random.rand(2000, 3)
+    points = []
+    for k, x in enumerate(X):
+        points.append(geom.add_point(x))
+        # queries in between additions
+        if k % 500 == 0:
+            assert geom.nearest(x) is points[-1]
+
+    lower = numpy.array([0.2, 0.3, 0.4])
+    upper = numpy.array([0.4, 0.5, 0.6])
+    inside = numpy.all((lower <= X) & (X <= upper), axis=1)
+    found = geom.query_box(lower, upper)
+    assert found == [p for p, i in zip(points, inside) if i]
+
+    for x in numpy.random.rand(20, 3):
+        k = numpy.argmin(numpy.linalg.norm(X - x, axis=1))
+        assert geom.nearest(x) is points[k]
+
+    # by dimension
+    rectangle = geom.add_rectangle(2.0, 3.0, 0.0, 1.0, 0.0, 0.1)
+    found = geom.query_box([2.4, 0.4, -1.0], [2.6, 0.6, 1.0])
+    assert found == [rectangle.surface]
+    found = geom.query_box([1.9, 0.4, -1.0], [2.1, 0.6, 1.0], dim=1)
+    assert found == [rectangle.line_loop.lines[3]]
+    assert geom.nearest([10.0, 0.5, 0.0], dim=1) \
+        is rectangle.line_loop.lines[1]
+
+    # The index is rebuilt when the statements change.
+    geom.optimize()
+    assert geom.query_box(lower, upper) == []
+    return
+
+
+if __name__ == '__main__':
+    test_query()
@@ -0,0 +1,64 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import re
+
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def _quarter_disk(radius, lcar, symmetry):
+    geom = pygmsh.built_in.Geometry()
+    center = geom.add_point([0.0, 0.0, 0.0], lcar)
+    p0 = geom.add_point([radius, 0.0, 0.0], lcar)
+    p1 = geom.add_point([0.0, radius, 0.0], lcar)
+    cut0 = geom.add_line(center, p0)
+    arc = geom.add_circle_arc(p0, center, p1)
+    cut1 = geom.add_line(center, p1)
+    loop = geom.add_line_loop([cut0, arc, -cut1])
+    geom.add_plane_surface(loop)
+    if symmetry is not None:
+        symmetry.set_periodic(geom, [cut1], [cut0])
+    return geom
+
+
+def test_groups():
+    rotations = pygmsh.RotationalSymmetry(8).transforms()
+    assert len(rotations) == 8
+    assert numpy.allclose(
+        (rotations[3] * rotations[5]).R, numpy.eye(3)
+        )
+
+    mirrors = pygmsh.ReflectionSymmetry(
+        [[1.0, 0.0, 0.0], [0.0, 2.0, 0.0]], point=[1.0, 1.0, 0.0]
+        ).transforms()
+    assert len(mirrors) == 4
+    assert numpy.allclose(mirrors[-1].apply([0.0, 0.0, 0.0]), [2.0, 2.0, 0.0])
+
+    geom = _quarter_disk(1.0, 0.1, pygmsh.RotationalSymmetry(4))
+    assert re.search(r'Periodic Line {l\d+} = {l\d+} Rotate', geom.get_code())
+    return
+
+
+def test():
+    rotational = pygmsh.RotationalSymmetry(4)
+    points, cells, _, _, _ = pygmsh.generate_symmetric_mesh(
+        _quarter_disk(1.0, 0.1, rotational), rotational
+        )
+    ref = numpy.pi
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+
+    # The same disk from reflections
+    reflections = pygmsh.ReflectionSymmetry([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]])
+    points, cells, _, _, _ = pygmsh.generate_symmetric_mesh(
+        _quarter_disk(1.0, 0.1, None), reflections
+        )
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('disk.vtu', *test())
@@ -24,6 +24,22 @@ def test(lcar=1.):
     return points, cells
 
 
+def test_oriented():
+    geom = pygmsh.built_in.Geometry()
+    poly = geom.add_polygon([
+        [0., 0., 0.],
+        [1., 0., 0.],
+        [1., 1., 0.],
+        [0., 1., 0.]],
+        1.
+        )
+    # A reversed surface is meshed like the surface itself.
+    geom.set_transfinite_surface(-poly.surface, size=[11, 9])
+    assert geom.get_code().endswith(
+        'Transfinite Surface {{{}}};'.format(poly.surface.id)
+        )
+    return
+
 if __name__ == '__main__':
     import meshio
     meshio.write('transfinite.vtu', *test())
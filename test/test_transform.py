@@ -0,0 +1,78 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import numpy
+
+import pygmsh
+
+from helpers import compute_volume
+
+
+def test_rotations():
+    axes = numpy.random.rand(10, 3) - 0.5
+    angles = 2 * numpy.pi * numpy.random.rand(10)
+    transforms = pygmsh.Transform.rotations(axes, angles)
+    for axis, angle, t in zip(axes, angles, transforms):
+        u = axis / numpy.linalg.norm(axis)
+        assert numpy.allclose(t.R, pygmsh.rotation_matrix(u, angle))
+        u2, angle2 = t.axis_angle()
+        assert numpy.allclose(
+            pygmsh.rotation_matrix(u2, angle2), t.R
+            )
+
+    a = pygmsh.Transform.rotation([0.0, 0.0, 1.0], 0.5*numpy.pi, [1.0, 0, 0])
+    b = pygmsh.Transform.scaling(2.0) * pygmsh.Transform.translation([1, 2, 3])
+    X = numpy.random.rand(5, 3)
+    assert numpy.allclose((a * b).apply(X), a.apply(b.apply(X)))
+    assert numpy.allclose((a * b).inverse().apply((a * b).apply(X)), X)
+    assert numpy.allclose(a.apply([1.0, 1.0, 0.0]), [0.0, 0.0, 0.0])
+    return
+
+
+def test_centers():
+    R = pygmsh.rotation_matrix([1.0, 0.0, 0.0], 0.5*numpy.pi)
+
+    geom = pygmsh.built_in.Geometry()
+    circle = geom.add_circle([1.0, 2.0, 3.0], 0.5, 0.1, R=R)
+    center = circle.line_loop.lines[0].center
+    assert 'Point({}) = {{1.0, 2.0, 3.0, 0.1}};'.format(center.id) \
+        in center.code
+
+    # The circle of the torus is centered at x0 + R*[0, orad, 0].
+    geom = pygmsh.built_in.Geometry()
+    geom.add_torus(
+        irad=0.1, orad=1.0, lcar=0.1,
+        transform=pygmsh.Transform(R, [1.0, 2.0, 3.0])
+        )
+    assert '= {1.0, 2.0, 4.0, 0.1};' in geom.get_code()
+    return
+
+
+def test():
+    '''Same as test_tori, with the placements given as transformations.
+    '''
+    geom = pygmsh.built_in.Geometry()
+
+    R = numpy.array([
+        [1.0, 0.0, 0.0],
+        [0.0, 0.0, 1.0],
+        [0.0, 1.0, 0.0]
+        ])
+    geom.add_torus(
+        irad=0.05, orad=0.6, lcar=0.03,
+        transform=pygmsh.Transform(R, [0.0, 0.0, -1.0])
+        )
+    geom.add_torus(
+        irad=0.05, orad=0.6, lcar=0.03,
+        transform=pygmsh.Transform.translation([0.0, 0.0, 1.0]),
+        variant='extrude_circle'
+        )
+
+    ref = 0.06604540601899624
+    points, cells, _, _, _ = pygmsh.generate_mesh(geom)
+    assert abs(compute_volume(points, cells) - ref) < 1.0e-2 * ref
+    return points, cells
+
+
+if __name__ == '__main__':
+    import meshio
+    meshio.write('tori.vtu', *test())
@@ -0,0 +1,101 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+import pytest
+
+import pygmsh
+from pygmsh.built_in.point import Point
+
+
+def _square(geom, x0, y0, size, lcar=0.1):
+    return geom.add_rectangle(x0, x0 + size, y0, y0 + size, 0.0, lcar)
+
+
+def test_valid():
+    geom = pygmsh.built_in.Geometry()
+    circle = geom.add_circle(
+        [0.5, 0.5, 0.0], 0.49, 0.1, num_sections=3, make_surface=False
+        )
+    ellipse = geom.add_ellipsoid(
+        [2.0, 0.5, 0.0], [0.4, 0.2, 0.2], 0.1
+        )
+    geom.add_polygon([
+        [0.0, 0.0, 0.0],
+        [1.0, 0.0, 0.0],
+        [1.0, 1.0, 0.0],
+        [0.0, 1.0, 0.0],
+        ], 0.1, holes=[circle.line_loop])
+    # the outer loop is a circle, too
+    hole = _square(geom, 4.7, 0.7, 0.6).line_loop
+    geom.add_circle([5.0, 1.0, 0.0], 1.0, 0.1, holes=[hole])
+    geom.extrude(ellipse.surface_loop.surfaces[0], [0.0, 0.0, 1.0])
+    geom.validate()
+    pygmsh.built_in.Geometry().validate()
+    return
+
+
+def test_errors():
+    # undefined point
+    geom = pygmsh.built_in.Geometry()
+    p0 = geom.add_point([0.0, 0.0, 0.0])
+    geom.add_line(p0, Point([1.0, 0.0, 0.0]))
+    with pytest.raises(AssertionError) as e:
+        geom.validate()
+    assert 'isn\'t defined before' in str(e.value)
+
+    # open line loop
+    geom = pygmsh.built_in.Geometry()
+    p = [
+        geom.add_point(x)
+        for x in [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0]]
+        ]
+    lines = [geom.add_line(p[0], p[1]), geom.add_line(p[1], p[2])]
+    geom.add_line_loop(lines)
+    with pytest.raises(AssertionError) as e:
+        geom.validate()
+    assert 'isn\'t closed' in str(e.value)
+
+    # a line in the wrong orientation
+    for sign, valid in [(+1, False), (-1, True)]:
+        geom = pygmsh.built_in.Geometry()
+        p = [
+            geom.add_point(x)
+            for x in [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0]]
+            ]
+        lines = [
+            geom.add_line(p[0], p[1]),
+            geom.add_line(p[1], p[2]),
+            geom.add_line(p[0], p[2]),
+            ]
+        if sign < 0:
+            lines[2] = -lines[2]
+        geom.add_line_loop(lines)
+        if valid:
+            geom.validate()
+        else:
+            with pytest.raises(AssertionError):
+                geom.validate()
+
+    # holes outside and overlapping
+    geom = pygmsh.built_in.Geometry()
+    holes = [
+        _square(geom, 0.5, 0.5, 1.0).line_loop,
+        _square(geom, 5.0, 5.0, 1.0).line_loop,
+        _square(geom, 1.0, 1.0, 1.0).line_loop,
+        _square(geom, 3.0, 3.0, 1.0).line_loop,
+        ]
+    geom.add_rectangle(0.0, 4.5, 0.0, 4.5, 0.0, 0.1, holes=holes)
+    with pytest.raises(AssertionError) as e:
+        geom.validate()
+    errors = str(e.value).split('\n')
+    assert len(errors) == 2
+    assert 'Hole {} '.format(holes[1].id) in errors[0]
+    assert 'Holes {} and {} '.format(holes[0].id, holes[2].id) in errors[1]
+
+    # before gmsh is started
+    with pytest.raises(AssertionError):
+        pygmsh.generate_mesh(geom, validate=True, gmsh_path='nonexistent')
+    return
+
+
+if __name__ == '__main__':
+    test_errors()